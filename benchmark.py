@@ -0,0 +1,239 @@
+"""Benchmark headless untuk jalur data dan render dashboard.
+
+Fungsi inti dijalankan di luar UI Streamlit terhadap data simulasi
+berukuran 10 / 500 / 5.000 wilayah x 30 / 365 / 3.650 hari: pembangkitan
+time series, ketiga ``create_*_map``, loop perubahan trend dan agregasi
+korelasi. Untuk tiap kasus dicatat waktu (median beberapa ulangan), memori
+puncak (tracemalloc) dan ukuran payload yang diserialisasi, lalu
+dibandingkan dengan baseline JSON tersimpan.
+
+Contoh::
+
+    python benchmark.py --save-baseline             # merekam baseline
+    python benchmark.py > bench_output.txt          # membandingkan; exit 1 bila regresi
+    python benchmark.py --regions 10 500 --days 30 365
+"""
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_sources import SUMATERA_PROVINCES, SyntheticProvider, generate_time_series_frame
+from figures import correlation_heatmap
+from maps import create_employment_map, create_greenhouse_map, create_poverty_map
+from trends import TREND_COLUMNS, StatisticsCube, TrendIndex
+
+REGION_COUNTS = [10, 500, 5000]
+DAY_COUNTS = [30, 365, 3650]
+
+# Peta yang diukur: (nama kasus, fungsi pembangun, indikator)
+MAP_CASES = [
+    ('map.poverty', create_poverty_map, 'PoU'),
+    ('map.greenhouse', create_greenhouse_map, 'CO'),
+    ('map.employment', create_employment_map, 'NTP'),
+]
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'benchmark_baseline.json'
+
+# Batas kenaikan relatif terhadap baseline sebelum dianggap regresi
+DEFAULT_TOLERANCES = {'wall_s': 0.25, 'peak_mb': 0.10, 'payload_bytes': 0.05}
+
+# Kasus yang terlalu singkat untuk dibandingkan waktunya secara andal
+MIN_COMPARABLE_WALL_S = 0.005
+
+# Batas kotak wilayah simulasi (lintang, bujur) di sekitar Pulau Sumatera
+SUMATERA_BOUNDS = ((-6.0, 6.0), (95.0, 106.5))
+
+
+def synthetic_regions(n: int, seed: int = 0) -> List[dict]:
+    """Daftar wilayah simulasi; 10 pertama adalah provinsi Sumatera, sisanya titik acak di sekitarnya"""
+    regions = list(SUMATERA_PROVINCES[:n])
+    extra = n - len(regions)
+    if extra > 0:
+        rng = np.random.default_rng(seed)
+        (lat_low, lat_high), (lon_low, lon_high) = SUMATERA_BOUNDS
+        lats = rng.uniform(lat_low, lat_high, size=extra)
+        lons = rng.uniform(lon_low, lon_high, size=extra)
+        regions += [
+            {'name': f'Wilayah {i:05d}', 'lat': float(lat), 'lon': float(lon), 'capital': f'Kota {i:05d}'}
+            for i, (lat, lon) in enumerate(zip(lats, lons), start=1)
+        ]
+    return regions
+
+
+def measure(func: Callable[[], object], repeat: int) -> Tuple[Dict[str, float], object]:
+    """Median waktu dari ``repeat`` ulangan, lalu satu ulangan di bawah tracemalloc untuk memori puncak"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+
+    # tracemalloc memperlambat eksekusi, jadi memori diukur terpisah dari waktu
+    result = None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'wall_s': statistics.median(timings), 'peak_mb': peak / (1024 * 1024)}, result
+
+
+def map_html(builder, df: pd.DataFrame, indicator: str) -> str:
+    """Peta yang sudah dirender menjadi HTML, seperti yang dikirim ke browser"""
+    return builder(df, indicator).get_root().render()
+
+
+def trend_changes(time_series_df: pd.DataFrame, provinces: List[str]) -> List[pd.DataFrame]:
+    """Loop perubahan trend halaman "Analisis Trend" untuk seluruh indikator"""
+    index = TrendIndex(time_series_df)
+    return [index.changes(provinces, column) for column in TREND_COLUMNS]
+
+
+def correlation_figure(time_series_df: pd.DataFrame, provinces: List[str]) -> str:
+    """Kubus statistik, matriks korelasi seluruh provinsi dan JSON heatmap-nya"""
+    cube = StatisticsCube(time_series_df)
+    days = max(cube.stats)
+    return correlation_heatmap(cube.correlation(days, provinces)).to_json()
+
+
+def run_benchmarks(region_counts: List[int], day_counts: List[int], repeat: int = 3,
+                   seed: int = 0, log=None) -> List[dict]:
+    """Menjalankan seluruh kasus; peta hanya bergantung pada jumlah wilayah"""
+    results = []
+
+    def record(case: str, regions: int, days: Optional[int], func: Callable[[], object],
+               payload: Callable[[object], int] = None):
+        stats, result = measure(func, repeat)
+        row = {'case': case, 'regions': regions, 'days': days, **stats,
+               'payload_bytes': payload(result) if payload else None}
+        results.append(row)
+        if log:
+            log(format_row(row))
+        return result
+
+    for n_regions in region_counts:
+        regions = synthetic_regions(n_regions, seed)
+        names = [region['name'] for region in regions]
+        df = record('load_indicators', n_regions, None, lambda: SyntheticProvider(regions, seed=seed).load())
+        for case, builder, indicator in MAP_CASES:
+            record(case, n_regions, None, lambda: map_html(builder, df, indicator),
+                   lambda html: len(html.encode('utf-8')))
+
+        for n_days in day_counts:
+            time_series_df = record(
+                'generate_time_series', n_regions, n_days,
+                lambda: generate_time_series_frame(names, n_days, seed),
+                lambda frame: int(frame.memory_usage(deep=True).sum())
+            )
+            record('trend.changes', n_regions, n_days, lambda: trend_changes(time_series_df, names),
+                   lambda frames: sum(int(frame.memory_usage(deep=True).sum()) for frame in frames))
+            record('correlation', n_regions, n_days, lambda: correlation_figure(time_series_df, names),
+                   lambda payload: len(payload.encode('utf-8')))
+            del time_series_df
+    return results
+
+
+def format_row(row: dict) -> str:
+    days = '-' if row['days'] is None else row['days']
+    payload = '-' if row['payload_bytes'] is None else f"{row['payload_bytes'] / 1024:.1f} KiB"
+    return (f"{row['case']:<22} {row['regions']:>6} {days:>6} "
+            f"{row['wall_s'] * 1000:>10.1f} ms {row['peak_mb']:>9.1f} MiB {payload:>14}")
+
+
+def result_key(row: dict) -> str:
+    return f"{row['case']}/{row['regions']}/{row['days']}"
+
+
+def compare(results: List[dict], baseline: Dict[str, dict],
+            tolerances: Dict[str, float] = None) -> List[dict]:
+    """Daftar metrik yang naik melewati toleransi dibanding baseline"""
+    tolerances = tolerances or DEFAULT_TOLERANCES
+    regressions = []
+    for row in results:
+        base = baseline.get(result_key(row))
+        if base is None:
+            continue
+        for metric, tolerance in tolerances.items():
+            current, previous = row.get(metric), base.get(metric)
+            if current is None or not previous:
+                continue
+            if metric == 'wall_s' and previous < MIN_COMPARABLE_WALL_S:
+                continue
+            ratio = current / previous
+            if ratio > 1 + tolerance:
+                regressions.append({'key': result_key(row), 'metric': metric, 'baseline': previous,
+                                    'current': current, 'ratio': ratio})
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, dict]:
+    with open(path) as handle:
+        return json.load(handle)['results']
+
+
+def save_baseline(path: Path, results: List[dict]):
+    payload = {
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'results': {result_key(row): row for row in results},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as handle:
+        json.dump(payload, handle, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--regions', type=int, nargs='+', default=REGION_COUNTS)
+    parser.add_argument('--days', type=int, nargs='+', default=DAY_COUNTS)
+    parser.add_argument('--repeat', type=int, default=3, help='ulangan pengukuran waktu per kasus')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='menyimpan hasil sebagai baseline baru')
+    parser.add_argument('--output', type=Path, help='menulis hasil mentah sebagai JSON')
+    for metric, tolerance in DEFAULT_TOLERANCES.items():
+        parser.add_argument(f"--tolerance-{metric.replace('_', '-')}", type=float, default=tolerance,
+                            dest=f'tolerance_{metric}', help=f'kenaikan relatif maksimum {metric}')
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<22} {'region':>6} {'days':>6} {'wall':>13} {'peak':>13} {'payload':>14}")
+    results = run_benchmarks(args.regions, args.days, repeat=args.repeat, seed=args.seed, log=print)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline disimpan ke {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"\nBaseline {args.baseline} belum ada; jalankan dengan --save-baseline")
+        return 0
+
+    tolerances = {metric: getattr(args, f'tolerance_{metric}') for metric in DEFAULT_TOLERANCES}
+    regressions = compare(results, load_baseline(args.baseline), tolerances)
+    if not regressions:
+        print("\nTidak ada regresi dibanding baseline")
+        return 0
+    print(f"\n{len(regressions)} regresi dibanding baseline:")
+    for item in regressions:
+        print(f"  {item['key']:<36} {item['metric']:<14} {item['baseline']:.4g} -> {item['current']:.4g} "
+              f"(x{item['ratio']:.2f})")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
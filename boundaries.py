@@ -0,0 +1,225 @@
+"""Batas wilayah (provinsi/kabupaten/kecamatan) untuk peta choropleth dan drill-down.
+
+Geometri dibaca dari file GeoJSON/GeoPackage/Shapefile lokal lalu
+disederhanakan ke beberapa tingkat toleransi sesuai level zoom. Setiap
+tingkat disimpan sebagai GeoParquet di disk sehingga dashboard hanya
+mengirim geometri ringan yang dibutuhkan, bukan poligon resolusi penuh.
+Wilayah anak (kabupaten/kecamatan) disimpan terurut per induk dan dibaca
+hanya untuk satu induk saat dibutuhkan; pencarian titik dan viewport
+memakai indeks spasial STRtree.
+"""
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import geopandas as gpd
+import shapely
+
+from data_sources import cache_root, file_fingerprint
+
+# Toleransi penyederhanaan (derajat) per tingkat detail
+SIMPLIFY_TIERS = {
+    'low': 0.02,
+    'medium': 0.005,
+    'high': 0.001,
+}
+
+# Zoom maksimum yang masih dilayani oleh tiap tingkat
+ZOOM_TIERS = [
+    (7, 'low'),
+    (10, 'medium'),
+    (99, 'high'),
+]
+
+BOUNDARY_EXTENSIONS = ('.gpkg', '.geojson', '.json', '.shp')
+
+# Kolom nama wilayah yang umum dipakai pada data batas administrasi
+NAME_COLUMNS = ('province', 'provinsi', 'name', 'nama', 'NAME_1', 'PROVINSI', 'WADMPR')
+
+# Tingkat administrasi: kolom nama, kolom induk dan tingkat anak
+LEVELS = {
+    'provinces': {'name': 'province', 'parent': None, 'child': 'regencies'},
+    'regencies': {'name': 'regency', 'parent': 'province', 'child': 'districts'},
+    'districts': {'name': 'district', 'parent': 'regency', 'child': None},
+}
+
+# Kolom sumber per kolom hasil normalisasi (nama generik hanya dipakai untuk nama wilayah itu sendiri)
+SOURCE_COLUMNS = {
+    'province': ('province', 'provinsi', 'NAME_1', 'PROVINSI', 'WADMPR'),
+    'regency': ('regency', 'kabupaten', 'kab_kota', 'NAME_2', 'KABUPATEN', 'WADMKK'),
+    'district': ('district', 'kecamatan', 'NAME_3', 'KECAMATAN', 'WADMKC'),
+}
+GENERIC_NAME_COLUMNS = ('name', 'nama')
+
+# Baris per row group GeoParquet tingkat anak, agar filter per induk melewati sebagian besar file
+CHILD_ROW_GROUP_SIZE = 256
+
+
+def tier_for_zoom(zoom: int) -> str:
+    """Memilih tingkat detail geometri untuk level zoom tertentu"""
+    for max_zoom, tier in ZOOM_TIERS:
+        if zoom <= max_zoom:
+            return tier
+    return ZOOM_TIERS[-1][1]
+
+
+def normalize_boundaries(gdf: gpd.GeoDataFrame, level: str = 'provinces') -> gpd.GeoDataFrame:
+    """Menyeragamkan kolom nama wilayah (dan induknya) serta CRS (WGS84)"""
+    spec = LEVELS[level]
+    candidates = NAME_COLUMNS if level == 'provinces' else SOURCE_COLUMNS[spec['name']] + GENERIC_NAME_COLUMNS
+    name_source = next((column for column in candidates if column in gdf.columns), None)
+    if name_source is None:
+        raise ValueError(f"Data batas wilayah tidak memiliki kolom nama ({', '.join(candidates)})")
+    columns = {name_source: spec['name']}
+
+    if spec['parent']:
+        parent_candidates = SOURCE_COLUMNS[spec['parent']]
+        parent_source = next(
+            (column for column in parent_candidates if column in gdf.columns and column != name_source), None
+        )
+        if parent_source is None:
+            raise ValueError(f"Data batas '{level}' tidak memiliki kolom induk ({', '.join(parent_candidates)})")
+        columns[parent_source] = spec['parent']
+
+    gdf = gdf.rename(columns=columns)
+    if gdf.crs is not None and gdf.crs.to_epsg() != 4326:
+        gdf = gdf.to_crs(epsg=4326)
+    for column in columns.values():
+        gdf[column] = gdf[column].astype(str).str.strip()
+    return gdf[list(columns.values()) + ['geometry']]
+
+
+def simplify_boundaries(gdf: gpd.GeoDataFrame, tolerance: float) -> gpd.GeoDataFrame:
+    """Menyederhanakan geometri dan membulatkan koordinat ke grid sesuai toleransi"""
+    simplified = gdf.copy()
+    geometry = shapely.simplify(gdf.geometry.values, tolerance, preserve_topology=True)
+    simplified['geometry'] = shapely.set_precision(geometry, grid_size=tolerance / 10)
+    return simplified[~simplified.geometry.is_empty]
+
+
+class BoundaryStore:
+    """Sumber batas wilayah dengan cache geometri tersederhana di disk dan memori"""
+
+    def __init__(self, boundary_dir: Optional[Path] = None, cache_dir: Optional[Path] = None,
+                 max_children: int = 64):
+        boundary_dir = boundary_dir or os.environ.get('SUMATERA_BOUNDARY_DIR')
+        self.boundary_dir = Path(boundary_dir) if boundary_dir else None
+        self.cache_dir = Path(cache_dir or cache_root() / 'boundaries')
+        self._memory: Dict[Tuple[str, str, str], gpd.GeoDataFrame] = {}
+        # Wilayah anak per induk disimpan LRU agar data skala nasional tidak pernah dimuat seluruhnya
+        self._children: 'OrderedDict[Tuple[str, str, str, str], gpd.GeoDataFrame]' = OrderedDict()
+        self.max_children = max_children
+        self._lock = threading.Lock()
+
+    def source_path(self, level: str) -> Optional[Path]:
+        if self.boundary_dir is None:
+            return None
+        for extension in BOUNDARY_EXTENSIONS:
+            path = self.boundary_dir / f"{level}{extension}"
+            if path.exists():
+                return path
+        return None
+
+    def available(self, level: str = 'provinces') -> bool:
+        return self.source_path(level) is not None
+
+    def load(self, level: str = 'provinces', tier: str = 'low') -> gpd.GeoDataFrame:
+        """Memuat batas wilayah pada tingkat detail tertentu"""
+        path = self.source_path(level)
+        if path is None:
+            raise FileNotFoundError(f"File batas wilayah '{level}' tidak ditemukan")
+
+        fingerprint = file_fingerprint(path)
+        memory_key = (level, tier, fingerprint)
+        if memory_key in self._memory:
+            return self._memory[memory_key]
+
+        # Prefetch di thread latar dan render peta bisa meminta tingkat yang sama bersamaan
+        with self._lock:
+            if memory_key not in self._memory:
+                cache_path = self.cache_dir / f"{level}-{tier}-{fingerprint}.parquet"
+                if cache_path.exists():
+                    gdf = gpd.read_parquet(cache_path)
+                else:
+                    gdf = self._build_tiers(level, path, fingerprint)[tier]
+                self._memory[memory_key] = gdf
+        return self._memory[memory_key]
+
+    def load_children(self, level: str, parent: str, tier: str = 'medium') -> gpd.GeoDataFrame:
+        """Memuat wilayah satu tingkat yang berada di bawah satu induk (mis. kabupaten di satu provinsi)"""
+        path = self.source_path(level)
+        if path is None:
+            raise FileNotFoundError(f"File batas wilayah '{level}' tidak ditemukan")
+
+        fingerprint = file_fingerprint(path)
+        key = (level, parent, tier, fingerprint)
+        with self._lock:
+            if key in self._children:
+                self._children.move_to_end(key)
+                return self._children[key]
+            cache_path = self.cache_dir / f"{level}-{tier}-{fingerprint}.parquet"
+            if not cache_path.exists():
+                self._build_tiers(level, path, fingerprint)
+            # Filter per induk diteruskan ke pembaca Parquet sehingga row group lain dilewati
+            children = gpd.read_parquet(cache_path, filters=[(LEVELS[level]['parent'], '==', parent)])
+            self._children[key] = children.reset_index(drop=True)
+            while len(self._children) > self.max_children:
+                self._children.popitem(last=False)
+            return self._children[key]
+
+    def units(self, level: str, parent: Optional[str] = None, tier: str = 'medium') -> gpd.GeoDataFrame:
+        """Wilayah satu tingkat: seluruh provinsi, atau anak dari satu induk"""
+        if parent is None:
+            return self.load(level, tier)
+        return self.load_children(level, parent, tier)
+
+    def locate(self, level: str, lon: float, lat: float, parent: Optional[str] = None,
+               tier: str = 'medium') -> Optional[str]:
+        """Nama wilayah yang memuat titik (lon, lat), dicari lewat indeks spasial STRtree"""
+        units = self.units(level, parent, tier)
+        hits = units.sindex.query(shapely.Point(lon, lat), predicate='intersects')
+        if len(hits) == 0:
+            return None
+        return units.iloc[int(hits[0])][LEVELS[level]['name']]
+
+    def in_viewport(self, level: str, bounds: Tuple[float, float, float, float], parent: Optional[str] = None,
+                    tier: str = 'medium') -> gpd.GeoDataFrame:
+        """Wilayah yang berpotongan dengan viewport (min_lon, min_lat, max_lon, max_lat)"""
+        units = self.units(level, parent, tier)
+        hits = units.sindex.query(shapely.box(*bounds), predicate='intersects')
+        return units.iloc[sorted(hits)]
+
+    def drill_levels(self) -> List[str]:
+        """Urutan tingkat yang tersedia mulai dari provinsi (berhenti di tingkat pertama yang tidak ada)"""
+        levels, level = [], 'provinces'
+        while level is not None and self.available(level):
+            levels.append(level)
+            level = LEVELS[level]['child']
+        return levels
+
+    def _build_tiers(self, level: str, path: Path, fingerprint: str) -> Dict[str, gpd.GeoDataFrame]:
+        """Membaca geometri penuh sekali lalu menulis seluruh tingkat ke cache"""
+        full = normalize_boundaries(gpd.read_file(path), level)
+        parent = LEVELS[level]['parent']
+        if parent:
+            # Terurut per induk agar satu induk hanya menempati sedikit row group
+            full = full.sort_values([parent, LEVELS[level]['name']], kind='stable').reset_index(drop=True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in self.cache_dir.glob(f"{level}-*.parquet"):
+            if not stale.name.endswith(f"-{fingerprint}.parquet"):
+                stale.unlink(missing_ok=True)
+
+        tiers = {}
+        for tier, tolerance in SIMPLIFY_TIERS.items():
+            tiers[tier] = simplify_boundaries(full, tolerance)
+            target = self.cache_dir / f"{level}-{tier}-{fingerprint}.parquet"
+            tmp_path = target.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+            if parent:
+                tiers[tier].to_parquet(tmp_path, row_group_size=CHILD_ROW_GROUP_SIZE)
+            else:
+                tiers[tier].to_parquet(tmp_path)
+            os.replace(tmp_path, target)
+        return tiers
@@ -0,0 +1,413 @@
+"""Lapisan sumber data untuk Dashboard Monitoring Pulau Sumatera.
+
+Setiap domain indikator (wilayah, kemiskinan, gas rumah kaca, ketenagakerjaan)
+dimuat oleh sebuah provider. Provider berbasis file membaca CSV/Parquet lokal,
+menormalkan kolomnya, lalu menyimpan hasilnya sebagai file Arrow IPC di disk
+sehingga restart atau replika baru cukup memetakan file tersebut ke memori.
+"""
+import hashlib
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from schema import INDICATOR_SCHEMA, TIME_SERIES_SCHEMA, apply_schema
+
+SUMATERA_PROVINCES = [
+    {"name": "Aceh", "lat": 4.695135, "lon": 96.749397, "capital": "Banda Aceh"},
+    {"name": "Sumatera Utara", "lat": 2.1153547, "lon": 99.5450974, "capital": "Medan"},
+    {"name": "Sumatera Barat", "lat": -0.7399397, "lon": 100.8000051, "capital": "Padang"},
+    {"name": "Riau", "lat": 0.2933469, "lon": 101.7068294, "capital": "Pekanbaru"},
+    {"name": "Kepulauan Riau", "lat": 3.9456514, "lon": 108.1428669, "capital": "Tanjung Pinang"},
+    {"name": "Jambi", "lat": -1.4851831, "lon": 102.4380581, "capital": "Jambi"},
+    {"name": "Sumatera Selatan", "lat": -3.3194374, "lon": 103.914399, "capital": "Palembang"},
+    {"name": "Bangka Belitung", "lat": -2.7410513, "lon": 106.4405872, "capital": "Pangkal Pinang"},
+    {"name": "Bengkulu", "lat": -3.8004871, "lon": 102.2655756, "capital": "Bengkulu"},
+    {"name": "Lampung", "lat": -4.5585849, "lon": 105.4068079, "capital": "Bandar Lampung"}
+]
+
+# Kolom wajib per domain setelah normalisasi
+DOMAIN_COLUMNS = {
+    'regions': ['province', 'latitude', 'longitude', 'capital', 'population'],
+    'poverty': ['province', 'pou_percentage', 'fies_mild', 'fies_moderate', 'fies_severe'],
+    'ghg': ['province', 'co_level', 'no2_level', 'ch4_level'],
+    'employment': ['province', 'ntp', 'agri_workers_percentage'],
+}
+
+# Nama kolom alternatif yang umum dipakai pada file sumber
+COLUMN_ALIASES = {
+    'provinsi': 'province',
+    'lat': 'latitude',
+    'lon': 'longitude',
+    'lng': 'longitude',
+    'ibukota': 'capital',
+    'populasi': 'population',
+    'pou': 'pou_percentage',
+    'co': 'co_level',
+    'no2': 'no2_level',
+    'ch4': 'ch4_level',
+    'agri_workers': 'agri_workers_percentage',
+    'pekerja_pertanian': 'agri_workers_percentage',
+}
+
+# Rentang nilai simulasi: kolom -> (batas bawah, batas atas, jumlah desimal)
+SYNTHETIC_RANGES = {
+    'poverty': {
+        'pou_percentage': (3.5, 18.5, 2),
+        'fies_mild': (18.0, 42.0, 2),
+        'fies_moderate': (9.0, 28.0, 2),
+        'fies_severe': (3.0, 15.0, 2),
+    },
+    'ghg': {
+        'co_level': (0.8, 2.5, 3),     # mg/m³
+        'no2_level': (15.0, 85.0, 2),  # µg/m³
+        'ch4_level': (1.8, 3.2, 3),    # ppm
+    },
+    'employment': {
+        'ntp': (95.0, 115.0, 2),                     # Nilai Tukar Petani
+        'agri_workers_percentage': (25.0, 65.0, 2),  # % penduduk bekerja di pertanian
+    },
+}
+
+# Rentang nilai simulasi time series: kolom -> (batas bawah, batas atas, jumlah desimal)
+SYNTHETIC_TREND_RANGES = {
+    'co_trend': (0.5, 3.0, 3),
+    'no2_trend': (10.0, 90.0, 2),
+    'ch4_trend': (1.5, 3.5, 3),
+    'pou_trend': (2.0, 20.0, 2),
+    'ntp_trend': (90.0, 120.0, 2),
+}
+
+DEFAULT_CACHE_ROOT = Path(__file__).resolve().parent / '.cache'
+
+# Jumlah versi per nama yang disimpan untuk handle bersama lintas proses
+SHARED_KEEP_VERSIONS = 3
+
+
+def normalize_domain_frame(df: pd.DataFrame, domain: str) -> pd.DataFrame:
+    """Menyeragamkan nama kolom dan memvalidasi kolom wajib suatu domain"""
+    renamed = {}
+    for column in df.columns:
+        key = str(column).strip().lower().replace(' ', '_')
+        renamed[column] = COLUMN_ALIASES.get(key, key)
+    df = df.rename(columns=renamed)
+
+    required = DOMAIN_COLUMNS[domain]
+    missing = [column for column in required if column not in df.columns]
+    if missing:
+        raise ValueError(f"Data domain '{domain}' tidak memiliki kolom: {', '.join(missing)}")
+
+    df = df[required].copy()
+    df['province'] = df['province'].astype(str).str.strip()
+    return df.drop_duplicates('province', keep='last').reset_index(drop=True)
+
+
+def merge_domains(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Menggabungkan seluruh domain menjadi satu tabel per provinsi"""
+    merged = frames['regions']
+    for domain in ('poverty', 'ghg', 'employment'):
+        merged = merged.merge(frames[domain], on='province', how='left')
+    # Urutan kolom mengikuti skema dashboard
+    columns = DOMAIN_COLUMNS['regions'][:4] + [
+        column for domain in ('poverty', 'ghg', 'employment') for column in DOMAIN_COLUMNS[domain][1:]
+    ] + ['population']
+    return merged[columns]
+
+
+def cache_root() -> Path:
+    """Direktori induk seluruh cache di disk (``SUMATERA_CACHE_DIR`` bila diset)"""
+    return Path(os.environ.get('SUMATERA_CACHE_DIR', DEFAULT_CACHE_ROOT))
+
+
+_FILE_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_fingerprint(path: Path) -> str:
+    """Sidik file sumber berupa hash isi dan mtime; hash hanya dihitung ulang bila file berubah"""
+    stat = path.stat()
+    memo_key = (str(path), stat.st_mtime_ns, stat.st_size)
+    if memo_key not in _FILE_DIGESTS:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b''):
+                digest.update(chunk)
+        _FILE_DIGESTS[memo_key] = f"{digest.hexdigest()[:16]}-{stat.st_mtime_ns}"
+    return _FILE_DIGESTS[memo_key]
+
+
+def data_version(df: pd.DataFrame) -> str:
+    """Versi dataset untuk kunci cache; dihitung dari isi frame bila provider tidak mencatatnya"""
+    version = df.attrs.get('data_version')
+    if version is None:
+        hashed = pd.util.hash_pandas_object(df, index=False).values
+        version = hashlib.sha256(hashed.tobytes()).hexdigest()[:16]
+        df.attrs['data_version'] = version
+    return version
+
+
+class ArrowCache:
+    """Cache kolumnar di disk berupa file Arrow IPC yang dibaca lewat memory map"""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir or cache_root() / 'data')
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, name: str, key: str) -> Path:
+        return self.cache_dir / f"{name}-{key}.arrow"
+
+    def table(self, name: str, key: str) -> Optional[pa.Table]:
+        """Tabel Arrow yang buffer-nya langsung menunjuk ke file yang dipetakan ke memori"""
+        path = self.path_for(name, key)
+        if not path.exists():
+            return None
+        try:
+            with pa.memory_map(str(path), 'r') as source:
+                return pa.ipc.open_file(source).read_all()
+        except (pa.ArrowInvalid, OSError):
+            # File rusak atau terpotong: anggap cache miss
+            return None
+
+    def get(self, name: str, key: str) -> Optional[pd.DataFrame]:
+        table = self.table(name, key)
+        return table.to_pandas() if table is not None else None
+
+    def put(self, name: str, key: str, df: pd.DataFrame, keep: int = 1):
+        """Menulis frame lalu menghapus versi lain nama yang sama di luar ``keep`` versi terbaru"""
+        path = self.path_for(name, key)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        tmp_path = path.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+        # Tanpa kompresi agar file bisa langsung dipetakan ke memori
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+        # Hapus versi lama untuk nama yang sama; versi yang baru ditulis proses lain ikut disisakan
+        others = [other for other in self.cache_dir.glob(f"{name}-*.arrow") if other != path]
+        others.sort(key=lambda other: other.stat().st_mtime if other.exists() else 0, reverse=True)
+        for stale in others[max(keep - 1, 0):]:
+            stale.unlink(missing_ok=True)
+
+
+class SharedFrame:
+    """Handle read-only ke tabel Arrow memory-mapped yang dipakai bersama seluruh sesi dalam proses
+
+    Proyeksi kolom dibuat sekali lalu dibagi; kolom numerik tanpa nilai kosong
+    menunjuk langsung ke buffer Arrow (tanpa salinan) dan tidak bisa diubah.
+    """
+
+    def __init__(self, table: pa.Table, attrs: Optional[dict] = None):
+        self.table = table
+        self.attrs = dict(attrs or {})
+        self._projections: Dict[Tuple[str, ...], pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def publish(cls, name: str, df: pd.DataFrame, cache: Optional[ArrowCache] = None) -> 'SharedFrame':
+        """Menulis frame ke file Arrow per versi data (sekali) lalu memetakannya ke memori
+
+        Beberapa versi terbaru disimpan agar proses lain yang menulis versi baru
+        tidak menghapus file yang baru saja ditulis proses ini. Bila file tetap
+        hilang sebelum sempat dipetakan, handle memakai tabel Arrow di memori.
+        """
+        cache = cache or ArrowCache(cache_root() / 'shared')
+        key = data_version(df)
+        table = cache.table(name, key)
+        if table is None:
+            cache.put(name, key, df, keep=SHARED_KEEP_VERSIONS)
+            table = cache.table(name, key)
+        if table is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        return cls(table, df.attrs)
+
+    @property
+    def version(self) -> str:
+        return self.attrs['data_version']
+
+    @property
+    def columns(self) -> List[str]:
+        return self.table.column_names
+
+    def frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Proyeksi kolom sebagai DataFrame bersama; jangan diubah di tempat"""
+        key = tuple(columns) if columns is not None else tuple(self.table.column_names)
+        with self._lock:
+            if key not in self._projections:
+                frame = self.table.select(list(key)).to_pandas(split_blocks=True, self_destruct=False)
+                frame.attrs = dict(self.attrs)
+                self._projections[key] = frame
+            return self._projections[key]
+
+
+class DataProvider:
+    """Antarmuka dasar penyedia data indikator"""
+
+    domains: Tuple[str, ...] = ('regions', 'poverty', 'ghg', 'employment')
+
+    def fingerprint(self, domain: str) -> str:
+        raise NotImplementedError
+
+    def load_domain(self, domain: str) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def version(self) -> str:
+        """Versi dataset gabungan, berubah bila salah satu domain berubah"""
+        digest = hashlib.sha256()
+        for domain in self.domains:
+            digest.update(f"{domain}:{self.fingerprint(domain)};".encode())
+        return digest.hexdigest()[:16]
+
+    def load(self, max_workers: Optional[int] = None) -> pd.DataFrame:
+        """Memuat seluruh domain secara paralel; total waktu mendekati domain yang paling lambat"""
+        with ThreadPoolExecutor(max_workers=max_workers or len(self.domains),
+                                thread_name_prefix='sumatera-load') as pool:
+            futures = {domain: pool.submit(self.load_domain, domain) for domain in self.domains}
+            frames = {domain: future.result() for domain, future in futures.items()}
+        df = apply_schema(merge_domains(frames), INDICATOR_SCHEMA)
+        df.attrs['data_version'] = self.version()
+        return df
+
+
+class SyntheticProvider(DataProvider):
+    """Data simulasi untuk provinsi di Pulau Sumatera"""
+
+    def __init__(self, provinces: Optional[List[dict]] = None, seed: Optional[int] = None):
+        self.provinces = provinces or SUMATERA_PROVINCES
+        self.seed = seed
+        # Tanpa seed, setiap instance menghasilkan data berbeda
+        self._token = str(seed) if seed is not None else uuid.uuid4().hex
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, domain: str) -> str:
+        return f"synthetic-{self._token}-{len(self.provinces)}"
+
+    def _generate(self) -> Dict[str, pd.DataFrame]:
+        rng = np.random.default_rng(self.seed)
+        n = len(self.provinces)
+        names = [province['name'] for province in self.provinces]
+        frames = {
+            'regions': pd.DataFrame({
+                'province': names,
+                'latitude': [province['lat'] for province in self.provinces],
+                'longitude': [province['lon'] for province in self.provinces],
+                'capital': [province['capital'] for province in self.provinces],
+                'population': rng.integers(800000, 14000000, size=n, endpoint=True),
+            })
+        }
+        for domain, ranges in SYNTHETIC_RANGES.items():
+            data = {'province': names}
+            for column, (low, high, decimals) in ranges.items():
+                data[column] = np.round(rng.uniform(low, high, size=n), decimals)
+            frames[domain] = pd.DataFrame(data)
+        return frames
+
+    def load_domain(self, domain: str) -> pd.DataFrame:
+        # Seluruh domain dibangkitkan bersama agar konsisten walau dipanggil dari beberapa thread
+        with self._lock:
+            if not self._frames:
+                self._frames = self._generate()
+        return self._frames[domain]
+
+
+class FileProvider(DataProvider):
+    """Data nyata dari file CSV/Parquet lokal, satu file per domain
+
+    File dicari sebagai ``<data_dir>/<domain>.parquet`` atau ``<domain>.csv``.
+    Hasil normalisasi disimpan di ArrowCache dengan kunci hash isi file dan mtime.
+    """
+
+    EXTENSIONS = ('.parquet', '.csv')
+
+    def __init__(self, data_dir: Path, cache: Optional[ArrowCache] = None):
+        self.data_dir = Path(data_dir)
+        self.cache = cache or ArrowCache()
+
+    def source_path(self, domain: str) -> Path:
+        for extension in self.EXTENSIONS:
+            path = self.data_dir / f"{domain}{extension}"
+            if path.exists():
+                return path
+        raise FileNotFoundError(f"File sumber untuk domain '{domain}' tidak ditemukan di {self.data_dir}")
+
+    def fingerprint(self, domain: str) -> str:
+        return file_fingerprint(self.source_path(domain))
+
+    def _parse(self, path: Path) -> pd.DataFrame:
+        if path.suffix == '.parquet':
+            return pd.read_parquet(path)
+        return pd.read_csv(path)
+
+    def load_domain(self, domain: str) -> pd.DataFrame:
+        key = self.fingerprint(domain)
+        cached = self.cache.get(domain, key)
+        if cached is not None:
+            return cached
+        df = normalize_domain_frame(self._parse(self.source_path(domain)), domain)
+        self.cache.put(domain, key, df)
+        return df
+
+
+def build_time_series_frame(provinces: List[str], days: int, rng: np.random.Generator,
+                            end_date: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """Membangun data time series secara kolumnar (satu array per indikator)"""
+    if end_date is None:
+        end_date = pd.Timestamp.now().normalize()
+    n_provinces = len(provinces)
+    n_rows = days * n_provinces
+
+    # Urutan baris: tanggal dulu, lalu provinsi (sama seperti versi loop)
+    dates = pd.date_range(end=end_date - pd.Timedelta(days=1), periods=days, freq='D')
+    data = {
+        'date': np.repeat(dates.values, n_provinces),
+        'province': pd.Categorical.from_codes(
+            np.tile(np.arange(n_provinces, dtype=np.int16), days),
+            categories=pd.Index(provinces)
+        ),
+    }
+    for column, (low, high, decimals) in SYNTHETIC_TREND_RANGES.items():
+        values = rng.uniform(low, high, size=n_rows).astype(np.float32)
+        data[column] = np.round(values, decimals)
+
+    return pd.DataFrame(data)
+
+
+def generate_time_series_frame(provinces: List[str], days: int = 30, seed: Optional[int] = None,
+                               end_date: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """Time series simulasi yang sudah mengikuti skema
+
+    Dengan seed, versi data diturunkan dari seed dan parameter pembangkitan
+    sehingga data yang sama memakai ulang cache berkunci versi; tanpa seed
+    setiap pemanggilan menghasilkan versi baru.
+    """
+    if end_date is None:
+        end_date = pd.Timestamp.now().normalize()
+    time_series_df = build_time_series_frame(provinces, days, np.random.default_rng(seed), end_date)
+    time_series_df = apply_schema(time_series_df, TIME_SERIES_SCHEMA)
+    if seed is None:
+        time_series_df.attrs['data_version'] = uuid.uuid4().hex[:16]
+    else:
+        digest = hashlib.sha256(f"synthetic-ts-{seed}-{days}-{end_date.date()}".encode())
+        for province in provinces:
+            digest.update(f"{province};".encode())
+        time_series_df.attrs['data_version'] = digest.hexdigest()[:16]
+    return time_series_df
+
+
+def get_data_provider() -> DataProvider:
+    """Memilih provider aktif berdasarkan variabel lingkungan
+
+    ``SUMATERA_DATA_DIR`` menunjuk ke direktori file sumber; bila tidak diset
+    dashboard memakai data simulasi (``SUMATERA_SEED`` opsional).
+    """
+    data_dir = os.environ.get('SUMATERA_DATA_DIR')
+    if data_dir:
+        return FileProvider(Path(data_dir))
+    seed = os.environ.get('SUMATERA_SEED')
+    return SyntheticProvider(seed=int(seed) if seed else None)
@@ -0,0 +1,54 @@
+"""Handle dataset yang dimuat secara malas per halaman dashboard.
+
+Setiap dataset didaftarkan beserta fungsi pemuatnya, tetapi baru dimuat
+(dan diturunkan) saat pertama kali diakses. Halaman cukup menyatakan
+dataset yang dibutuhkan sehingga memori dan latensi cold start mengikuti
+halaman yang sedang dibuka.
+"""
+import threading
+from typing import Any, Callable, Dict, List
+
+_MISSING = object()
+
+
+class LazyDataset:
+    """Satu dataset yang dimuat sekali saat pertama kali diminta"""
+
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self.loader = loader
+        self._value = _MISSING
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not _MISSING
+
+    def get(self) -> Any:
+        if self._value is _MISSING:
+            with self._lock:
+                if self._value is _MISSING:
+                    self._value = self.loader()
+        return self._value
+
+
+class DatasetRegistry:
+    """Kumpulan handle dataset; dependensi cukup diambil lewat registry di dalam pemuat"""
+
+    def __init__(self):
+        self._datasets: Dict[str, LazyDataset] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        self._datasets[name] = LazyDataset(name, loader)
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._datasets:
+            raise KeyError(f"Dataset '{name}' belum didaftarkan")
+        return self._datasets[name].get()
+
+    def load(self, names) -> List[Any]:
+        """Memuat beberapa dataset sekaligus (mis. kebutuhan satu halaman)"""
+        return [self[name] for name in names]
+
+    def loaded(self) -> List[str]:
+        return [name for name, dataset in self._datasets.items() if dataset.loaded]
@@ -0,0 +1,101 @@
+"""Downsampling sisi server untuk grafik garis (LTTB dan min/max).
+
+Setiap deret (per provinsi) dikurangi menjadi sejumlah titik sesuai
+anggaran titik-per-piksel sebelum figure Plotly dibuat, sehingga puncak
+tetap terlihat tetapi JSON grafik jauh lebih kecil.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+DOWNSAMPLING_MODES = {
+    "LTTB": 'lttb',
+    "Min-Max": 'minmax',
+    "Tanpa Downsampling": None,
+}
+
+DEFAULT_CHART_WIDTH_PX = 1200
+
+
+def points_budget(width_px: int = DEFAULT_CHART_WIDTH_PX, points_per_pixel: float = 1.0) -> int:
+    """Jumlah titik maksimum per deret untuk lebar grafik tertentu"""
+    return max(int(width_px * points_per_pixel), 3)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indeks titik terpilih menurut Largest-Triangle-Three-Buckets"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # Titik pertama dan terakhir selalu dipertahankan; sisanya dibagi n_out - 2 ember
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Rata-rata tiap ember dihitung sekaligus untuk dipakai sebagai titik C
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for bucket in range(n_out - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        cx, cy = avg_x[bucket + 1], avg_y[bucket + 1]
+        # Luas segitiga (A, B, C) untuk seluruh kandidat B dalam ember
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[bucket + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indeks titik minimum dan maksimum tiap ember (puncak selalu terjaga)"""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    n_buckets = n_out // 2
+    size = int(np.ceil(n / n_buckets))
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    valid = ~np.all(np.isnan(buckets), axis=1)
+    offsets = np.arange(n_buckets)[valid] * size
+    lows = offsets + np.nanargmin(buckets[valid], axis=1)
+    highs = offsets + np.nanargmax(buckets[valid], axis=1)
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+
+def downsample_frame(df: pd.DataFrame, x: str, y: str, by: Optional[str] = None,
+                     n_out: int = DEFAULT_CHART_WIDTH_PX, mode: Optional[str] = 'lttb') -> pd.DataFrame:
+    """Mengurangi titik tiap deret (dikelompokkan per ``by``) menjadi paling banyak ``n_out``"""
+    if mode is None or df.empty:
+        return df
+
+    ordered = df.sort_values([by, x] if by else [x], kind='stable')
+    x_values = ordered[x].to_numpy()
+    if np.issubdtype(x_values.dtype, np.datetime64):
+        x_values = x_values.astype('datetime64[ns]').astype(np.int64)
+    y_values = ordered[y].to_numpy(dtype=np.float64)
+
+    if by:
+        keys = ordered[by].to_numpy()
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    else:
+        starts = np.array([0])
+    ends = np.r_[starts[1:], len(ordered)]
+
+    keep = []
+    for start, end in zip(starts, ends):
+        if mode == 'minmax':
+            local = minmax_indices(y_values[start:end], n_out)
+        else:
+            local = lttb_indices(x_values[start:end], y_values[start:end], n_out)
+        keep.append(start + local)
+    return ordered.iloc[np.concatenate(keep)]
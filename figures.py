@@ -0,0 +1,162 @@
+"""Pembuat figure Plotly untuk seluruh halaman dashboard.
+
+Setiap fungsi hanya bergantung pada data masukannya sehingga hasilnya
+dapat di-cache per status tampilan (halaman, indikator, provinsi, versi data).
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from downsampling import downsample_frame
+from schema import display_frame
+
+# Konfigurasi grafik batang per gas: kolom, satuan, skala warna
+GHG_CHARTS = {
+    'CO': {'column': 'co_level', 'unit': 'mg/m³', 'color_scale': 'Oranges'},
+    'NO2': {'column': 'no2_level', 'unit': 'µg/m³', 'color_scale': 'Reds'},
+    'CH4': {'column': 'ch4_level', 'unit': 'ppm', 'color_scale': 'Blues'},
+}
+
+
+def indicator_bar(df: pd.DataFrame, column: str, title: str, color_scale: str):
+    """Grafik batang horizontal satu indikator per provinsi"""
+    fig_bar = px.bar(
+        display_frame(df[['province', column]]).sort_values(column),
+        x=column,
+        y='province',
+        orientation='h',
+        title=title,
+        color=column,
+        color_continuous_scale=color_scale
+    )
+    fig_bar.update_layout(height=400)
+    return fig_bar
+
+
+def fies_levels(df: pd.DataFrame) -> pd.DataFrame:
+    """Tingkat FIES dalam format panjang (province, FIES_Level, Percentage)"""
+    return display_frame(df[['province', 'fies_mild', 'fies_moderate', 'fies_severe']]).melt(
+        id_vars=['province'],
+        var_name='FIES_Level',
+        value_name='Percentage'
+    )
+
+
+def fies_comparison(fies_data: pd.DataFrame):
+    """Perbandingan tingkat FIES (bertumpuk) per provinsi dari hasil ``fies_levels``"""
+    fig_fies = px.bar(
+        fies_data,
+        x='province',
+        y='Percentage',
+        color='FIES_Level',
+        title="Perbandingan Tingkat FIES",
+        barmode='stack'
+    )
+    fig_fies.update_xaxes(tickangle=45)
+    fig_fies.update_layout(height=400)
+    return fig_fies
+
+
+def ghg_normalized_levels(df: pd.DataFrame) -> pd.DataFrame:
+    """Level gas rumah kaca dinormalisasi 0-100 dalam format panjang"""
+    levels = display_frame(df[['province', 'co_level', 'no2_level', 'ch4_level']])
+    df_normalized = levels[['province']].copy()
+    for gas in ('co', 'no2', 'ch4'):
+        level = levels[f'{gas}_level']
+        df_normalized[f'{gas}_norm'] = (level - level.min()) / (level.max() - level.min()) * 100
+
+    return df_normalized.melt(
+        id_vars=['province'],
+        var_name='Gas_Type',
+        value_name='Normalized_Level'
+    )
+
+
+def ghg_comparison(ghg_data: pd.DataFrame):
+    """Perbandingan relatif seluruh gas rumah kaca dari hasil ``ghg_normalized_levels``"""
+    fig_comparison = px.bar(
+        ghg_data,
+        x='province',
+        y='Normalized_Level',
+        color='Gas_Type',
+        title="Perbandingan Relatif Gas Rumah Kaca (Normalized)",
+        barmode='group'
+    )
+    fig_comparison.update_xaxes(tickangle=45)
+    return fig_comparison
+
+
+def ntp_agri_scatter(df: pd.DataFrame):
+    """Hubungan NTP dan persentase pekerja pertanian"""
+    fig_scatter = px.scatter(
+        display_frame(df[['province', 'ntp', 'agri_workers_percentage']]),
+        x='ntp',
+        y='agri_workers_percentage',
+        text='province',
+        title="Hubungan NTP dan Persentase Pekerja Pertanian",
+        labels={'ntp': 'Nilai Tukar Petani', 'agri_workers_percentage': 'Pekerja Pertanian (%)'}
+    )
+    fig_scatter.update_traces(textposition="top center")
+    return fig_scatter
+
+
+def add_envelope(fig, points: pd.DataFrame, column: str):
+    """Menambahkan pita min/max di belakang garis rata-rata tiap provinsi"""
+    n_lines = len(fig.data)
+    for trace in list(fig.data):
+        prov = points[points['province'] == trace.name]
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([prov['date'].to_numpy(), prov['date'].to_numpy()[::-1]]),
+            y=np.concatenate([prov[f'{column}_max'].to_numpy(), prov[f'{column}_min'].to_numpy()[::-1]]),
+            fill='toself',
+            fillcolor=trace.line.color,
+            opacity=0.15,
+            line=dict(width=0),
+            hoverinfo='skip',
+            showlegend=False,
+            legendgroup=trace.legendgroup
+        ))
+    # Pita digambar lebih dulu agar garis tetap di atas
+    fig.data = fig.data[n_lines:] + fig.data[:n_lines]
+
+
+def trend_line(points: pd.DataFrame, chart: dict, envelope: bool = False, break_even: bool = False):
+    """Grafik garis trend per provinsi, opsional dengan pita min/max dan garis NTP = 100"""
+    points = display_frame(points)
+    fig_trend = px.line(
+        points,
+        x='date',
+        y=chart['column'],
+        color='province',
+        title=chart['title'],
+        labels={chart['column']: chart['label'], 'date': 'Tanggal'}
+    )
+    if envelope:
+        add_envelope(fig_trend, points, chart['column'])
+    if break_even:
+        # Tambahkan garis referensi pada 100 untuk NTP
+        fig_trend.add_hline(y=100, line_dash="dash", line_color="red",
+                            annotation_text="NTP = 100 (Break Even)")
+    fig_trend.update_layout(height=500)
+    return fig_trend
+
+
+def pyramid_trend_figure(pyramid, provinces: list, chart: dict, start: pd.Timestamp, end: pd.Timestamp,
+                         n_out: int, mode: str = None, break_even: bool = False):
+    """Grafik trend dari ``TemporalPyramid``: resolusi dipilih per rentang lalu tiap deret di-downsample"""
+    points, resolution = pyramid.query(provinces, chart['column'], start, end)
+    points = downsample_frame(points, x='date', y=chart['column'], by='province', n_out=n_out, mode=mode)
+    return trend_line(points, chart, envelope=resolution != 'D', break_even=break_even)
+
+
+def correlation_heatmap(correlation_matrix: pd.DataFrame):
+    """Heatmap korelasi antar indikator"""
+    fig_heatmap = px.imshow(
+        correlation_matrix,
+        title="Korelasi Antar Indikator",
+        color_continuous_scale='RdBu',
+        aspect='auto'
+    )
+    fig_heatmap.update_layout(height=400)
+    return fig_heatmap
@@ -0,0 +1,499 @@
+"""Worker ingest pembacaan sensor gas rumah kaca secara near-real-time.
+
+Pembacaan berupa baris JSON (satu pembacaan per baris) diambil dari sumber
+pesan lokal, yaitu file yang terus ditambah (tail) atau socket UDP, sebagai
+pengganti broker. Pembacaan diproses per micro-batch, disimpan sebagai
+segmen Arrow IPC di disk, lalu agregat per provinsi (nilai terbaru dan
+rata-rata harian) diperbarui secara inkremental. Peta gas rumah kaca dan
+halaman trend membaca agregat ini tanpa memuat ulang seluruh dataset;
+struktur trend (indeks, kubus statistik, piramida) hanya menerima baris
+harian yang berubah sejak batch terakhir yang diterapkan.
+"""
+import copy
+import json
+import os
+import socket
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data_sources import COLUMN_ALIASES, cache_root, data_version
+from trends import TREND_WINDOWS, StatisticsCube, TemporalPyramid, TrendIndex, window_slice
+
+# Kolom gas pada pembacaan -> kolom trend di time series
+LIVE_TREND_COLUMNS = {
+    'co_level': 'co_trend',
+    'no2_level': 'no2_trend',
+    'ch4_level': 'ch4_trend',
+}
+
+# Nama kolom waktu yang diterima pada pesan
+TIMESTAMP_ALIASES = ('timestamp', 'time', 'waktu')
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Retensi pembacaan tersimpan: umur (hari, dihitung dari pembacaan terbaru) dan jumlah baris maksimum
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_MAX_STORED_ROWS = 1_000_000
+
+
+def parse_readings(lines: List[str]) -> pd.DataFrame:
+    """Mengubah baris JSON menjadi frame pembacaan (province, timestamp, kolom gas)
+
+    Contoh pesan: ``{"provinsi": "Riau", "timestamp": "2024-05-01T08:00:00Z", "co": 1.2}``;
+    waktu dalam format ISO 8601 dan disimpan sebagai UTC tanpa zona waktu.
+
+    Baris yang bukan JSON, tanpa provinsi/waktu atau tanpa satu pun nilai gas
+    dilewati; jumlahnya dicatat di ``attrs['rejected']``.
+    """
+    records, rejected = [], 0
+    for line in lines:
+        try:
+            message = json.loads(line)
+        except ValueError:
+            rejected += 1
+            continue
+        if not isinstance(message, dict):
+            rejected += 1
+            continue
+        record = {COLUMN_ALIASES.get(str(key).strip().lower(), str(key).strip().lower()): value
+                  for key, value in message.items()}
+        timestamp = next((record[key] for key in TIMESTAMP_ALIASES if record.get(key) is not None), None)
+        if not record.get('province') or timestamp is None:
+            rejected += 1
+            continue
+        row = {'province': str(record['province']).strip(), 'timestamp': timestamp}
+        for column in LIVE_TREND_COLUMNS:
+            value = record.get(column)
+            row[column] = float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+        if all(np.isnan(row[column]) for column in LIVE_TREND_COLUMNS):
+            rejected += 1
+            continue
+        records.append(row)
+
+    batch = pd.DataFrame(records, columns=['province', 'timestamp'] + list(LIVE_TREND_COLUMNS))
+    timestamps = pd.to_datetime(batch['timestamp'], errors='coerce', utc=True, format='ISO8601')
+    batch['timestamp'] = timestamps.dt.tz_localize(None)
+    invalid = batch['timestamp'].isna()
+    batch = batch[~invalid].astype({column: np.float32 for column in LIVE_TREND_COLUMNS})
+    batch = batch.sort_values('timestamp', kind='stable').reset_index(drop=True)
+    batch.attrs['rejected'] = rejected + int(invalid.sum())
+    return batch
+
+
+class FileTailSource:
+    """Membaca baris baru dari file yang terus ditambah, posisi dicatat per byte
+
+    Baris yang lebih panjang dari ``chunk_bytes`` dilewati sampai newline
+    berikutnya agar pembacaan tidak macet; jumlahnya dicatat di ``skipped``.
+    """
+
+    def __init__(self, path: Path, chunk_bytes: int = 1 << 20):
+        self.path = Path(path)
+        self.chunk_bytes = chunk_bytes
+        self.offset = 0
+        self.skipped = 0
+        self._inode: Optional[int] = None
+        self._skipping = False
+
+    def position(self) -> Optional[dict]:
+        return {'path': str(self.path), 'inode': self._inode, 'offset': self.offset, 'skipping': self._skipping}
+
+    def seek(self, position: Optional[dict]):
+        if position and position.get('path') == str(self.path):
+            self._inode = position.get('inode')
+            self.offset = int(position.get('offset', 0))
+            self._skipping = bool(position.get('skipping', False))
+
+    def poll(self, max_records: int) -> List[str]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return []
+        # File dirotasi atau dipotong: mulai lagi dari awal
+        if stat.st_ino != self._inode or stat.st_size < self.offset:
+            self._inode = stat.st_ino
+            self.offset = 0
+            self._skipping = False
+        with open(self.path, 'rb') as handle:
+            handle.seek(self.offset)
+            chunk = handle.read(self.chunk_bytes)
+        end = chunk.rfind(b'\n')
+        if end < 0:
+            if len(chunk) == self.chunk_bytes:
+                # Satu baris lebih panjang dari chunk: dibuang sampai newline berikutnya
+                if not self._skipping:
+                    self.skipped += 1
+                self._skipping = True
+                self.offset += len(chunk)
+            # Selain itu baris terakhir belum lengkap ditulis
+            return []
+        lines = chunk[:end].split(b'\n')
+        consumed = 0
+        if self._skipping:
+            # Sisa baris yang terlalu panjang
+            consumed = len(lines[0]) + 1
+            lines = lines[1:]
+            self._skipping = False
+        if len(lines) > max_records:
+            lines = lines[:max_records]
+            consumed += sum(len(line) + 1 for line in lines)
+        else:
+            consumed = end + 1
+        self.offset += consumed
+        return [line.decode('utf-8', 'replace') for line in lines if line.strip()]
+
+
+class SocketSource:
+    """Menerima pembacaan lewat datagram UDP lokal (satu atau beberapa baris per datagram)"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.address = self.sock.getsockname()
+        self.skipped = 0
+
+    def position(self) -> Optional[dict]:
+        return None
+
+    def seek(self, position: Optional[dict]):
+        pass
+
+    def poll(self, max_records: int) -> List[str]:
+        lines: List[str] = []
+        while len(lines) < max_records:
+            try:
+                payload = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            lines.extend(line for line in payload.decode('utf-8', 'replace').splitlines() if line.strip())
+        return lines
+
+    def close(self):
+        self.sock.close()
+
+
+class ReadingStore:
+    """Penyimpanan kolumnar append-only: satu segmen Arrow IPC per micro-batch
+
+    Saat segmen digabung, pembacaan yang lebih tua dari ``retention_days``
+    (dihitung dari pembacaan terbaru) dibuang dan hanya ``max_rows`` baris
+    terbaru disimpan, sehingga riwayat yang diputar ulang saat start terbatas.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_segments: int = 256,
+                 retention_days: float = DEFAULT_RETENTION_DAYS, max_rows: int = DEFAULT_MAX_STORED_ROWS):
+        self.directory = Path(directory or cache_root() / 'readings')
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segments = max_segments
+        self.retention_days = retention_days
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+
+    def segments(self) -> List[Path]:
+        return sorted(self.directory.glob('segment-*.arrow'))
+
+    def _write(self, path: Path, batch: pd.DataFrame):
+        table = pa.Table.from_pandas(batch, preserve_index=False)
+        tmp_path = path.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    def append(self, batch: pd.DataFrame, position: Optional[dict] = None):
+        """Menulis satu micro-batch beserta posisi sumber (untuk melanjutkan setelah restart)"""
+        with self._lock:
+            segments = self.segments()
+            sequence = int(segments[-1].stem.split('-')[1]) + 1 if segments else 0
+            self._write(self.directory / f'segment-{sequence:010d}.arrow', batch)
+            if position is not None:
+                checkpoint = self.directory / 'checkpoint.json'
+                tmp_path = checkpoint.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+                tmp_path.write_text(json.dumps(position))
+                os.replace(tmp_path, checkpoint)
+            if len(segments) + 1 > self.max_segments:
+                self._compact()
+
+    def compact(self):
+        """Menggabung segmen dan menerapkan retensi (mis. sebelum riwayat diputar ulang)"""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        # Segmen kecil digabung menjadi satu agar jumlah file tetap terbatas
+        segments = self.segments()
+        if not segments:
+            return
+        merged = self.read(segments)
+        if not merged.empty:
+            cutoff = merged['timestamp'].max() - pd.Timedelta(days=self.retention_days)
+            merged = merged[merged['timestamp'] >= cutoff]
+            merged = merged.sort_values('timestamp', kind='stable').tail(self.max_rows).reset_index(drop=True)
+        self._write(segments[-1], merged)
+        for path in segments[:-1]:
+            path.unlink(missing_ok=True)
+
+    def checkpoint(self) -> Optional[dict]:
+        path = self.directory / 'checkpoint.json'
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def read(self, segments: Optional[List[Path]] = None) -> pd.DataFrame:
+        tables = []
+        for path in (self.segments() if segments is None else segments):
+            with pa.memory_map(str(path), 'r') as source:
+                tables.append(pa.ipc.open_file(source).read_all())
+        if not tables:
+            return pd.DataFrame(columns=['province', 'timestamp'] + list(LIVE_TREND_COLUMNS))
+        return pa.concat_tables(tables).to_pandas()
+
+
+class LiveAggregates:
+    """Agregat per provinsi yang diperbarui per micro-batch: nilai terbaru dan rata-rata harian"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = 0
+        self.readings = 0
+        self.latest = pd.DataFrame(columns=['updated_at'] + list(LIVE_TREND_COLUMNS),
+                                   index=pd.Index([], name='province'))
+        daily_index = pd.MultiIndex.from_arrays([[], []], names=['date', 'province'])
+        self.daily_sums = pd.DataFrame(columns=list(LIVE_TREND_COLUMNS), index=daily_index, dtype=np.float64)
+        self.daily_counts = pd.DataFrame(columns=list(LIVE_TREND_COLUMNS), index=daily_index, dtype=np.int64)
+        # Versi batch terakhir yang mengubah tiap (tanggal, provinsi)
+        self.daily_updated = pd.Series(index=daily_index, dtype=np.int64)
+
+    def update(self, batch: pd.DataFrame):
+        if batch.empty:
+            return
+        columns = list(LIVE_TREND_COLUMNS)
+        grouped = batch.groupby('province', sort=False)
+        # Nilai non-kosong terakhir per kolom; batch diurutkan per waktu oleh parse_readings
+        last = grouped[columns].last()
+        last.insert(0, 'updated_at', grouped['timestamp'].max())
+
+        by_day = batch.assign(date=batch['timestamp'].dt.normalize()).groupby(['date', 'province'])
+        sums = by_day[columns].sum(min_count=1)
+        counts = by_day[columns].count()
+
+        with self._lock:
+            latest = self.latest.reindex(self.latest.index.union(last.index))
+            newer = last['updated_at'] >= latest.loc[last.index, 'updated_at'].fillna(pd.Timestamp.min)
+            fresh = last[newer]
+            latest.loc[fresh.index] = fresh.combine_first(latest.loc[fresh.index])
+            self.latest = latest
+            self.daily_sums = self.daily_sums.add(sums, fill_value=0)
+            self.daily_counts = self.daily_counts.add(counts, fill_value=0).astype(np.int64)
+            self.readings += len(batch)
+            self.version += 1
+            updated = pd.Series(self.version, index=sums.index)
+            self.daily_updated = updated.combine_first(self.daily_updated).astype(np.int64)
+
+    def snapshot(self) -> Dict[str, object]:
+        """Salinan konsisten dari agregat untuk dibaca oleh halaman"""
+        with self._lock:
+            return {
+                'version': self.version,
+                'readings': self.readings,
+                'latest': self.latest.copy(),
+                'daily_means': (self.daily_sums / self.daily_counts.where(self.daily_counts > 0)),
+                'daily_updated': self.daily_updated,
+            }
+
+
+def apply_live_readings(df: pd.DataFrame, snapshot: Dict[str, object]) -> pd.DataFrame:
+    """Frame indikator dengan nilai gas terbaru dari sensor menggantikan nilai dasar
+
+    Versi frame dasar disimpan di ``attrs['base_version']`` agar peta dan
+    figure yang tidak memakai kolom gas tetap memakai kunci cache yang sama.
+    """
+    if not snapshot['version']:
+        return df
+    latest = snapshot['latest']
+    live_df = df.copy()
+    rows = live_df['province'].isin(latest.index).to_numpy()
+    for column in LIVE_TREND_COLUMNS:
+        values = latest[column].reindex(live_df.loc[rows, 'province']).to_numpy(dtype=np.float64)
+        current = live_df.loc[rows, column].to_numpy(dtype=np.float64)
+        live_df.loc[rows, column] = np.where(np.isnan(values), current, values).astype(live_df[column].dtype)
+    live_df.attrs['base_version'] = df.attrs.get('data_version', 'base')
+    live_df.attrs['data_version'] = f"{live_df.attrs['base_version']}-live{snapshot['version']}"
+    return live_df
+
+
+def columns_version(df: pd.DataFrame, columns: List[str]) -> str:
+    """Versi data untuk kunci cache yang hanya membaca ``columns``
+
+    Nilai sensor hanya mengganti kolom gas; kolom lain memakai versi frame dasar.
+    """
+    if 'base_version' in df.attrs and not set(columns) & set(LIVE_TREND_COLUMNS):
+        return df.attrs['base_version']
+    return data_version(df)
+
+
+def live_delta(snapshot: Dict[str, object], since: int = 0) -> pd.DataFrame:
+    """Rata-rata harian sensor (kolom trend) yang berubah setelah batch ke-``since``"""
+    daily_means = snapshot['daily_means']
+    changed = (snapshot['daily_updated'] > since).reindex(daily_means.index, fill_value=False)
+    return daily_means[changed.to_numpy()].rename(columns=LIVE_TREND_COLUMNS)
+
+
+def merge_live_rows(time_series_df: pd.DataFrame, live: pd.DataFrame) -> tuple:
+    """Menggabungkan rata-rata harian sensor ke time series
+
+    Baris (tanggal, provinsi) yang sudah ada diganti nilai gasnya, kolom lain
+    tetap; tanggal baru ditambahkan. Mengembalikan frame hasil dan baris yang
+    berubah (dalam skema time series).
+    """
+    provinces = time_series_df['province'].astype(str)
+    base = time_series_df.assign(province=provinces).set_index(['date', 'province'])
+    rows = live.combine_first(base.reindex(live.index)).reset_index()[time_series_df.columns]
+    for column in time_series_df.columns:
+        if column not in ('date', 'province'):
+            rows[column] = rows[column].astype(time_series_df[column].dtype)
+
+    replaced = pd.MultiIndex.from_arrays([time_series_df['date'], provinces]).isin(live.index)
+    merged = pd.concat([time_series_df[~replaced].assign(province=provinces[~replaced]), rows], ignore_index=True)
+    categories = pd.Index(time_series_df['province'].astype('category').cat.categories.astype(str))
+    new_provinces = pd.Index(rows['province'].unique()).difference(categories)
+    merged['province'] = pd.Categorical(merged['province'], categories=categories.append(new_provinces))
+    rows['province'] = rows['province'].astype(str)
+    return merged, rows
+
+
+class LiveTrendState:
+    """Struktur trend satu time series dasar yang diperbarui per batch sensor
+
+    Indeks per rentang, kubus statistik dan piramida dibangun sekali dari
+    time series dasar. ``sync`` hanya menerapkan rata-rata harian yang berubah
+    sejak batch terakhir lewat ``append`` masing-masing struktur; struktur
+    lama disalin dulu (copy-on-write) sehingga sesi yang masih membacanya
+    tidak terganggu.
+    """
+
+    def __init__(self, time_series_df: pd.DataFrame):
+        self.base_version = data_version(time_series_df)
+        self.applied = 0
+        self._lock = threading.Lock()
+        self.view = {
+            'version': self.base_version,
+            'frame': time_series_df,
+            'indexes': {days: TrendIndex(window_slice(time_series_df, days)) for days in TREND_WINDOWS.values()},
+            'cube': StatisticsCube(time_series_df, TREND_WINDOWS),
+            'pyramid': TemporalPyramid(time_series_df),
+        }
+
+    def sync(self, snapshot: Optional[Dict[str, object]]) -> Dict[str, object]:
+        """Struktur trend terkini setelah menerapkan batch sensor yang belum diterapkan"""
+        if snapshot is None:
+            return self.view
+        with self._lock:
+            if snapshot['version'] > self.applied:
+                rows = live_delta(snapshot, self.applied)
+                if not rows.empty:
+                    self.view = self._apply(rows, snapshot['version'])
+                self.applied = snapshot['version']
+            return self.view
+
+    def _apply(self, live: pd.DataFrame, version: int) -> Dict[str, object]:
+        previous = self.view['frame']
+        frame, rows = merge_live_rows(previous, live)
+        frame.attrs['data_version'] = f"{self.base_version}-live{version}"
+
+        indexes = {}
+        for days, index in self.view['indexes'].items():
+            indexes[days] = copy.copy(index)
+            indexes[days].append(rows, previous, days)
+        cube = copy.copy(self.view['cube'])
+        cube.stats = dict(cube.stats)
+        cube.append(rows, previous)
+        pyramid = copy.copy(self.view['pyramid'])
+        pyramid.levels, pyramid.offsets = dict(pyramid.levels), dict(pyramid.offsets)
+        pyramid.append(rows, frame)
+        return {'version': frame.attrs['data_version'], 'frame': frame, 'indexes': indexes,
+                'cube': cube, 'pyramid': pyramid}
+
+
+class IngestionWorker:
+    """Thread latar yang mengambil pembacaan per micro-batch dan memperbarui agregat"""
+
+    def __init__(self, source, store: Optional[ReadingStore] = None, aggregates: Optional[LiveAggregates] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, interval: float = DEFAULT_POLL_INTERVAL):
+        self.source = source
+        self.store = store or ReadingStore()
+        self.aggregates = aggregates or LiveAggregates()
+        self.batch_size = batch_size
+        self.interval = interval
+        self.rejected = 0
+        self.batches = 0
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        """Memproses satu micro-batch; mengembalikan jumlah baris yang dibaca dari sumber"""
+        lines = self.source.poll(self.batch_size)
+        if not lines:
+            return 0
+        batch = parse_readings(lines)
+        self.rejected += batch.attrs['rejected']
+        if not batch.empty:
+            self.store.append(batch, self.source.position())
+            self.aggregates.update(batch)
+            self.batches += 1
+        return len(lines)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                consumed = self.run_once()
+                self.last_error = None
+            except Exception as exc:  # worker tetap hidup; kesalahan ditampilkan di dashboard
+                self.last_error = f'{type(exc).__name__}: {exc}'
+                consumed = 0
+            # Sumber masih penuh: langsung ambil batch berikutnya
+            if consumed < self.batch_size:
+                self._stop.wait(self.interval)
+
+    def start(self) -> 'IngestionWorker':
+        # Pembacaan tersimpan (dalam batas retensi) dipulihkan sebelum melanjutkan dari posisi terakhir
+        self.store.compact()
+        self.aggregates.update(self.store.read())
+        self.source.seek(self.store.checkpoint())
+        self._thread = threading.Thread(target=self._run, name='sumatera-ingestion', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def ingestion_worker_from_env() -> Optional[IngestionWorker]:
+    """Menjalankan worker ingest bila ``SUMATERA_INGEST_FILE`` atau ``SUMATERA_INGEST_PORT`` diset"""
+    path = os.environ.get('SUMATERA_INGEST_FILE')
+    port = os.environ.get('SUMATERA_INGEST_PORT')
+    if path:
+        source = FileTailSource(Path(path))
+    elif port:
+        source = SocketSource(os.environ.get('SUMATERA_INGEST_HOST', '127.0.0.1'), int(port))
+    else:
+        return None
+    store = ReadingStore(
+        retention_days=float(os.environ.get('SUMATERA_INGEST_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)),
+        max_rows=int(os.environ.get('SUMATERA_INGEST_MAX_ROWS', DEFAULT_MAX_STORED_ROWS))
+    )
+    return IngestionWorker(
+        source,
+        store,
+        batch_size=int(os.environ.get('SUMATERA_INGEST_BATCH', DEFAULT_BATCH_SIZE)),
+        interval=float(os.environ.get('SUMATERA_INGEST_INTERVAL', DEFAULT_POLL_INTERVAL))
+    ).start()
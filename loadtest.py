@@ -0,0 +1,216 @@
+"""Uji beban lokal: banyak sesi dashboard simulasi yang berjalan bersamaan.
+
+Runtime ``AppTest`` Streamlit bersifat global per proses, jadi setiap sesi
+dijalankan di proses sendiri (``spawn``) yang memiliki satu ``AppTest``
+untuk ``main.py``. Seluruh sesi menunggu di satu barrier lalu mulai
+bersamaan, sehingga rerun antar sesi benar-benar tumpang tindih dan saling
+berebut CPU, file cache SQLite bersama dan segmen Arrow, seperti beberapa
+replika server di satu mesin. Cache sumber daya Streamlit tidak dibagi antar
+proses; rerun pertama tiap sesi ikut memuat data ke prosesnya.
+
+Sesi menjelajahi kelima kategori monitoring dalam urutan acak dan mengubah
+widget sidebar (indikator, mode peta, provinsi, rentang waktu, ...). Untuk
+tiap tingkat konkurensi dilaporkan latensi rerun p50/p95/p99, throughput
+(rerun per detik sejak barrier dilepas hingga sesi terakhir selesai) dan
+RSS tiap proses sesi (rata-rata dan maksimum).
+
+Warm-up render di latar dimatikan di proses sesi (``SUMATERA_WARMUP_WORKERS=0``
+bila belum diset) agar tiap sesi tidak membuat process pool sendiri.
+
+Contoh::
+
+    python loadtest.py                           # konkurensi 1, 2, 4, 8
+    python loadtest.py --concurrency 1 4 16 --widget-changes 3
+    python loadtest.py --output loadtest.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+APP_PATH = Path(__file__).resolve().parent / 'main.py'
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8]
+
+# Batas waktu satu rerun di AppTest (detik); rerun pertama memuat data
+RERUN_TIMEOUT = 120
+
+# Batas waktu menunggu seluruh proses sesi siap (detik)
+BARRIER_TIMEOUT = 300
+
+MAX_SELECTED_PROVINCES = 5
+
+
+def process_rss_mb() -> float:
+    """Resident set size proses saat ini (MiB); memakai puncak RSS bila /proc tidak tersedia"""
+    try:
+        with open('/proc/self/status') as handle:
+            for line in handle:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss dalam KiB di Linux, byte di macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def sidebar_widgets(at) -> list:
+    """Widget sidebar yang bisa diubah, kecuali pemilih kategori"""
+    sidebar = at.sidebar
+    return list(sidebar.selectbox[1:]) + list(sidebar.radio) + list(sidebar.multiselect) + list(sidebar.slider)
+
+
+def random_value(widget, rng: np.random.Generator):
+    """Nilai acak yang valid untuk widget"""
+    if widget.type == 'multiselect':
+        size = int(rng.integers(1, min(MAX_SELECTED_PROVINCES, len(widget.options)) + 1))
+        return list(rng.choice(widget.options, size=size, replace=False))
+    if widget.type == 'slider':
+        low, high, step = widget.min, widget.max, widget.step
+        return float(low + step * rng.integers(0, int(round((high - low) / step)) + 1))
+    return widget.options[int(rng.integers(len(widget.options)))]
+
+
+class SimulatedSession:
+    """Satu sesi analis: membuka dashboard, berpindah kategori dan mengubah widget sidebar"""
+
+    def __init__(self, seed: int, widget_changes: int = 2, timeout: float = RERUN_TIMEOUT):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = np.random.default_rng(seed)
+        self.widget_changes = widget_changes
+        self.app = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    def _rerun(self):
+        start = time.perf_counter()
+        try:
+            self.app.run()
+        except Exception:
+            self.errors += 1
+        else:
+            if self.app.exception:
+                self.errors += 1
+        self.latencies.append(time.perf_counter() - start)
+
+    def run(self) -> 'SimulatedSession':
+        self._rerun()
+        if not self.app.sidebar.selectbox:
+            return self
+        pages = list(self.app.sidebar.selectbox[0].options)
+        for page in self.rng.permutation(pages):
+            self.app.sidebar.selectbox[0].set_value(str(page))
+            self._rerun()
+            for _ in range(self.widget_changes):
+                widgets = [widget for widget in sidebar_widgets(self.app) if not widget.disabled]
+                if not widgets:
+                    break
+                widget = widgets[int(self.rng.integers(len(widgets)))]
+                widget.set_value(random_value(widget, self.rng))
+                self._rerun()
+        return self
+
+
+def _init_session_process():
+    # Tiap proses sesi adalah "server" sendiri; warm-up latar per proses akan menggandakan beban
+    os.environ.setdefault('SUMATERA_WARMUP_WORKERS', '0')
+
+
+def run_session(seed: int, widget_changes: int, timeout: float, barrier=None) -> Dict[str, object]:
+    """Satu sesi di proses ini; dengan ``barrier`` sesi baru mulai setelah seluruh proses siap"""
+    session = SimulatedSession(seed, widget_changes, timeout)
+    if barrier is not None:
+        barrier.wait(BARRIER_TIMEOUT)
+    started = time.time()
+    session.run()
+    return {
+        'latencies': session.latencies,
+        'errors': session.errors,
+        'started': started,
+        'finished': time.time(),
+        'rss_mb': process_rss_mb(),
+    }
+
+
+def _session_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_session_process)
+
+
+def run_level(concurrency: int, widget_changes: int, seed: int, timeout: float) -> Dict[str, float]:
+    """Menjalankan ``concurrency`` sesi bersamaan, masing-masing di prosesnya sendiri"""
+    with multiprocessing.get_context('spawn').Manager() as manager, _session_pool(concurrency) as pool:
+        barrier = manager.Barrier(concurrency)
+        futures = [pool.submit(run_session, seed + 1 + index, widget_changes, timeout, barrier)
+                   for index in range(concurrency)]
+        results = [future.result() for future in futures]
+
+    latencies = np.array([latency for result in results for latency in result['latencies']])
+    elapsed = max(result['finished'] for result in results) - min(result['started'] for result in results)
+    rss = np.array([result['rss_mb'] for result in results])
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies.size else (np.nan,) * 3
+    return {
+        'concurrency': concurrency,
+        'reruns': int(latencies.size),
+        'errors': sum(result['errors'] for result in results),
+        'p50_ms': p50 * 1000,
+        'p95_ms': p95 * 1000,
+        'p99_ms': p99 * 1000,
+        'throughput_rps': latencies.size / elapsed if elapsed else np.nan,
+        'rss_mb_mean': float(rss.mean()),
+        'rss_mb_max': float(rss.max()),
+    }
+
+
+def format_row(row: dict) -> str:
+    return (f"{row['concurrency']:>11} {row['reruns']:>7} {row['errors']:>6} {row['p50_ms']:>9.0f} "
+            f"{row['p95_ms']:>9.0f} {row['p99_ms']:>9.0f} {row['throughput_rps']:>10.2f} "
+            f"{row['rss_mb_mean']:>12.0f} {row['rss_mb_max']:>12.0f}")
+
+
+def run_load_test(levels: List[int], widget_changes: int = 2, seed: int = 0,
+                  timeout: float = RERUN_TIMEOUT, warmup: bool = True, log=None) -> List[dict]:
+    """Seluruh tingkat konkurensi berurutan; satu sesi pemanasan lebih dulu mengisi cache bersama di disk"""
+    if warmup:
+        with _session_pool(1) as pool:
+            pool.submit(run_session, seed, 0, timeout).result()
+    results = []
+    for concurrency in levels:
+        row = run_level(concurrency, widget_changes, seed, timeout)
+        results.append(row)
+        if log:
+            log(format_row(row))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=CONCURRENCY_LEVELS)
+    parser.add_argument('--widget-changes', type=int, default=2, help='perubahan widget sidebar per kategori')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=RERUN_TIMEOUT, help='batas waktu satu rerun (detik)')
+    parser.add_argument('--no-warmup', action='store_true', help='tanpa sesi pemanasan (mengukur cold start)')
+    parser.add_argument('--output', type=Path, help='menulis hasil sebagai JSON')
+    args = parser.parse_args(argv)
+
+    print(f"{'concurrency':>11} {'reruns':>7} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'rerun/s':>10} {'RSS MiB/sesi':>12} {'RSS MiB max':>12}")
+    results = run_load_test(args.concurrency, args.widget_changes, args.seed, args.timeout,
+                            warmup=not args.no_warmup, log=print)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 1 if any(row['errors'] for row in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
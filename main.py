@@ -1,16 +1,43 @@
 import streamlit as st
-import folium
-from streamlit_folium import st_folium
+import streamlit.components.v1 as components
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import geopandas as gpd
-from datetime import datetime, timedelta
+from streamlit_folium import st_folium
+from datetime import datetime
 import json
-import random
-from typing import Dict, List, Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from boundaries import LEVELS, BoundaryStore, tier_for_zoom
+from data_sources import SharedFrame, data_version, generate_time_series_frame, get_data_provider
+from datasets import DatasetRegistry
+from downsampling import DOWNSAMPLING_MODES
+from figures import (
+    GHG_CHARTS, correlation_heatmap, fies_comparison, fies_levels, ghg_comparison, ghg_normalized_levels,
+    indicator_bar, ntp_agri_scatter
+)
+from ingestion import LiveTrendState, apply_live_readings, columns_version, ingestion_worker_from_env
+from maps import (
+    create_boundary_map, create_choropleth_map, create_employment_map, create_greenhouse_map, create_poverty_map,
+    create_tiled_map, indicator_columns, indicator_features
+)
+from metrics import get_metrics, span, timed
+from pages import (
+    DEFAULT_POINTS_PER_PIXEL, DETAIL_TABLES, FIGURE_COLUMNS, PAGE_BARS, PAGE_DATASETS, default_trend_provinces,
+    trend_figure, trend_window_range
+)
+from query import IndicatorStore
+from render_cache import RenderCache
+from schema import schema_report
+from shared_cache import configured_ttl, get_shared_cache, shared_memoize
+from tiles import layer_id, tile_server_from_env
+from trends import TREND_INDICATORS, TREND_WINDOWS, TemporalPyramid, resolution_label
+from warmup import warmup_scheduler_from_env
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -54,274 +81,315 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
+# Cache per proses dibatasi TTL dan jumlah entri; di bawahnya ada cache bersama antar replika.
+# SUMATERA_SHARED_CACHE_TTL menggantikan TTL bawaan loader di kedua lapisan
+LOADER_TTL = configured_ttl(60 * 60)
+
+@shared_memoize('sumatera_data', ttl=LOADER_TTL)
+@timed('generate_sumatera_data')
 def generate_sumatera_data():
-    """Generate sample data untuk provinsi di Pulau Sumatera"""
-    sumatera_provinces = [
-        {"name": "Aceh", "lat": 4.695135, "lon": 96.749397, "capital": "Banda Aceh"},
-        {"name": "Sumatera Utara", "lat": 2.1153547, "lon": 99.5450974, "capital": "Medan"},
-        {"name": "Sumatera Barat", "lat": -0.7399397, "lon": 100.8000051, "capital": "Padang"},
-        {"name": "Riau", "lat": 0.2933469, "lon": 101.7068294, "capital": "Pekanbaru"},
-        {"name": "Kepulauan Riau", "lat": 3.9456514, "lon": 108.1428669, "capital": "Tanjung Pinang"},
-        {"name": "Jambi", "lat": -1.4851831, "lon": 102.4380581, "capital": "Jambi"},
-        {"name": "Sumatera Selatan", "lat": -3.3194374, "lon": 103.914399, "capital": "Palembang"},
-        {"name": "Bangka Belitung", "lat": -2.7410513, "lon": 106.4405872, "capital": "Pangkal Pinang"},
-        {"name": "Bengkulu", "lat": -3.8004871, "lon": 102.2655756, "capital": "Bengkulu"},
-        {"name": "Lampung", "lat": -4.5585849, "lon": 105.4068079, "capital": "Bandar Lampung"}
-    ]
-    
-    data = []
-    for province in sumatera_provinces:
-        # Data kemiskinan
-        pou = round(random.uniform(3.5, 18.5), 2)
-        fies_mild = round(random.uniform(18.0, 42.0), 2)
-        fies_moderate = round(random.uniform(9.0, 28.0), 2)
-        fies_severe = round(random.uniform(3.0, 15.0), 2)
-        
-        # Data gas rumah kaca (dalam unit yang sesuai)
-        co_level = round(random.uniform(0.8, 2.5), 3)  # mg/m³
-        no2_level = round(random.uniform(15.0, 85.0), 2)  # µg/m³
-        ch4_level = round(random.uniform(1.8, 3.2), 3)  # ppm
-        
-        # Data ketenagakerjaan
-        ntp = round(random.uniform(95.0, 115.0), 2)  # Nilai Tukar Petani
-        agri_workers = round(random.uniform(25.0, 65.0), 2)  # % penduduk bekerja di pertanian
-        
-        data.append({
-            'province': province['name'],
-            'latitude': province['lat'],
-            'longitude': province['lon'],
-            'capital': province['capital'],
-            'pou_percentage': pou,
-            'fies_mild': fies_mild,
-            'fies_moderate': fies_moderate,
-            'fies_severe': fies_severe,
-            'co_level': co_level,
-            'no2_level': no2_level,
-            'ch4_level': ch4_level,
-            'ntp': ntp,
-            'agri_workers_percentage': agri_workers,
-            'population': random.randint(800000, 14000000)
-        })
-    
-    return pd.DataFrame(data)
+    """Memuat data indikator provinsi di Pulau Sumatera dari sumber data aktif"""
+    return get_data_provider().load()
 
-@st.cache_data
-def generate_time_series_data(provinces: List[str], days: int = 30):
+# Handle bersama: seluruh sesi dalam proses membaca tabel Arrow yang sama tanpa salinan per rerun
+@st.cache_resource(ttl=LOADER_TTL, max_entries=2)
+def get_sumatera_data() -> SharedFrame:
+    """Handle read-only data indikator provinsi"""
+    return SharedFrame.publish('indicators', generate_sumatera_data())
+
+@shared_memoize('time_series_data', ttl=LOADER_TTL)
+@timed('generate_time_series_data')
+def generate_time_series_data(provinces: List[str], days: int = 30, seed: Optional[int] = None):
     """Generate time series data untuk trending"""
-    dates = [datetime.now() - timedelta(days=x) for x in range(days, 0, -1)]
-    
-    time_series = []
-    for date in dates:
-        for province in provinces:
-            time_series.append({
-                'date': date,
-                'province': province,
-                'co_trend': round(random.uniform(0.5, 3.0), 3),
-                'no2_trend': round(random.uniform(10.0, 90.0), 2),
-                'ch4_trend': round(random.uniform(1.5, 3.5), 3),
-                'pou_trend': round(random.uniform(2.0, 20.0), 2),
-                'ntp_trend': round(random.uniform(90.0, 120.0), 2)
-            })
-    
-    return pd.DataFrame(time_series)
+    return generate_time_series_frame(provinces, days, seed)
 
-def create_poverty_map(df: pd.DataFrame, indicator: str):
-    """Membuat peta untuk indikator kemiskinan"""
-    # Koordinat tengah Sumatera
-    center_lat = df['latitude'].mean()
-    center_lon = df['longitude'].mean()
-    
-    m = folium.Map(
-        location=[center_lat, center_lon],
-        zoom_start=6,
-        tiles='OpenStreetMap'
-    )
-    
-    # Color mapping berdasarkan indikator
-    if indicator == 'PoU':
-        values = df['pou_percentage']
-        colormap = folium.LinearColormap(
-            colors=['green', 'yellow', 'orange', 'red'],
-            vmin=values.min(),
-            vmax=values.max(),
-            caption=f'{indicator} (%)'
-        )
-    elif indicator == 'FIES Severe':
-        values = df['fies_severe']
-        colormap = folium.LinearColormap(
-            colors=['lightgreen', 'yellow', 'orange', 'red'],
-            vmin=values.min(),
-            vmax=values.max(),
-            caption=f'{indicator} (%)'
-        )
+@st.cache_resource(ttl=LOADER_TTL, max_entries=4)
+def get_time_series_data(provinces: List[str], days: int = 30) -> SharedFrame:
+    """Handle read-only data time series trend"""
+    return SharedFrame.publish('time_series', generate_time_series_data(provinces, days))
+
+# Frame turunan (melt/normalisasi) dihitung sekali per versi data dan dibagi antar sesi
+DERIVED_FRAMES = {
+    'fies_levels': fies_levels,
+    'ghg_normalized_levels': ghg_normalized_levels,
+}
+
+@st.cache_resource(max_entries=16)
+def get_derived_frame(name: str, version: str, _df: pd.DataFrame) -> pd.DataFrame:
+    """Proyeksi turunan bernama dari frame indikator untuk versi data tertentu"""
+    return DERIVED_FRAMES[name](_df)
+
+@st.cache_resource
+def get_indicator_store():
+    """Database query indikator bersama untuk seluruh sesi dalam satu proses"""
+    return IndicatorStore()
+
+@st.cache_resource
+def get_ingestion_worker():
+    """Worker ingest pembacaan sensor, aktif bila SUMATERA_INGEST_FILE atau SUMATERA_INGEST_PORT diset"""
+    return ingestion_worker_from_env()
+
+@st.cache_resource(max_entries=2)
+@timed('trend_state.build')
+def get_trend_state(version: str, _time_series_df: pd.DataFrame) -> LiveTrendState:
+    """Indeks, kubus statistik dan piramida trend per versi time series dasar; batch sensor diterapkan inkremental"""
+    # Seluruh struktur dibangun dari frame float32 yang sama agar pembaruan inkremental konsisten
+    return LiveTrendState(_time_series_df)
+
+@st.cache_resource
+def get_map_cache():
+    """Cache HTML peta bersama untuk seluruh sesi dalam satu proses"""
+    return RenderCache(max_entries=32, max_bytes=64 * 1024 * 1024)
+
+@st.cache_resource
+def get_figure_cache():
+    """Cache JSON figure Plotly bersama untuk seluruh sesi dalam satu proses"""
+    return RenderCache(max_entries=256, max_bytes=32 * 1024 * 1024)
+
+def render_figure(key: tuple, build):
+    """Menampilkan figure dari cache JSON; ``build`` hanya dipanggil saat cache miss"""
+    def build_json():
+        with span('figure.build'):
+            return build().to_json()
     
-    # Menambahkan markers
-    for idx, row in df.iterrows():
-        if indicator == 'PoU':
-            popup_text = f"""
-            <div style="width: 200px;">
-                <h4>{row['province']}</h4>
-                <b>Ibukota:</b> {row['capital']}<br>
-                <b>PoU:</b> {row['pou_percentage']}%<br>
-                <b>FIES Mild:</b> {row['fies_mild']}%<br>
-                <b>FIES Moderate:</b> {row['fies_moderate']}%<br>
-                <b>FIES Severe:</b> {row['fies_severe']}%<br>
-                <b>Populasi:</b> {row['population']:,}
-            </div>
-            """
-            color_val = row['pou_percentage']
-        else:
-            popup_text = f"""
-            <div style="width: 200px;">
-                <h4>{row['province']}</h4>
-                <b>Ibukota:</b> {row['capital']}<br>
-                <b>FIES Severe:</b> {row['fies_severe']}%<br>
-                <b>FIES Moderate:</b> {row['fies_moderate']}%<br>
-                <b>FIES Mild:</b> {row['fies_mild']}%<br>
-                <b>Populasi:</b> {row['population']:,}
-            </div>
-            """
-            color_val = row['fies_severe']
-        
-        folium.CircleMarker(
-            location=[row['latitude'], row['longitude']],
-            radius=10 + (color_val / values.max()) * 20,
-            popup=folium.Popup(popup_text, max_width=250),
-            color='black',
-            weight=1,
-            fillColor=colormap(color_val),
-            fillOpacity=0.7,
-            tooltip=f"{row['province']}: {color_val}%"
-        ).add_to(m)
+    payload = get_figure_cache().get_or_render(key, build_json)
+    get_metrics().observe_size('figure', str(key[1]), len(payload))
+    with span('figure.render'):
+        st.plotly_chart(pio.from_json(payload), use_container_width=True)
+
+@st.cache_resource
+def get_boundary_store():
+    """Sumber batas wilayah bersama untuk mode choropleth"""
+    return BoundaryStore()
+
+@st.cache_resource
+def get_loader_pool():
+    """Thread pool untuk memuat sumber data di latar selagi halaman mulai dirender"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix='sumatera-prefetch')
+
+@st.cache_resource
+def get_warmup_scheduler():
+    """Pre-render peta dan figure seluruh halaman di latar tiap data dasar baru (SUMATERA_WARMUP_WORKERS)"""
+    return warmup_scheduler_from_env({'map': get_map_cache(), 'figure': get_figure_cache()})
+
+@st.cache_resource
+def get_tile_server():
+    """Server tile lokal, aktif bila SUMATERA_TILE_PORT diset"""
+    return tile_server_from_env()
+
+def render_map(builder, df: pd.DataFrame, indicator: str, width: int, height: int, mode: str = "Marker"):
+    """Menampilkan peta dari cache HTML, membangun ulang hanya bila belum ada"""
+    if mode == "Tile":
+        # Fitur didaftarkan ke server tile; browser hanya mengambil tile yang terlihat
+        server = get_tile_server()
+        version = columns_version(df, indicator_columns(indicator))
+        store = get_boundary_store()
+        boundaries = store.load('provinces', 'high') if store.available('provinces') else None
+        layer = layer_id(indicator, 'polygon' if boundaries is not None else 'point')
+        if not server.store.is_registered(layer, version):
+            server.store.register(layer, version, indicator_features(df, indicator, boundaries))
+        key = ('tile', layer, version)
+        build = lambda: create_tiled_map(df, indicator, server.url_template(layer, version))
+    elif mode == "Choropleth":
+        # Hanya tingkat geometri yang sesuai zoom awal peta yang dikirim
+        tier = tier_for_zoom(6)
+        key = ('choropleth', indicator, tier, columns_version(df, indicator_columns(indicator)))
+        boundaries = get_boundary_store().load('provinces', tier)
+        build = lambda: create_choropleth_map(df, indicator, boundaries)
+    else:
+        key = (builder.__name__, indicator, columns_version(df, indicator_columns(indicator)))
+        build = lambda: builder(df, indicator)
+    def build_html():
+        with span('map.build'):
+            folium_map = build()
+        with span('map.serialize'):
+            return folium_map.get_root().render()
     
-    colormap.add_to(m)
-    return m
+    html = get_map_cache().get_or_render(key, build_html)
+    get_metrics().observe_size('map', indicator, len(html))
+    with span('map.render'):
+        components.html(html, width=width, height=height)
+
+def load_live_readings() -> Optional[dict]:
+    """Snapshot agregat sensor terbaru, atau None bila worker ingest tidak aktif"""
+    worker = get_ingestion_worker()
+    return worker.aggregates.snapshot() if worker is not None else None
+
+def load_indicators(live: Optional[dict]) -> pd.DataFrame:
+    """Tabel indikator per provinsi dengan nilai sensor terbaru"""
+    df = get_sumatera_data().frame()
+    # Nilai gas terbaru dari worker ingest (bila aktif) menggantikan nilai dasar
+    if live is not None:
+        df = apply_live_readings(df, live)
+    return df
 
-def create_greenhouse_map(df: pd.DataFrame, gas_type: str):
-    """Membuat peta untuk gas rumah kaca"""
-    center_lat = df['latitude'].mean()
-    center_lon = df['longitude'].mean()
+def load_base_time_series(df: pd.DataFrame) -> pd.DataFrame:
+    """Time series trend dasar seluruh provinsi (tanpa data sensor)"""
+    return get_time_series_data(df['province'].tolist(), days=max(TREND_WINDOWS.values())).frame()
+
+def load_trends(df: pd.DataFrame, live: Optional[dict]) -> dict:
+    """Time series trend seluruh provinsi beserta strukturnya, ditambah rata-rata harian sensor bila ada"""
+    time_series_df = load_base_time_series(df)
+    return get_trend_state(data_version(time_series_df), time_series_df).sync(live)
+
+def build_datasets() -> DatasetRegistry:
+    """Handle dataset untuk satu rerun; masing-masing baru dimuat saat pertama diakses"""
+    datasets = DatasetRegistry()
+    datasets.register('live', load_live_readings)
+    datasets.register('indicators', lambda: load_indicators(datasets['live']))
+    datasets.register('trends', lambda: load_trends(datasets['indicators'], datasets['live']))
+    datasets.register('time_series', lambda: datasets['trends']['frame'])
+    return datasets
+
+# Label tingkat wilayah untuk drill-down
+DRILL_LABELS = {
+    'provinces': "Provinsi",
+    'regencies': "Kabupaten/Kota",
+    'districts': "Kecamatan",
+}
+
+def render_drilldown(boundary_store: BoundaryStore):
+    """Drill-down provinsi -> kabupaten/kota -> kecamatan; wilayah anak dimuat saat diklik"""
+    levels = boundary_store.drill_levels()
+    path = st.session_state.setdefault('drill_path', [])
+    del path[len(levels) - 1:]
+    level = levels[len(path)]
+    parent = path[-1] if path else None
+    name_column = LEVELS[level]['name']
+    can_drill = len(path) + 1 < len(levels)
     
-    m = folium.Map(
-        location=[center_lat, center_lon],
-        zoom_start=6,
-        tiles='OpenStreetMap'
-    )
+    col_path, col_up = st.columns([4, 1])
+    with col_path:
+        st.caption(" › ".join(["Sumatera"] + path))
+    with col_up:
+        if path and st.button("⬆️ Naik", key='drill_up'):
+            path.pop()
+            st.rerun()
     
-    # Color mapping dan unit berdasarkan jenis gas
-    if gas_type == 'CO':
-        values = df['co_level']
-        unit = 'mg/m³'
-        colors = ['lightblue', 'yellow', 'orange', 'red']
-    elif gas_type == 'NO2':
-        values = df['no2_level']
-        unit = 'µg/m³'
-        colors = ['lightgreen', 'yellow', 'orange', 'red']
-    elif gas_type == 'CH4':
-        values = df['ch4_level']
-        unit = 'ppm'
-        colors = ['lightcyan', 'yellow', 'orange', 'darkred']
+    with span('drilldown.units'):
+        units = boundary_store.units(level, parent)
+    if units.empty:
+        st.info(f"Tidak ada data batas {DRILL_LABELS[level].lower()} untuk {parent}.")
+        return
     
-    colormap = folium.LinearColormap(
-        colors=colors,
-        vmin=values.min(),
-        vmax=values.max(),
-        caption=f'{gas_type} ({unit})'
+    drill_key = '/'.join(['drill'] + path)
+    with span('drilldown.st_folium'):
+        result = st_folium(
+            create_boundary_map(units, name_column, DRILL_LABELS[level]),
+            key=drill_key,
+            width=700,
+            height=450,
+            returned_objects=['last_clicked']
+        )
+    selected = st.selectbox(
+        f"Pilih {DRILL_LABELS[level]}:",
+        ["-"] + sorted(units[name_column].tolist()),
+        key=f'{drill_key}_select',
+        disabled=not can_drill
     )
     
-    # Menambahkan markers
-    for idx, row in df.iterrows():
-        popup_text = f"""
-        <div style="width: 200px;">
-            <h4>{row['province']}</h4>
-            <b>Ibukota:</b> {row['capital']}<br>
-            <b>CO:</b> {row['co_level']} mg/m³<br>
-            <b>NO2:</b> {row['no2_level']} µg/m³<br>
-            <b>CH4:</b> {row['ch4_level']} ppm<br>
-        </div>
-        """
-        
-        if gas_type == 'CO':
-            color_val = row['co_level']
-        elif gas_type == 'NO2':
-            color_val = row['no2_level']
-        else:
-            color_val = row['ch4_level']
-        
-        folium.CircleMarker(
-            location=[row['latitude'], row['longitude']],
-            radius=8 + (color_val / values.max()) * 15,
-            popup=folium.Popup(popup_text, max_width=250),
-            color='black',
-            weight=1,
-            fillColor=colormap(color_val),
-            fillOpacity=0.8,
-            tooltip=f"{row['province']}: {color_val} {unit}"
-        ).add_to(m)
-    
-    colormap.add_to(m)
-    return m
+    # Titik klik dicocokkan ke wilayah lewat indeks spasial, lalu tingkat anak dimuat
+    clicked = (result or {}).get('last_clicked')
+    if can_drill and clicked:
+        selected = boundary_store.locate(level, clicked['lng'], clicked['lat'], parent=parent) or selected
+    if can_drill and selected != "-":
+        path.append(selected)
+        st.rerun()
 
-def create_employment_map(df: pd.DataFrame, indicator: str):
-    """Membuat peta untuk indikator ketenagakerjaan"""
-    center_lat = df['latitude'].mean()
-    center_lon = df['longitude'].mean()
-    
-    m = folium.Map(
-        location=[center_lat, center_lon],
-        zoom_start=6,
-        tiles='OpenStreetMap'
-    )
+DETAIL_PAGE_SIZE = 25
+
+def render_detail_table(name: str, store: IndicatorStore, table: str, page_size: int = DETAIL_PAGE_SIZE):
+    """Tabel detail per halaman; filter, urutan dan proyeksi kolom dijalankan di database"""
+    labels = DETAIL_TABLES[name]
+    columns_by_label = {label: column for column, label in labels.items()}
     
-    if indicator == 'NTP':
-        values = df['ntp']
-        unit = ''
-        colors = ['red', 'orange', 'yellow', 'lightgreen', 'green']
-    else:  # Agricultural Workers
-        values = df['agri_workers_percentage']
-        unit = '%'
-        colors = ['lightblue', 'blue', 'darkblue', 'navy']
+    col_search, col_sort, col_order, col_page = st.columns([2, 2, 1, 1])
+    with col_search:
+        search = st.text_input("Cari Provinsi:", key=f'{name}_search').strip()
+    with col_sort:
+        sort_label = st.selectbox("Urutkan:", list(columns_by_label), key=f'{name}_sort')
+    with col_order:
+        descending = st.selectbox("Arah:", ["Naik", "Turun"], key=f'{name}_order') == "Turun"
     
-    colormap = folium.LinearColormap(
-        colors=colors,
-        vmin=values.min(),
-        vmax=values.max(),
-        caption=f'{indicator} {unit}'
-    )
+    with span('table.count'):
+        total = store.count(table, search=search)
+    n_pages = max((total + page_size - 1) // page_size, 1)
+    with col_page:
+        page = st.number_input("Halaman:", min_value=1, value=1, step=1, key=f'{name}_page')
+    page = min(int(page), n_pages)
     
-    # Menambahkan markers
-    for idx, row in df.iterrows():
-        popup_text = f"""
-        <div style="width: 200px;">
-            <h4>{row['province']}</h4>
-            <b>Ibukota:</b> {row['capital']}<br>
-            <b>NTP:</b> {row['ntp']}<br>
-            <b>Pekerja Pertanian:</b> {row['agri_workers_percentage']}%<br>
-            <b>Populasi:</b> {row['population']:,}
-        </div>
-        """
-        
-        if indicator == 'NTP':
-            color_val = row['ntp']
-        else:
-            color_val = row['agri_workers_percentage']
-        
-        folium.CircleMarker(
-            location=[row['latitude'], row['longitude']],
-            radius=8 + (color_val / values.max()) * 15,
-            popup=folium.Popup(popup_text, max_width=250),
-            color='black',
-            weight=1,
-            fillColor=colormap(color_val),
-            fillOpacity=0.8,
-            tooltip=f"{row['province']}: {color_val}{unit}"
-        ).add_to(m)
+    shown = st.multiselect("Kolom:", list(columns_by_label), default=list(columns_by_label), key=f'{name}_columns')
+    columns = [columns_by_label[label] for label in shown] or list(labels)
     
-    colormap.add_to(m)
-    return m
+    # Hanya satu halaman baris dan kolom terpilih yang dikirim ke browser
+    with span('table.query'):
+        page_df = store.select(
+            table, columns, search=search, order_by=columns_by_label[sort_label], descending=descending,
+            limit=page_size, offset=(page - 1) * page_size
+        )
+    page_df.columns = [labels[column] for column in columns]
+    get_metrics().observe_size('table', name, int(page_df.memory_usage(deep=True).sum()))
+    with span('table.render'):
+        st.dataframe(page_df, use_container_width=True, hide_index=True)
+    st.caption(f"Halaman {page} dari {n_pages} · {total} baris")
+
+def render_warmup_progress(progress: dict):
+    """Progres pre-render di sidebar selama warm-up berjalan"""
+    if progress['running'] and progress['total']:
+        st.sidebar.progress(
+            progress['done'] / progress['total'],
+            text=f"Menyiapkan peta & grafik: {progress['done']}/{progress['total']}"
+        )
+
+def debug_enabled() -> bool:
+    """Panel debug hanya tampil bila diminta lewat ``?debug=1`` atau SUMATERA_DEBUG=1"""
+    return st.query_params.get('debug') == '1' or os.environ.get('SUMATERA_DEBUG') == '1'
+
+def render_debug_panel(df: Optional[pd.DataFrame]):
+    """Panel sidebar: span rerun ini, ukuran payload, rasio hit cache dan skema data"""
+    metrics = get_metrics()
+    run = metrics.current_run()
+    with st.sidebar.expander("🐞 Debug", expanded=True):
+        if run is not None:
+            st.caption(f"Rerun ini: {(datetime.now().timestamp() - run['started']) * 1000:.0f} ms")
+            if run['spans']:
+                spans_df = pd.DataFrame(run['spans'])
+                spans_df['name'] = ['· ' * depth + name for depth, name in zip(spans_df['depth'], spans_df['name'])]
+                st.dataframe(spans_df[['name', 'ms']], use_container_width=True, hide_index=True)
+            if run['payloads']:
+                st.markdown("**Payload**")
+                st.dataframe(pd.DataFrame(run['payloads']), use_container_width=True, hide_index=True)
+        st.markdown("**Cache**")
+        st.dataframe(
+            pd.DataFrame.from_dict(metrics.cache_stats(), orient='index')[['hits', 'misses', 'hit_rate']],
+            use_container_width=True
+        )
+        warmup = get_warmup_scheduler()
+        if warmup is not None:
+            st.markdown("**Warm-up**")
+            st.json(warmup.progress(), expanded=False)
+        st.markdown("**Span (seluruh rerun di proses ini)**")
+        st.dataframe(pd.DataFrame(metrics.span_table()), use_container_width=True, hide_index=True)
+        if df is not None:
+            # Laporan tipe data dan byte yang dihemat per kolom
+            st.markdown("**Skema Data**")
+            st.dataframe(schema_report(df), use_container_width=True, hide_index=True)
 
 def main():
+    """Satu rerun dashboard, diinstrumentasi dan diekspor ke file metrik bila diaktifkan"""
+    metrics = get_metrics()
+    metrics.register_cache('map', get_map_cache().stats)
+    metrics.register_cache('figure', get_figure_cache().stats)
+    metrics.register_cache('shared', get_shared_cache().stats)
+    metrics.start_run()
+    try:
+        df = render_dashboard()
+        if debug_enabled():
+            render_debug_panel(df)
+    finally:
+        metrics.end_run()
+
+def render_dashboard() -> Optional[pd.DataFrame]:
     # Header
     st.markdown("""
     <div class="header-style">
@@ -330,23 +398,57 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Load data
-    df = generate_sumatera_data()
-    time_series_df = generate_time_series_data(df['province'].tolist())
-    
     # Sidebar
     st.sidebar.header("🔧 Pengaturan Dashboard")
     
     # Pilihan kategori monitoring
     monitoring_type = st.sidebar.selectbox(
         "Pilih Kategori Monitoring:",
-        ["📊 Overview", "🍽️ Indikator Kemiskinan", "🏭 Gas Rumah Kaca", "👨‍🌾 Ketenagakerjaan", "📈 Analisis Trend"]
+        list(PAGE_DATASETS)
     )
     
+    # Mode choropleth hanya tersedia bila file batas provinsi ada, mode tile bila server tile aktif
+    map_mode = "Marker"
+    map_modes = ["Marker"]
+    if get_boundary_store().available('provinces'):
+        map_modes.append("Choropleth")
+    if get_tile_server() is not None:
+        map_modes.append("Tile")
+    if monitoring_type != "📈 Analisis Trend" and len(map_modes) > 1:
+        map_mode = st.sidebar.radio("Mode Peta:", map_modes, horizontal=True)
+    
+    # Header dan sidebar sudah tampil; batas wilayah dimuat di latar bersamaan dengan data indikator
+    if map_mode == "Choropleth":
+        get_loader_pool().submit(get_boundary_store().load, 'provinces', tier_for_zoom(6))
+    elif map_mode == "Tile" and get_boundary_store().available('provinces'):
+        get_loader_pool().submit(get_boundary_store().load, 'provinces', 'high')
+    
+    get_metrics().current_run()['label'] = monitoring_type
+    
+    # Load data: hanya dataset yang dinyatakan halaman aktif (domain dimuat paralel oleh provider)
+    datasets = build_datasets()
+    with st.spinner("Memuat data indikator..."), span('load_data'):
+        datasets.load(PAGE_DATASETS[monitoring_type])
+    df = datasets['indicators']
+    version = data_version(df)
+    
+    # Data dasar baru (bukan batch sensor): peta dan figure seluruh halaman, termasuk trend,
+    # dirender di latar; time series dasar dimuat oleh thread warm-up, bukan oleh rerun ini
+    warmup = get_warmup_scheduler()
+    if warmup is not None:
+        base_df = get_sumatera_data().frame()
+        warmup.schedule(base_df, lambda: load_base_time_series(base_df))
+        render_warmup_progress(warmup.progress())
+    
+    # Tabel, agregat dan statistik halaman diambil lewat query ke tabel indikator versi ini
+    store = get_indicator_store()
+    indicators = store.ensure_table('indicators', df, version)
+    
     if monitoring_type == "📊 Overview":
         st.header("📊 Ringkasan Indikator Sumatera")
         
         # Statistik overview
+        overview = store.means(indicators, ['pou_percentage', 'co_level', 'ntp', 'agri_workers_percentage'])
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
@@ -356,7 +458,7 @@ def main():
                 <h2>{:.1f}%</h2>
                 <p>Rata-rata PoU</p>
             </div>
-            """.format(df['pou_percentage'].mean()), unsafe_allow_html=True)
+            """.format(overview['pou_percentage']), unsafe_allow_html=True)
         
         with col2:
             st.markdown("""
@@ -365,7 +467,7 @@ def main():
                 <h2>{:.2f}</h2>
                 <p>Rata-rata mg/m³</p>
             </div>
-            """.format(df['co_level'].mean()), unsafe_allow_html=True)
+            """.format(overview['co_level']), unsafe_allow_html=True)
         
         with col3:
             st.markdown("""
@@ -374,7 +476,7 @@ def main():
                 <h2>{:.1f}</h2>
                 <p>Rata-rata Nilai Tukar Petani</p>
             </div>
-            """.format(df['ntp'].mean()), unsafe_allow_html=True)
+            """.format(overview['ntp']), unsafe_allow_html=True)
         
         with col4:
             st.markdown("""
@@ -383,24 +485,21 @@ def main():
                 <h2>{:.1f}%</h2>
                 <p>Rata-rata Pekerja Pertanian</p>
             </div>
-            """.format(df['agri_workers_percentage'].mean()), unsafe_allow_html=True)
+            """.format(overview['agri_workers_percentage']), unsafe_allow_html=True)
         
         # Tabel ringkasan
         st.subheader("📋 Data Provinsi Sumatera")
         
-        summary_df = df[['province', 'capital', 'pou_percentage', 'co_level', 'ntp', 'agri_workers_percentage']].copy()
-        summary_df.columns = ['Provinsi', 'Ibukota', 'PoU (%)', 'CO (mg/m³)', 'NTP', 'Pekerja Pertanian (%)']
-        
-        st.dataframe(
-            summary_df,
-            use_container_width=True,
-            hide_index=True
-        )
+        render_detail_table('overview', store, indicators)
         
         # Peta overview
         st.subheader("🗺️ Peta Overview Sumatera")
-        overview_map = create_poverty_map(df, 'PoU')
-        st_folium(overview_map, width=700, height=500)
+        render_map(create_poverty_map, df, 'PoU', width=700, height=500, mode=map_mode)
+        
+        # Drill-down hanya tersedia bila batas kabupaten/kota ada
+        if len(get_boundary_store().drill_levels()) > 1:
+            st.subheader("🔎 Drill-down Wilayah")
+            render_drilldown(get_boundary_store())
     
     elif monitoring_type == "🍽️ Indikator Kemiskinan":
         st.header("🍽️ Monitoring Indikator Kemiskinan")
@@ -416,57 +515,36 @@ def main():
         with col1:
             st.subheader(f"🗺️ Peta {poverty_indicator}")
             if "PoU" in poverty_indicator:
-                poverty_map = create_poverty_map(df, 'PoU')
+                render_map(create_poverty_map, df, 'PoU', width=600, height=500, mode=map_mode)
             else:
-                poverty_map = create_poverty_map(df, 'FIES Severe')
-            st_folium(poverty_map, width=600, height=500)
+                render_map(create_poverty_map, df, 'FIES Severe', width=600, height=500, mode=map_mode)
         
         with col2:
             st.subheader("📊 Statistik Kemiskinan")
             
             if "PoU" in poverty_indicator:
                 # Bar chart PoU
-                fig_bar = px.bar(
-                    df.sort_values('pou_percentage'),
-                    x='pou_percentage',
-                    y='province',
-                    orientation='h',
-                    title="PoU per Provinsi (%)",
-                    color='pou_percentage',
-                    color_continuous_scale='Reds'
+                render_figure(
+                    (monitoring_type, 'bar', 'PoU', columns_version(df, ['province', 'pou_percentage'])),
+                    lambda: indicator_bar(df, *PAGE_BARS[monitoring_type]['PoU'])
                 )
-                fig_bar.update_layout(height=400)
-                st.plotly_chart(fig_bar, use_container_width=True)
                 
                 # Statistik deskriptif
-                st.metric("Rata-rata PoU", f"{df['pou_percentage'].mean():.2f}%")
-                st.metric("Tertinggi", f"{df['pou_percentage'].max():.2f}%")
-                st.metric("Terendah", f"{df['pou_percentage'].min():.2f}%")
+                stats = store.describe(indicators, 'pou_percentage')
+                st.metric("Rata-rata PoU", f"{stats['mean']:.2f}%")
+                st.metric("Tertinggi", f"{stats['max']:.2f}%")
+                st.metric("Terendah", f"{stats['min']:.2f}%")
             else:
                 # FIES comparison
-                fies_data = df[['province', 'fies_mild', 'fies_moderate', 'fies_severe']].melt(
-                    id_vars=['province'],
-                    var_name='FIES_Level',
-                    value_name='Percentage'
+                fies_version = columns_version(df, FIGURE_COLUMNS['fies'])
+                render_figure(
+                    (monitoring_type, 'fies', fies_version),
+                    lambda: fies_comparison(get_derived_frame('fies_levels', fies_version, df))
                 )
-                
-                fig_fies = px.bar(
-                    fies_data,
-                    x='province',
-                    y='Percentage',
-                    color='FIES_Level',
-                    title="Perbandingan Tingkat FIES",
-                    barmode='stack'
-                )
-                fig_fies.update_xaxes(tickangle=45)
-                fig_fies.update_layout(height=400)
-                st.plotly_chart(fig_fies, use_container_width=True)
         
         # Tabel detail kemiskinan
         st.subheader("📋 Detail Data Kemiskinan")
-        poverty_detail = df[['province', 'pou_percentage', 'fies_mild', 'fies_moderate', 'fies_severe']].copy()
-        poverty_detail.columns = ['Provinsi', 'PoU (%)', 'FIES Mild (%)', 'FIES Moderate (%)', 'FIES Severe (%)']
-        st.dataframe(poverty_detail, use_container_width=True, hide_index=True)
+        render_detail_table('poverty', store, indicators)
     
     elif monitoring_type == "🏭 Gas Rumah Kaca":
         st.header("🏭 Monitoring Gas Rumah Kaca")
@@ -479,78 +557,51 @@ def main():
         
         gas_short = gas_type.split()[0]  # Ambil bagian pertama (CO, NO2, CH4)
         
+        live = datasets['live']
+        if live is not None:
+            st.caption(f"🔴 Data sensor langsung: {live['readings']} pembacaan, batch ke-{live['version']}")
+            if get_ingestion_worker().last_error:
+                st.warning(f"Ingest data sensor gagal: {get_ingestion_worker().last_error}")
+            if get_ingestion_worker().source.skipped:
+                st.warning(f"{get_ingestion_worker().source.skipped} baris sensor terlalu panjang dan dilewati")
+        
         col1, col2 = st.columns([2, 1])
         
         with col1:
             st.subheader(f"🗺️ Peta Konsentrasi {gas_short}")
-            ghg_map = create_greenhouse_map(df, gas_short)
-            st_folium(ghg_map, width=600, height=500)
+            render_map(create_greenhouse_map, df, gas_short, width=600, height=500, mode=map_mode)
         
         with col2:
             st.subheader(f"📊 Statistik {gas_short}")
             
-            if gas_short == 'CO':
-                column = 'co_level'
-                unit = 'mg/m³'
-                color_scale = 'Oranges'
-            elif gas_short == 'NO2':
-                column = 'no2_level'
-                unit = 'µg/m³'
-                color_scale = 'Reds'
-            else:  # CH4
-                column = 'ch4_level'
-                unit = 'ppm'
-                color_scale = 'Blues'
+            column = GHG_CHARTS[gas_short]['column']
+            unit = GHG_CHARTS[gas_short]['unit']
             
             # Bar chart
-            fig_bar = px.bar(
-                df.sort_values(column),
-                x=column,
-                y='province',
-                orientation='h',
-                title=f"{gas_short} per Provinsi ({unit})",
-                color=column,
-                color_continuous_scale=color_scale
+            render_figure(
+                (monitoring_type, 'bar', gas_short, columns_version(df, ['province', column])),
+                lambda: indicator_bar(df, *PAGE_BARS[monitoring_type][gas_short])
             )
-            fig_bar.update_layout(height=400)
-            st.plotly_chart(fig_bar, use_container_width=True)
             
             # Statistik deskriptif
-            st.metric(f"Rata-rata {gas_short}", f"{df[column].mean():.3f} {unit}")
-            st.metric("Tertinggi", f"{df[column].max():.3f} {unit}")
-            st.metric("Terendah", f"{df[column].min():.3f} {unit}")
+            stats = store.describe(indicators, column)
+            st.metric(f"Rata-rata {gas_short}", f"{stats['mean']:.3f} {unit}")
+            st.metric("Tertinggi", f"{stats['max']:.3f} {unit}")
+            st.metric("Terendah", f"{stats['min']:.3f} {unit}")
         
         # Perbandingan semua gas
         st.subheader("📊 Perbandingan Gas Rumah Kaca")
         
-        # Normalize data untuk perbandingan
-        df_normalized = df.copy()
-        df_normalized['co_norm'] = (df['co_level'] - df['co_level'].min()) / (df['co_level'].max() - df['co_level'].min()) * 100
-        df_normalized['no2_norm'] = (df['no2_level'] - df['no2_level'].min()) / (df['no2_level'].max() - df['no2_level'].min()) * 100
-        df_normalized['ch4_norm'] = (df['ch4_level'] - df['ch4_level'].min()) / (df['ch4_level'].max() - df['ch4_level'].min()) * 100
-        
-        ghg_comparison = df_normalized[['province', 'co_norm', 'no2_norm', 'ch4_norm']].melt(
-            id_vars=['province'],
-            var_name='Gas_Type',
-            value_name='Normalized_Level'
-        )
-        
-        fig_comparison = px.bar(
-            ghg_comparison,
-            x='province',
-            y='Normalized_Level',
-            color='Gas_Type',
-            title="Perbandingan Relatif Gas Rumah Kaca (Normalized)",
-            barmode='group'
+        # Normalisasi dan melt hanya dijalankan saat figure belum ada di cache
+        comparison_version = columns_version(df, FIGURE_COLUMNS['comparison'])
+        render_figure(
+            (monitoring_type, 'comparison', comparison_version),
+            lambda: ghg_comparison(get_derived_frame('ghg_normalized_levels', comparison_version, df))
         )
-        fig_comparison.update_xaxes(tickangle=45)
-        st.plotly_chart(fig_comparison, use_container_width=True)
         
         # Tabel detail gas rumah kaca
         st.subheader("📋 Detail Data Gas Rumah Kaca")
-        ghg_detail = df[['province', 'co_level', 'no2_level', 'ch4_level']].copy()
-        ghg_detail.columns = ['Provinsi', 'CO (mg/m³)', 'NO2 (µg/m³)', 'CH4 (ppm)']
-        st.dataframe(ghg_detail, use_container_width=True, hide_index=True)
+        render_detail_table('ghg', store, indicators)
     
     elif monitoring_type == "👨‍🌾 Ketenagakerjaan":
         st.header("👨‍🌾 Monitoring Ketenagakerjaan")
@@ -566,73 +617,50 @@ def main():
         with col1:
             st.subheader(f"🗺️ Peta {employment_indicator}")
             if "NTP" in employment_indicator:
-                emp_map = create_employment_map(df, 'NTP')
+                render_map(create_employment_map, df, 'NTP', width=600, height=500, mode=map_mode)
             else:
-                emp_map = create_employment_map(df, 'Agricultural Workers')
-            st_folium(emp_map, width=600, height=500)
+                render_map(create_employment_map, df, 'Agricultural Workers', width=600, height=500, mode=map_mode)
         
         with col2:
             st.subheader("📊 Statistik Ketenagakerjaan")
             
             if "NTP" in employment_indicator:
                 # Bar chart NTP
-                fig_bar = px.bar(
-                    df.sort_values('ntp'),
-                    x='ntp',
-                    y='province',
-                    orientation='h',
-                    title="NTP per Provinsi",
-                    color='ntp',
-                    color_continuous_scale='RdYlGn'
+                render_figure(
+                    (monitoring_type, 'bar', 'NTP', columns_version(df, ['province', 'ntp'])),
+                    lambda: indicator_bar(df, *PAGE_BARS[monitoring_type]['NTP'])
                 )
-                fig_bar.update_layout(height=400)
-                st.plotly_chart(fig_bar, use_container_width=True)
                 
                 # Interpretasi NTP
                 st.info("NTP > 100: Kondisi petani membaik\nNTP < 100: Kondisi petani memburuk")
                 
                 # Statistik deskriptif
-                st.metric("Rata-rata NTP", f"{df['ntp'].mean():.2f}")
-                st.metric("Tertinggi", f"{df['ntp'].max():.2f}")
-                st.metric("Terendah", f"{df['ntp'].min():.2f}")
+                stats = store.describe(indicators, 'ntp')
+                st.metric("Rata-rata NTP", f"{stats['mean']:.2f}")
+                st.metric("Tertinggi", f"{stats['max']:.2f}")
+                st.metric("Terendah", f"{stats['min']:.2f}")
             else:
                 # Bar chart Agricultural Workers
-                fig_bar = px.bar(
-                    df.sort_values('agri_workers_percentage'),
-                    x='agri_workers_percentage',
-                    y='province',
-                    orientation='h',
-                    title="Pekerja Pertanian per Provinsi (%)",
-                    color='agri_workers_percentage',
-                    color_continuous_scale='Greens'
+                render_figure(
+                    (monitoring_type, 'bar', 'Agricultural Workers', columns_version(df, ['province', 'agri_workers_percentage'])),
+                    lambda: indicator_bar(df, *PAGE_BARS[monitoring_type]['Agricultural Workers'])
                 )
-                fig_bar.update_layout(height=400)
-                st.plotly_chart(fig_bar, use_container_width=True)
                 
                 # Statistik deskriptif
-                st.metric("Rata-rata", f"{df['agri_workers_percentage'].mean():.2f}%")
-                st.metric("Tertinggi", f"{df['agri_workers_percentage'].max():.2f}%")
-                st.metric("Terendah", f"{df['agri_workers_percentage'].min():.2f}%")
+                stats = store.describe(indicators, 'agri_workers_percentage')
+                st.metric("Rata-rata", f"{stats['mean']:.2f}%")
+                st.metric("Tertinggi", f"{stats['max']:.2f}%")
+                st.metric("Terendah", f"{stats['min']:.2f}%")
         
         # Analisis korelasi NTP dan Pekerja Pertanian
         st.subheader("🔍 Analisis Hubungan NTP dan Pekerja Pertanian")
         
-        fig_scatter = px.scatter(
-            df,
-            x='ntp',
-            y='agri_workers_percentage',
-            text='province',
-            title="Hubungan NTP dan Persentase Pekerja Pertanian",
-            labels={'ntp': 'Nilai Tukar Petani', 'agri_workers_percentage': 'Pekerja Pertanian (%)'}
-        )
-        fig_scatter.update_traces(textposition="top center")
-        st.plotly_chart(fig_scatter, use_container_width=True)
+        render_figure((monitoring_type, 'scatter', columns_version(df, FIGURE_COLUMNS['scatter'])),
+                      lambda: ntp_agri_scatter(df))
         
         # Tabel detail ketenagakerjaan
         st.subheader("📋 Detail Data Ketenagakerjaan")
-        employment_detail = df[['province', 'ntp', 'agri_workers_percentage']].copy()
-        employment_detail.columns = ['Provinsi', 'NTP', 'Pekerja Pertanian (%)']
-        st.dataframe(employment_detail, use_container_width=True, hide_index=True)
+        render_detail_table('employment', store, indicators)
     
     elif monitoring_type == "📈 Analisis Trend":
         st.header("📈 Analisis Trend Temporal")
@@ -641,86 +669,64 @@ def main():
         selected_provinces = st.sidebar.multiselect(
             "Pilih Provinsi:",
             df['province'].tolist(),
-            default=df['province'].tolist()[:3]
+            default=default_trend_provinces(df)
         )
         
         if not selected_provinces:
             st.warning("Silakan pilih minimal satu provinsi untuk analisis trend.")
-            return
-        
-        # Filter data berdasarkan provinsi yang dipilih
-        filtered_ts = time_series_df[time_series_df['province'].isin(selected_provinces)]
+            return df
         
         # Pilihan indikator untuk trend
         trend_indicator = st.sidebar.selectbox(
             "Pilih Indikator Trend:",
-            ["CO Level", "NO2 Level", "CH4 Level", "PoU Trend", "NTP Trend"]
+            list(TREND_INDICATORS)
+        )
+        trend_window = st.sidebar.selectbox(
+            "Rentang Waktu:",
+            list(TREND_WINDOWS)
         )
+        window_days = TREND_WINDOWS[trend_window]
+        downsampling = st.sidebar.selectbox(
+            "Downsampling Grafik:",
+            list(DOWNSAMPLING_MODES)
+        )
+        points_per_pixel = st.sidebar.slider("Titik per Piksel:", 0.25, 4.0, DEFAULT_POINTS_PER_PIXEL, step=0.25)
+        
+        # Time series (beserta rata-rata harian sensor) dan strukturnya hanya dimuat di halaman ini
+        trends = datasets['trends']
+        time_series_df = trends['frame']
+        
+        # Titik grafik diambil dari piramida agregat dengan resolusi yang menjaga jumlah titik
+        chart = TREND_INDICATORS[trend_indicator]
+        ts_version = trends['version']
+        start_date, end_date = trend_window_range(time_series_df, trend_window)
+        resolution = TemporalPyramid.select_resolution(start_date, end_date, len(selected_provinces))
+        
+        def build_trend_figure():
+            # Downsampling per provinsi dilakukan sebelum figure dibuat
+            return trend_figure(
+                time_series_df, selected_provinces, trend_indicator, trend_window, downsampling, points_per_pixel,
+                pyramid=trends['pyramid']
+            )
         
-        st.subheader(f"📊 Trend {trend_indicator} - 30 Hari Terakhir")
+        st.subheader(f"📊 Trend {trend_indicator} - {trend_window} ({resolution_label(resolution)})")
         
         # Membuat grafik trend
-        if trend_indicator == "CO Level":
-            fig_trend = px.line(
-                filtered_ts,
-                x='date',
-                y='co_trend',
-                color='province',
-                title="Trend Konsentrasi CO (mg/m³)",
-                labels={'co_trend': 'CO (mg/m³)', 'date': 'Tanggal'}
-            )
-        elif trend_indicator == "NO2 Level":
-            fig_trend = px.line(
-                filtered_ts,
-                x='date',
-                y='no2_trend',
-                color='province',
-                title="Trend Konsentrasi NO2 (µg/m³)",
-                labels={'no2_trend': 'NO2 (µg/m³)', 'date': 'Tanggal'}
-            )
-        elif trend_indicator == "CH4 Level":
-            fig_trend = px.line(
-                filtered_ts,
-                x='date',
-                y='ch4_trend',
-                color='province',
-                title="Trend Konsentrasi CH4 (ppm)",
-                labels={'ch4_trend': 'CH4 (ppm)', 'date': 'Tanggal'}
-            )
-        elif trend_indicator == "PoU Trend":
-            fig_trend = px.line(
-                filtered_ts,
-                x='date',
-                y='pou_trend',
-                color='province',
-                title="Trend PoU (%)",
-                labels={'pou_trend': 'PoU (%)', 'date': 'Tanggal'}
-            )
-        else:  # NTP Trend
-            fig_trend = px.line(
-                filtered_ts,
-                x='date',
-                y='ntp_trend',
-                color='province',
-                title="Trend NTP",
-                labels={'ntp_trend': 'NTP', 'date': 'Tanggal'}
-            )
-            # Tambahkan garis referensi pada 100 untuk NTP
-            fig_trend.add_hline(y=100, line_dash="dash", line_color="red", 
-                              annotation_text="NTP = 100 (Break Even)")
-        
-        fig_trend.update_layout(height=500)
-        st.plotly_chart(fig_trend, use_container_width=True)
+        render_figure(
+            (monitoring_type, 'trend', trend_indicator, tuple(selected_provinces), trend_window,
+             downsampling, points_per_pixel, ts_version),
+            build_trend_figure
+        )
         
-        # Statistik trend
+        # Statistik trend dari indeks per provinsi (tanpa memindai ulang baris)
+        trend_index = trends['indexes'][window_days]
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("📊 Statistik Trend Terkini")
             
-            for province in selected_provinces:
-                prov_data = filtered_ts[filtered_ts['province'] == province].iloc[-1]  # Data terbaru
-                
+            latest = trend_index.latest(selected_provinces)
+            for province, prov_data in latest.iterrows():
                 with st.expander(f"📍 {province}"):
                     col_a, col_b = st.columns(2)
                     with col_a:
@@ -735,85 +741,31 @@ def main():
             st.subheader("📈 Analisis Perubahan")
             
             # Hitung perubahan dari awal ke akhir periode
-            trend_changes = []
-            for province in selected_provinces:
-                prov_ts = filtered_ts[filtered_ts['province'] == province].sort_values('date')
-                if len(prov_ts) >= 2:
-                    first_day = prov_ts.iloc[0]
-                    last_day = prov_ts.iloc[-1]
-                    
-                    if trend_indicator == "CO Level":
-                        change = ((last_day['co_trend'] - first_day['co_trend']) / first_day['co_trend']) * 100
-                        unit = "mg/m³"
-                    elif trend_indicator == "NO2 Level":
-                        change = ((last_day['no2_trend'] - first_day['no2_trend']) / first_day['no2_trend']) * 100
-                        unit = "µg/m³"
-                    elif trend_indicator == "CH4 Level":
-                        change = ((last_day['ch4_trend'] - first_day['ch4_trend']) / first_day['ch4_trend']) * 100
-                        unit = "ppm"
-                    elif trend_indicator == "PoU Trend":
-                        change = ((last_day['pou_trend'] - first_day['pou_trend']) / first_day['pou_trend']) * 100
-                        unit = "%"
-                    else:  # NTP Trend
-                        change = ((last_day['ntp_trend'] - first_day['ntp_trend']) / first_day['ntp_trend']) * 100
-                        unit = ""
-                    
-                    trend_changes.append({
-                        'province': province,
-                        'change_percent': change,
-                        'trend': "📈 Naik" if change > 0 else "📉 Turun" if change < 0 else "➡️ Stabil"
-                    })
-            
-            if trend_changes:
-                trend_df = pd.DataFrame(trend_changes)
-                for _, row in trend_df.iterrows():
-                    color = "normal"
-                    if row['change_percent'] > 5:
-                        color = "normal"  # Bisa disesuaikan dengan warna yang diinginkan
-                    elif row['change_percent'] < -5:
-                        color = "inverse"
-                    
-                    st.metric(
-                        row['province'],
-                        f"{row['change_percent']:.1f}%",
-                        delta=f"{row['trend']}"
-                    )
+            trend_df = trend_index.changes(selected_provinces, chart['column'])
+            for row in trend_df.itertuples(index=False):
+                st.metric(
+                    row.province,
+                    f"{row.change_percent:.1f}%",
+                    delta=f"{row.trend}"
+                )
         
         # Heatmap korelasi indikator
         st.subheader("🔥 Heatmap Korelasi Antar Indikator")
         
-        # Aggregate data untuk korelasi
-        correlation_data = []
-        for province in selected_provinces:
-            prov_ts = filtered_ts[filtered_ts['province'] == province]
-            if len(prov_ts) > 0:
-                avg_data = {
-                    'province': province,
-                    'CO': prov_ts['co_trend'].mean(),
-                    'NO2': prov_ts['no2_trend'].mean(),
-                    'CH4': prov_ts['ch4_trend'].mean(),
-                    'PoU': prov_ts['pou_trend'].mean(),
-                    'NTP': prov_ts['ntp_trend'].mean()
-                }
-                correlation_data.append(avg_data)
-        
-        if correlation_data:
-            corr_df = pd.DataFrame(correlation_data).set_index('province')
-            correlation_matrix = corr_df.corr()
-            
-            fig_heatmap = px.imshow(
-                correlation_matrix,
-                title="Korelasi Antar Indikator",
-                color_continuous_scale='RdBu',
-                aspect='auto'
-            )
-            fig_heatmap.update_layout(height=400)
-            st.plotly_chart(fig_heatmap, use_container_width=True)
+        # Korelasi dirakit dari statistik cukup per provinsi, tanpa memindai baris time series
+        statistics_cube = trends['cube']
+        render_figure(
+            (monitoring_type, 'heatmap', tuple(selected_provinces), trend_window, ts_version),
+            lambda: correlation_heatmap(statistics_cube.correlation(window_days, selected_provinces))
+        )
+        
+        # Rata-rata per provinsi untuk tabel ringkasan
+        corr_df = trend_index.correlation_input(selected_provinces)
         
         # Tabel summary trend
         st.subheader("📋 Summary Data Trend Terkini")
-        if correlation_data:
-            summary_trend_df = pd.DataFrame(correlation_data)
+        if not corr_df.empty:
+            summary_trend_df = corr_df.reset_index()
             summary_trend_df.columns = ['Provinsi', 'CO (mg/m³)', 'NO2 (µg/m³)', 'CH4 (ppm)', 'PoU (%)', 'NTP']
             st.dataframe(summary_trend_df, use_container_width=True, hide_index=True)
     
@@ -826,6 +778,7 @@ def main():
         Dikembangkan dengan Streamlit</p>
     </div>
     """, unsafe_allow_html=True)
+    return df
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
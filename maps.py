@@ -0,0 +1,458 @@
+"""Mesin peta indikator berbasis konfigurasi.
+
+Seluruh peta (kemiskinan, gas rumah kaca, ketenagakerjaan) dibangun oleh
+``create_indicator_map``. Radius, warna dan data popup dihitung per kolom,
+lalu dikirim sebagai satu layer sehingga marker dibuat di browser, bukan
+lewat loop Python per baris.
+"""
+from typing import Dict, List, Optional
+
+import folium
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from folium.map import Layer
+from jinja2 import Template
+
+from schema import decimal_float64, display_frame
+
+# Field popup: (label, kolom, akhiran satuan, format ribuan)
+POVERTY_POPUP_FIELDS = [
+    ('PoU', 'pou_percentage', '%', False),
+    ('FIES Mild', 'fies_mild', '%', False),
+    ('FIES Moderate', 'fies_moderate', '%', False),
+    ('FIES Severe', 'fies_severe', '%', False),
+    ('Populasi', 'population', '', True),
+]
+
+GHG_POPUP_FIELDS = [
+    ('CO', 'co_level', ' mg/m³', False),
+    ('NO2', 'no2_level', ' µg/m³', False),
+    ('CH4', 'ch4_level', ' ppm', False),
+]
+
+EMPLOYMENT_POPUP_FIELDS = [
+    ('NTP', 'ntp', '', False),
+    ('Pekerja Pertanian', 'agri_workers_percentage', '%', False),
+    ('Populasi', 'population', '', True),
+]
+
+# Konfigurasi per indikator peta
+MAP_INDICATORS: Dict[str, dict] = {
+    'PoU': {
+        'column': 'pou_percentage',
+        'caption': 'PoU (%)',
+        'tooltip_unit': '%',
+        'colors': ['green', 'yellow', 'orange', 'red'],
+        'radius': (10, 20),
+        'fill_opacity': 0.7,
+        'popup_fields': POVERTY_POPUP_FIELDS,
+    },
+    'FIES Severe': {
+        'column': 'fies_severe',
+        'caption': 'FIES Severe (%)',
+        'tooltip_unit': '%',
+        'colors': ['lightgreen', 'yellow', 'orange', 'red'],
+        'radius': (10, 20),
+        'fill_opacity': 0.7,
+        'popup_fields': [POVERTY_POPUP_FIELDS[i] for i in (3, 2, 1, 4)],
+    },
+    'CO': {
+        'column': 'co_level',
+        'caption': 'CO (mg/m³)',
+        'tooltip_unit': ' mg/m³',
+        'colors': ['lightblue', 'yellow', 'orange', 'red'],
+        'radius': (8, 15),
+        'fill_opacity': 0.8,
+        'popup_fields': GHG_POPUP_FIELDS,
+    },
+    'NO2': {
+        'column': 'no2_level',
+        'caption': 'NO2 (µg/m³)',
+        'tooltip_unit': ' µg/m³',
+        'colors': ['lightgreen', 'yellow', 'orange', 'red'],
+        'radius': (8, 15),
+        'fill_opacity': 0.8,
+        'popup_fields': GHG_POPUP_FIELDS,
+    },
+    'CH4': {
+        'column': 'ch4_level',
+        'caption': 'CH4 (ppm)',
+        'tooltip_unit': ' ppm',
+        'colors': ['lightcyan', 'yellow', 'orange', 'darkred'],
+        'radius': (8, 15),
+        'fill_opacity': 0.8,
+        'popup_fields': GHG_POPUP_FIELDS,
+    },
+    'NTP': {
+        'column': 'ntp',
+        'caption': 'NTP ',
+        'tooltip_unit': '',
+        'colors': ['red', 'orange', 'yellow', 'lightgreen', 'green'],
+        'radius': (8, 15),
+        'fill_opacity': 0.8,
+        'popup_fields': EMPLOYMENT_POPUP_FIELDS,
+    },
+    'Agricultural Workers': {
+        'column': 'agri_workers_percentage',
+        'caption': 'Agricultural Workers %',
+        'tooltip_unit': '%',
+        'colors': ['lightblue', 'blue', 'darkblue', 'navy'],
+        'radius': (8, 15),
+        'fill_opacity': 0.8,
+        'popup_fields': EMPLOYMENT_POPUP_FIELDS,
+    },
+}
+
+
+# Fungsi JS pembentuk HTML popup, dipakai bersama oleh layer marker dan layer tile
+POPUP_HTML_JS = """
+    function popupHtml(fields, title, valueOf) {
+        var html = '<div style="width: 200px;"><h4>' + title + '</h4>';
+        for (var f = 0; f < fields.length; f++) {
+            var value = valueOf(fields[f].column);
+            if (fields[f].thousands) {
+                value = Number(value).toLocaleString('en-US');
+            }
+            html += '<b>' + fields[f].label + ':</b> ' + value + fields[f].suffix + '<br>';
+        }
+        return html + '</div>';
+    }
+"""
+
+
+class BulkCircleLayer(Layer):
+    """Layer CircleMarker yang datanya dikirim sebagai array kolom dan dibangun di browser"""
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var data = {{ this.data|tojson }};
+                var fields = {{ this.popup_fields|tojson }};
+                var group = L.featureGroup();
+                {{ this.popup_js }}
+
+                function markerPopup(i) {
+                    return popupHtml(fields, data.title[i], function(column) {
+                        return data.fields[column][i];
+                    });
+                }
+
+                for (var i = 0; i < data.lat.length; i++) {
+                    var marker = L.circleMarker([data.lat[i], data.lon[i]], {
+                        radius: data.radius[i],
+                        color: 'black',
+                        weight: 1,
+                        fillColor: data.fill[i],
+                        fillOpacity: {{ this.fill_opacity }}
+                    });
+                    marker.bindTooltip(data.tooltip[i], {sticky: true});
+                    marker.bindPopup(markerPopup.bind(null, i), {maxWidth: 250});
+                    group.addLayer(marker);
+                }
+                return group;
+            })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, data: dict, popup_fields: List[dict], fill_opacity: float = 0.8,
+                 name: str = None, overlay: bool = True, control: bool = True, show: bool = True):
+        super().__init__(name=name, overlay=overlay, control=control, show=show)
+        self._name = 'BulkCircleLayer'
+        self.data = data
+        self.popup_fields = popup_fields
+        self.fill_opacity = fill_opacity
+        self.popup_js = POPUP_HTML_JS
+
+
+class TiledGeoJsonLayer(Layer):
+    """Layer yang mengambil tile GeoJSON z/x/y yang terlihat saja dari server tile"""
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var urlTemplate = {{ this.url_template|tojson }};
+                var fields = {{ this.popup_fields|tojson }};
+                var minZoom = {{ this.min_zoom }}, maxZoom = {{ this.max_zoom }};
+                var group = L.featureGroup();
+                var loaded = {};
+                var currentZoom = null;
+                {{ this.popup_js }}
+
+                function lon2tile(lon, z) {
+                    return Math.floor((lon + 180) / 360 * Math.pow(2, z));
+                }
+                function lat2tile(lat, z) {
+                    var rad = lat * Math.PI / 180;
+                    return Math.floor((1 - Math.log(Math.tan(rad) + 1 / Math.cos(rad)) / Math.PI) / 2 * Math.pow(2, z));
+                }
+                var options = {
+                    pointToLayer: function(feature, latlng) {
+                        return L.circleMarker(latlng, {radius: feature.properties.radius});
+                    },
+                    style: function(feature) {
+                        var isPoint = feature.geometry.type === 'Point';
+                        return {
+                            color: 'black',
+                            weight: isPoint ? 1 : 0,
+                            fillColor: feature.properties.fill,
+                            fillOpacity: {{ this.fill_opacity }}
+                        };
+                    },
+                    onEachFeature: function(feature, layer) {
+                        var p = feature.properties;
+                        layer.bindTooltip(p.tooltip, {sticky: true});
+                        layer.bindPopup(function() {
+                            return popupHtml(fields, p.title, function(column) { return p[column]; });
+                        }, {maxWidth: 250});
+                    }
+                };
+
+                function refresh() {
+                    var map = group._map;
+                    if (!map) { return; }
+                    var z = Math.max(minZoom, Math.min(maxZoom, Math.round(map.getZoom())));
+                    if (z !== currentZoom) {
+                        group.clearLayers();
+                        loaded = {};
+                        currentZoom = z;
+                    }
+                    var bounds = map.getBounds();
+                    var x0 = lon2tile(bounds.getWest(), z), x1 = lon2tile(bounds.getEast(), z);
+                    var y0 = lat2tile(bounds.getNorth(), z), y1 = lat2tile(bounds.getSouth(), z);
+                    for (var x = x0; x <= x1; x++) {
+                        for (var y = y0; y <= y1; y++) {
+                            var key = z + '/' + x + '/' + y;
+                            if (loaded[key]) { continue; }
+                            loaded[key] = true;
+                            var url = urlTemplate.replace('{z}', z).replace('{x}', x).replace('{y}', y);
+                            fetch(url).then(function(response) {
+                                return response.ok ? response.json() : null;
+                            }).then(function(tileZoom, geojson) {
+                                if (geojson && tileZoom === currentZoom) {
+                                    group.addLayer(L.geoJSON(geojson, options));
+                                }
+                            }.bind(null, z));
+                        }
+                    }
+                }
+
+                group.on('add', function() {
+                    group._map.on('moveend', refresh);
+                    refresh();
+                });
+                group.on('remove', function(event) {
+                    event.target._map && event.target._map.off('moveend', refresh);
+                });
+                return group;
+            })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, url_template: str, popup_fields: List[dict], fill_opacity: float = 0.8,
+                 min_zoom: int = 4, max_zoom: int = 14,
+                 name: str = None, overlay: bool = True, control: bool = True, show: bool = True):
+        super().__init__(name=name, overlay=overlay, control=control, show=show)
+        self._name = 'TiledGeoJsonLayer'
+        self.url_template = url_template
+        self.popup_fields = popup_fields
+        self.fill_opacity = fill_opacity
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.popup_js = POPUP_HTML_JS
+
+
+def colormap_hex(colormap: folium.LinearColormap, values: np.ndarray) -> np.ndarray:
+    """Mengonversi array nilai ke warna hex sekaligus (interpolasi linier per kanal)"""
+    index = np.asarray(colormap.index, dtype=float)
+    rgba = np.asarray(colormap.colors, dtype=float)
+    clipped = np.clip(values, index[0], index[-1])
+    channels = [np.interp(clipped, index, rgba[:, c]) for c in range(3)]
+    ints = np.rint(np.stack(channels, axis=1) * 255).astype(np.uint8)
+    packed = (ints[:, 0].astype(np.uint32) << 16) | (ints[:, 1].astype(np.uint32) << 8) | ints[:, 2]
+    return np.char.add('#', np.char.zfill(np.char.mod('%x', packed), 6))
+
+
+def indicator_colormap(df: pd.DataFrame, config: dict) -> folium.LinearColormap:
+    """Colormap linier dari nilai minimum ke maksimum indikator"""
+    values = decimal_float64(df[config['column']])
+    return folium.LinearColormap(
+        colors=config['colors'],
+        vmin=values.min(),
+        vmax=values.max(),
+        caption=config['caption']
+    )
+
+
+def popup_field_specs(config: dict) -> List[dict]:
+    """Spesifikasi field popup untuk fungsi popupHtml di browser"""
+    popup_fields = [{'label': 'Ibukota', 'column': 'capital', 'suffix': '', 'thousands': False}]
+    popup_fields += [
+        {'label': label, 'column': column, 'suffix': suffix, 'thousands': thousands}
+        for label, column, suffix, thousands in config['popup_fields']
+    ]
+    return popup_fields
+
+
+def indicator_columns(indicator: str) -> List[str]:
+    """Kolom frame indikator yang dibaca peta satu indikator (nilai dan popup)"""
+    config = MAP_INDICATORS[indicator]
+    return ['province', 'capital', config['column']] + [column for _, column, _, _ in config['popup_fields']]
+
+
+def build_marker_data(df: pd.DataFrame, config: dict, colormap: folium.LinearColormap) -> dict:
+    """Menghitung lokasi, radius, warna, tooltip dan field popup per kolom"""
+    values = df[config['column']].to_numpy(dtype=float)
+    base, scale = config['radius']
+    radius = base + (values / np.nanmax(values)) * scale
+    tooltip = df['province'].astype(str) + ': ' + df[config['column']].astype(str) + config['tooltip_unit']
+
+    # Nilai float32 dikirim dalam desimal terpendek agar popup tidak menampilkan 9.850000381469727
+    popup_columns = ['capital'] + [field[1] for field in config['popup_fields']]
+    popup = display_frame(df[popup_columns])
+    return {
+        'lat': df['latitude'].to_numpy(dtype=float).tolist(),
+        'lon': df['longitude'].to_numpy(dtype=float).tolist(),
+        'radius': np.round(radius, 2).tolist(),
+        'fill': colormap_hex(colormap, values).tolist(),
+        'title': df['province'].astype(str).tolist(),
+        'tooltip': tooltip.tolist(),
+        'fields': {column: popup[column].tolist() for column in popup_columns},
+    }
+
+
+def create_base_map(df: pd.DataFrame) -> folium.Map:
+    """Peta dasar yang berpusat di tengah seluruh titik data"""
+    return folium.Map(
+        location=[df['latitude'].mean(), df['longitude'].mean()],
+        zoom_start=6,
+        tiles='OpenStreetMap'
+    )
+
+
+def create_indicator_map(df: pd.DataFrame, indicator: str) -> folium.Map:
+    """Membuat peta untuk satu indikator berdasarkan MAP_INDICATORS"""
+    config = MAP_INDICATORS[indicator]
+
+    m = create_base_map(df)
+    colormap = indicator_colormap(df, config)
+    BulkCircleLayer(
+        build_marker_data(df, config, colormap),
+        popup_field_specs(config),
+        fill_opacity=config['fill_opacity'],
+        name=indicator
+    ).add_to(m)
+
+    colormap.add_to(m)
+    return m
+
+
+def create_choropleth_map(df: pd.DataFrame, indicator: str, boundaries: gpd.GeoDataFrame) -> folium.Map:
+    """Membuat peta choropleth indikator di atas poligon batas wilayah"""
+    config = MAP_INDICATORS[indicator]
+    column = config['column']
+
+    m = create_base_map(df)
+    colormap = indicator_colormap(df, config)
+
+    regions = boundaries.merge(display_frame(df[['province', 'capital', column]]), on='province', how='inner')
+    regions['fill'] = colormap_hex(colormap, regions[column].to_numpy(dtype=float))
+
+    folium.GeoJson(
+        regions,
+        name=indicator,
+        style_function=lambda feature: {
+            'fillColor': feature['properties']['fill'],
+            'color': 'black',
+            'weight': 1,
+            'fillOpacity': config['fill_opacity'],
+        },
+        highlight_function=lambda feature: {'weight': 3},
+        tooltip=folium.GeoJsonTooltip(
+            fields=['province', 'capital', column],
+            aliases=['Provinsi', 'Ibukota', config['caption']]
+        ),
+    ).add_to(m)
+
+    colormap.add_to(m)
+    return m
+
+
+def indicator_features(df: pd.DataFrame, indicator: str,
+                       boundaries: Optional[gpd.GeoDataFrame] = None) -> gpd.GeoDataFrame:
+    """Fitur layer tile: titik provinsi, atau poligon batas wilayah bila tersedia"""
+    config = MAP_INDICATORS[indicator]
+    colormap = indicator_colormap(df, config)
+    data = build_marker_data(df, config, colormap)
+
+    properties = pd.DataFrame({
+        'province': df['province'].astype(str).to_numpy(),
+        'title': data['title'],
+        'tooltip': data['tooltip'],
+        'radius': data['radius'],
+        'fill': data['fill'],
+        **data['fields'],
+    })
+    if boundaries is not None:
+        return boundaries[['province', 'geometry']].merge(properties, on='province', how='inner')
+    return gpd.GeoDataFrame(
+        properties,
+        geometry=gpd.points_from_xy(data['lon'], data['lat']),
+        crs='EPSG:4326'
+    )
+
+
+def create_tiled_map(df: pd.DataFrame, indicator: str, url_template: str) -> folium.Map:
+    """Membuat peta yang memuat fitur indikator per tile dari server tile lokal"""
+    config = MAP_INDICATORS[indicator]
+
+    m = create_base_map(df)
+    colormap = indicator_colormap(df, config)
+    TiledGeoJsonLayer(
+        url_template,
+        popup_field_specs(config),
+        fill_opacity=config['fill_opacity'],
+        name=indicator
+    ).add_to(m)
+
+    colormap.add_to(m)
+    return m
+
+
+def create_boundary_map(units: gpd.GeoDataFrame, name_column: str, label: str) -> folium.Map:
+    """Peta batas wilayah satu tingkat untuk drill-down (klik wilayah untuk masuk lebih dalam)"""
+    min_lon, min_lat, max_lon, max_lat = units.total_bounds
+    m = folium.Map(
+        location=[(min_lat + max_lat) / 2, (min_lon + max_lon) / 2],
+        zoom_start=6,
+        tiles='OpenStreetMap'
+    )
+    folium.GeoJson(
+        units[[name_column, 'geometry']],
+        name=label,
+        style_function=lambda feature: {
+            'fillColor': '#2a5298',
+            'color': 'black',
+            'weight': 1,
+            'fillOpacity': 0.25,
+        },
+        highlight_function=lambda feature: {'weight': 3, 'fillOpacity': 0.5},
+        tooltip=folium.GeoJsonTooltip(fields=[name_column], aliases=[label]),
+    ).add_to(m)
+    m.fit_bounds([[min_lat, min_lon], [max_lat, max_lon]])
+    return m
+
+
+def create_poverty_map(df: pd.DataFrame, indicator: str):
+    """Membuat peta untuk indikator kemiskinan"""
+    return create_indicator_map(df, indicator)
+
+
+def create_greenhouse_map(df: pd.DataFrame, gas_type: str):
+    """Membuat peta untuk gas rumah kaca"""
+    return create_indicator_map(df, gas_type)
+
+
+def create_employment_map(df: pd.DataFrame, indicator: str):
+    """Membuat peta untuk indikator ketenagakerjaan"""
+    return create_indicator_map(df, indicator)
@@ -0,0 +1,186 @@
+"""Instrumentasi ringan untuk rerun dashboard.
+
+Span waktu (context manager atau dekorator) dan ukuran payload peta,
+grafik dan tabel dicatat ke registry per proses. Setiap rerun juga
+menyimpan jejak span-nya sendiri untuk panel debug. Agregat, rasio hit
+cache dan jejak rerun dapat diekspor ke file metrik lokal dalam format
+teks Prometheus (``.prom``) atau JSONL.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+class Metrics:
+    """Registry span waktu, ukuran payload dan statistik cache yang aman dipakai lintas thread"""
+
+    def __init__(self, export_path: Optional[Path] = None):
+        self.export_path = Path(export_path) if export_path else None
+        self.spans: Dict[str, Dict[str, float]] = {}
+        self.payloads: Dict[str, Dict[str, float]] = {}
+        self.caches: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self.reruns = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # Jejak per rerun (per thread sesi Streamlit)
+    def start_run(self, label: str = ''):
+        self._local.run = {'label': label, 'started': time.time(), 'spans': [], 'payloads': []}
+        self._local.depth = 0
+
+    def end_run(self) -> Optional[dict]:
+        run = getattr(self._local, 'run', None)
+        if run is None:
+            return None
+        run['total_ms'] = (time.time() - run['started']) * 1000
+        with self._lock:
+            self.reruns += 1
+        self._local.run = None
+        self.export(run)
+        return run
+
+    def current_run(self) -> Optional[dict]:
+        return getattr(self._local, 'run', None)
+
+    @contextmanager
+    def span(self, name: str):
+        """Mencatat durasi satu bagian kode"""
+        depth = getattr(self._local, 'depth', 0)
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._local.depth = depth
+            with self._lock:
+                stats = self.spans.setdefault(name, {'count': 0, 'sum': 0.0, 'max': 0.0})
+                stats['count'] += 1
+                stats['sum'] += elapsed
+                stats['max'] = max(stats['max'], elapsed)
+            run = self.current_run()
+            if run is not None:
+                run['spans'].append({'name': name, 'depth': depth, 'ms': elapsed * 1000})
+
+    def timed(self, name: Optional[str] = None):
+        """Dekorator: seluruh pemanggilan fungsi dicatat sebagai span"""
+        def decorator(func):
+            span_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def observe_size(self, kind: str, name: str, nbytes: int):
+        """Mencatat ukuran payload (HTML peta, JSON grafik, halaman tabel) yang dikirim ke browser"""
+        with self._lock:
+            stats = self.payloads.setdefault(kind, {'count': 0, 'sum': 0, 'max': 0})
+            stats['count'] += 1
+            stats['sum'] += nbytes
+            stats['max'] = max(stats['max'], nbytes)
+        run = self.current_run()
+        if run is not None:
+            run['payloads'].append({'kind': kind, 'name': name, 'bytes': nbytes})
+
+    def register_cache(self, name: str, stats: Callable[[], Dict[str, float]]):
+        """Mendaftarkan fungsi statistik cache (hits, misses, hit_rate, ...)"""
+        self.caches[name] = stats
+
+    def cache_stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: stats() for name, stats in self.caches.items()}
+
+    def prometheus_text(self) -> str:
+        """Seluruh agregat dalam format teks eksposisi Prometheus"""
+        lines = [
+            '# HELP sumatera_reruns_total Jumlah rerun dashboard',
+            '# TYPE sumatera_reruns_total counter',
+            f'sumatera_reruns_total {self.reruns}',
+            '# HELP sumatera_span_seconds Durasi span',
+            '# TYPE sumatera_span_seconds summary',
+        ]
+        with self._lock:
+            spans = {name: dict(stats) for name, stats in self.spans.items()}
+            payloads = {kind: dict(stats) for kind, stats in self.payloads.items()}
+        for name, stats in sorted(spans.items()):
+            lines.append(f'sumatera_span_seconds_count{{span="{name}"}} {stats["count"]}')
+            lines.append(f'sumatera_span_seconds_sum{{span="{name}"}} {stats["sum"]:.6f}')
+        lines += ['# HELP sumatera_span_seconds_max Durasi span terlama', '# TYPE sumatera_span_seconds_max gauge']
+        for name, stats in sorted(spans.items()):
+            lines.append(f'sumatera_span_seconds_max{{span="{name}"}} {stats["max"]:.6f}')
+        lines += ['# HELP sumatera_payload_bytes Ukuran payload ke browser', '# TYPE sumatera_payload_bytes summary']
+        for kind, stats in sorted(payloads.items()):
+            lines.append(f'sumatera_payload_bytes_count{{kind="{kind}"}} {stats["count"]}')
+            lines.append(f'sumatera_payload_bytes_sum{{kind="{kind}"}} {stats["sum"]}')
+        lines += ['# HELP sumatera_cache_hit_ratio Rasio hit cache', '# TYPE sumatera_cache_hit_ratio gauge']
+        cache_stats = self.cache_stats()
+        for name, stats in sorted(cache_stats.items()):
+            lines.append(f'sumatera_cache_hit_ratio{{cache="{name}"}} {stats.get("hit_rate", 0.0):.6f}')
+        for counter in ('hits', 'misses', 'evictions'):
+            lines += [f'# TYPE sumatera_cache_{counter}_total counter']
+            for name, stats in sorted(cache_stats.items()):
+                lines.append(f'sumatera_cache_{counter}_total{{cache="{name}"}} {stats.get(counter, 0)}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, run: Optional[dict] = None):
+        """Menulis metrik ke file: ``.prom`` ditulis ulang (atomik), selain itu satu baris JSONL per rerun"""
+        if self.export_path is None:
+            return
+        self.export_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.export_path.suffix == '.prom':
+            tmp_path = self.export_path.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+            tmp_path.write_text(self.prometheus_text())
+            os.replace(tmp_path, self.export_path)
+        elif run is not None:
+            record = dict(run, caches=self.cache_stats())
+            with self._lock, open(self.export_path, 'a') as handle:
+                handle.write(json.dumps(record, default=str) + '\n')
+
+    def span_table(self) -> List[dict]:
+        """Agregat span per nama, diurutkan dari total waktu terbesar"""
+        with self._lock:
+            rows = [
+                {'span': name, 'count': stats['count'], 'total_ms': stats['sum'] * 1000,
+                 'avg_ms': stats['sum'] / stats['count'] * 1000, 'max_ms': stats['max'] * 1000}
+                for name, stats in self.spans.items()
+            ]
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Registry metrik per proses (``SUMATERA_METRICS_FILE`` mengaktifkan ekspor ke file)"""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics(os.environ.get('SUMATERA_METRICS_FILE'))
+        return _metrics
+
+
+def span(name: str):
+    """Span pada registry metrik proses"""
+    return get_metrics().span(name)
+
+
+def timed(name: Optional[str] = None):
+    """Dekorator span pada registry metrik proses; registry diambil saat pemanggilan"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_metrics().span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,217 @@
+"""Katalog halaman dashboard dan job render per halaman.
+
+Halaman monitoring, dataset yang dibutuhkan, tabel detail, peta dan grafik
+tiap halaman dinyatakan di sini. ``render_jobs`` menurunkan seluruh
+kombinasi halaman/indikator pada pengaturan bawaan menjadi job render
+dengan kunci cache yang sama seperti di ``main.py``; fungsi pembangunnya
+berada di level modul sehingga job dapat dikirim ke proses lain.
+"""
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from data_sources import data_version
+from downsampling import DEFAULT_CHART_WIDTH_PX, DOWNSAMPLING_MODES, points_budget
+from figures import (
+    GHG_CHARTS, correlation_heatmap, fies_comparison, fies_levels, ghg_comparison, ghg_normalized_levels,
+    indicator_bar, ntp_agri_scatter, pyramid_trend_figure
+)
+from ingestion import columns_version
+from maps import create_employment_map, create_greenhouse_map, create_poverty_map, indicator_columns
+from trends import TREND_INDICATORS, TREND_WINDOWS, StatisticsCube, TemporalPyramid
+
+# Dataset yang dibutuhkan tiap kategori monitoring
+PAGE_DATASETS = {
+    "📊 Overview": ('indicators',),
+    "🍽️ Indikator Kemiskinan": ('indicators',),
+    "🏭 Gas Rumah Kaca": ('live', 'indicators'),
+    "👨‍🌾 Ketenagakerjaan": ('indicators',),
+    "📈 Analisis Trend": ('indicators', 'trends'),
+}
+
+# Nama file/URL tiap halaman pada bundel statis
+PAGE_SLUGS = {
+    "📊 Overview": 'index',
+    "🍽️ Indikator Kemiskinan": 'kemiskinan',
+    "🏭 Gas Rumah Kaca": 'gas-rumah-kaca',
+    "👨‍🌾 Ketenagakerjaan": 'ketenagakerjaan',
+    "📈 Analisis Trend": 'trend',
+}
+
+# Tabel detail per halaman: kolom database -> judul kolom
+DETAIL_TABLES = {
+    'overview': {
+        'province': 'Provinsi', 'capital': 'Ibukota', 'pou_percentage': 'PoU (%)',
+        'co_level': 'CO (mg/m³)', 'ntp': 'NTP', 'agri_workers_percentage': 'Pekerja Pertanian (%)',
+    },
+    'poverty': {
+        'province': 'Provinsi', 'pou_percentage': 'PoU (%)', 'fies_mild': 'FIES Mild (%)',
+        'fies_moderate': 'FIES Moderate (%)', 'fies_severe': 'FIES Severe (%)',
+    },
+    'ghg': {
+        'province': 'Provinsi', 'co_level': 'CO (mg/m³)', 'no2_level': 'NO2 (µg/m³)', 'ch4_level': 'CH4 (ppm)',
+    },
+    'employment': {
+        'province': 'Provinsi', 'ntp': 'NTP', 'agri_workers_percentage': 'Pekerja Pertanian (%)',
+    },
+}
+
+# Tabel detail yang tampil di tiap halaman
+PAGE_TABLES = {
+    "📊 Overview": 'overview',
+    "🍽️ Indikator Kemiskinan": 'poverty',
+    "🏭 Gas Rumah Kaca": 'ghg',
+    "👨‍🌾 Ketenagakerjaan": 'employment',
+}
+
+# Peta indikator per halaman (mode Marker): (fungsi peta, indikator)
+PAGE_MAPS = {
+    "📊 Overview": [(create_poverty_map, 'PoU')],
+    "🍽️ Indikator Kemiskinan": [(create_poverty_map, 'PoU'), (create_poverty_map, 'FIES Severe')],
+    "🏭 Gas Rumah Kaca": [(create_greenhouse_map, gas) for gas in GHG_CHARTS],
+    "👨‍🌾 Ketenagakerjaan": [(create_employment_map, 'NTP'), (create_employment_map, 'Agricultural Workers')],
+}
+
+# Grafik batang per halaman dan indikator: (kolom, judul, skala warna)
+PAGE_BARS = {
+    "🍽️ Indikator Kemiskinan": {
+        'PoU': ('pou_percentage', "PoU per Provinsi (%)", 'Reds'),
+    },
+    "🏭 Gas Rumah Kaca": {
+        gas: (chart['column'], f"{gas} per Provinsi ({chart['unit']})", chart['color_scale'])
+        for gas, chart in GHG_CHARTS.items()
+    },
+    "👨‍🌾 Ketenagakerjaan": {
+        'NTP': ('ntp', "NTP per Provinsi", 'RdYlGn'),
+        'Agricultural Workers': ('agri_workers_percentage', "Pekerja Pertanian per Provinsi (%)", 'Greens'),
+    },
+}
+
+# Kolom indikator yang dibaca grafik halaman selain grafik batang
+FIGURE_COLUMNS = {
+    'fies': ['province', 'fies_mild', 'fies_moderate', 'fies_severe'],
+    'comparison': ['province'] + [chart['column'] for chart in GHG_CHARTS.values()],
+    'scatter': ['province', 'ntp', 'agri_workers_percentage'],
+}
+
+# Pengaturan bawaan halaman trend
+DEFAULT_TREND_PROVINCES = 3
+DEFAULT_DOWNSAMPLING = next(iter(DOWNSAMPLING_MODES))
+DEFAULT_POINTS_PER_PIXEL = 1.0
+
+
+def fies_figure(df: pd.DataFrame):
+    return fies_comparison(fies_levels(df))
+
+
+def ghg_figure(df: pd.DataFrame):
+    return ghg_comparison(ghg_normalized_levels(df))
+
+
+# Struktur turunan time series per versi data di proses ini (proses pekerja membangunnya sekali)
+_PYRAMIDS: Dict[str, TemporalPyramid] = {}
+_CUBES: Dict[str, StatisticsCube] = {}
+
+
+def _pyramid(time_series_df: pd.DataFrame) -> TemporalPyramid:
+    version = data_version(time_series_df)
+    if version not in _PYRAMIDS:
+        _PYRAMIDS.clear()
+        _PYRAMIDS[version] = TemporalPyramid(time_series_df)
+    return _PYRAMIDS[version]
+
+
+def _cube(time_series_df: pd.DataFrame) -> StatisticsCube:
+    version = data_version(time_series_df)
+    if version not in _CUBES:
+        _CUBES.clear()
+        _CUBES[version] = StatisticsCube(time_series_df)
+    return _CUBES[version]
+
+
+def trend_window_range(time_series_df: pd.DataFrame, window: str) -> tuple:
+    """Tanggal awal dan akhir rentang trend (inklusif)"""
+    end_date = time_series_df['date'].max()
+    return end_date - pd.Timedelta(days=TREND_WINDOWS[window] - 1), end_date
+
+
+def trend_figure(time_series_df: pd.DataFrame, provinces: List[str], indicator: str, window: str,
+                 downsampling: str = DEFAULT_DOWNSAMPLING, points_per_pixel: float = DEFAULT_POINTS_PER_PIXEL,
+                 pyramid: Optional[TemporalPyramid] = None):
+    """Grafik trend satu indikator dan rentang waktu seperti di halaman "Analisis Trend\""""
+    start_date, end_date = trend_window_range(time_series_df, window)
+    return pyramid_trend_figure(
+        pyramid or _pyramid(time_series_df),
+        provinces,
+        TREND_INDICATORS[indicator],
+        start_date,
+        end_date,
+        n_out=points_budget(DEFAULT_CHART_WIDTH_PX, points_per_pixel),
+        mode=DOWNSAMPLING_MODES[downsampling],
+        break_even=indicator == "NTP Trend"
+    )
+
+
+def heatmap_figure(time_series_df: pd.DataFrame, provinces: List[str], window: str):
+    """Heatmap korelasi indikator untuk provinsi terpilih dan satu rentang waktu"""
+    return correlation_heatmap(_cube(time_series_df).correlation(TREND_WINDOWS[window], provinces))
+
+
+def default_trend_provinces(df: pd.DataFrame) -> List[str]:
+    return df['province'].tolist()[:DEFAULT_TREND_PROVINCES]
+
+
+def _job(kind: str, page: str, name: str, key: tuple, build, frames: tuple, args: tuple = ()) -> dict:
+    return {'kind': kind, 'page': page, 'name': name, 'key': key, 'build': build, 'frames': frames, 'args': args}
+
+
+def render_jobs(df: pd.DataFrame, time_series_df: Optional[pd.DataFrame] = None) -> List[dict]:
+    """Seluruh peta dan grafik per halaman/indikator pada pengaturan bawaan
+
+    Job berisi kunci cache render, fungsi pembangun, nama frame masukan
+    (``indicators``/``time_series``) dan argumen tambahan. Peta yang muncul di
+    beberapa halaman hanya didaftarkan sekali.
+    """
+    jobs, seen = [], set()
+    for page, maps in PAGE_MAPS.items():
+        for builder, indicator in maps:
+            key = (builder.__name__, indicator, columns_version(df, indicator_columns(indicator)))
+            if key not in seen:
+                seen.add(key)
+                jobs.append(_job('map', page, f"map-{indicator}", key, builder, ('indicators',), (indicator,)))
+
+    for page, bars in PAGE_BARS.items():
+        for indicator, args in bars.items():
+            key = (page, 'bar', indicator, columns_version(df, ['province', args[0]]))
+            jobs.append(_job('figure', page, f"bar-{indicator}", key, indicator_bar, ('indicators',), args))
+    jobs += [
+        _job('figure', page, name, (page, name, columns_version(df, FIGURE_COLUMNS[name])), build, ('indicators',))
+        for page, name, build in (
+            ("🍽️ Indikator Kemiskinan", 'fies', fies_figure),
+            ("🏭 Gas Rumah Kaca", 'comparison', ghg_figure),
+            ("👨‍🌾 Ketenagakerjaan", 'scatter', ntp_agri_scatter),
+        )
+    ]
+
+    if time_series_df is not None:
+        page = "📈 Analisis Trend"
+        ts_version = data_version(time_series_df)
+        provinces = tuple(default_trend_provinces(df))
+        for window in TREND_WINDOWS:
+            for indicator in TREND_INDICATORS:
+                key = (page, 'trend', indicator, provinces, window, DEFAULT_DOWNSAMPLING,
+                       DEFAULT_POINTS_PER_PIXEL, ts_version)
+                jobs.append(_job('figure', page, f"trend-{indicator}-{window}", key, trend_figure,
+                                 ('time_series',), (list(provinces), indicator, window)))
+            jobs.append(_job('figure', page, f"heatmap-{window}", (page, 'heatmap', provinces, window, ts_version),
+                             heatmap_figure, ('time_series',), (list(provinces), window)))
+    return jobs
+
+
+def render_payload(job: dict, frames: Dict[str, pd.DataFrame]) -> str:
+    """Payload siap kirim sebuah job: HTML untuk peta, JSON untuk figure Plotly"""
+    inputs = [frames[name] for name in job['frames']]
+    result = job['build'](*inputs, *job['args'])
+    if job['kind'] == 'map':
+        return result.get_root().render()
+    return result.to_json()
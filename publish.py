@@ -0,0 +1,298 @@
+"""Publikasi snapshot statis dashboard (HTML + Parquet).
+
+Seluruh kombinasi halaman/indikator dari ``pages.render_jobs`` dirender
+sekali secara paralel di process pool: peta folium menjadi file HTML dan
+figure Plotly disisipkan sebagai JSON di halaman. Tabel detail, ringkasan
+trend dan data mentah ditulis sebagai Parquet. Bundel dapat dilayani file
+server statis biasa tanpa menjalankan Python per penonton.
+
+Contoh::
+
+    python publish.py public/ --workers 4
+"""
+import argparse
+import html
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from plotly.offline import get_plotlyjs_version
+
+from data_sources import data_version, generate_time_series_frame, get_data_provider
+from pages import (
+    DETAIL_TABLES, PAGE_BARS, PAGE_DATASETS, PAGE_MAPS, PAGE_SLUGS, PAGE_TABLES, default_trend_provinces,
+    render_jobs, render_payload
+)
+from trends import TREND_WINDOWS, TrendIndex, window_slice
+
+PACKAGE_DIR = str(Path(__file__).resolve().parent)
+
+# Frame masukan di proses pekerja, dikirim sekali lewat initializer
+_FRAMES: Dict[str, pd.DataFrame] = {}
+
+
+def _init_worker(frames: Dict[str, pd.DataFrame]):
+    _FRAMES.update(frames)
+
+
+def _render_in_worker(job: dict) -> str:
+    return render_payload(job, _FRAMES)
+
+
+def iter_rendered(jobs: List[dict], frames: Dict[str, pd.DataFrame],
+                  max_workers: Optional[int] = None) -> Iterator[Tuple[dict, Optional[str], Optional[BaseException]]]:
+    """Merender job di process pool; menghasilkan (job, payload, error) sesuai urutan selesai
+
+    Pekerja dibuat dengan metode ``spawn`` karena fork dari proses server yang
+    memiliki banyak thread tidak aman. Proses ``spawn`` mengimpor ulang modul
+    ``__main__`` induk (di Streamlit: ``main.py``), jadi direktori paket harus
+    ada di ``sys.path`` yang diwariskan.
+    """
+    if not jobs:
+        return
+    # Streamlit bisa menyisipkan direktori skrip di depan hanya selama satu rerun lalu menghapusnya lagi,
+    # jadi entri sendiri ditambahkan di akhir agar tidak ikut terhapus
+    if PACKAGE_DIR not in sys.path[1:]:
+        sys.path.append(PACKAGE_DIR)
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(frames,)) as pool:
+        futures = {pool.submit(_render_in_worker, job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as exc:
+                yield futures[future], None, exc
+
+
+def _slug(text: str) -> str:
+    return re.sub(r'[^\w-]+', '-', text.lower()).strip('-')
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="id">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title} - Dashboard Monitoring Pulau Sumatera</title>
+<script src="https://cdn.plot.ly/plotly-{plotly_version}.min.js"></script>
+<style>
+    body {{ font-family: sans-serif; margin: 0 auto; max-width: 1200px; padding: 1rem; color: #262730; }}
+    .header-style {{ background: linear-gradient(90deg, #1e3c72 0%, #2a5298 100%); padding: 1rem;
+                     border-radius: 10px; color: white; text-align: center; margin-bottom: 1rem; }}
+    nav a {{ margin-right: 1rem; }}
+    .cards {{ display: flex; gap: 1rem; flex-wrap: wrap; }}
+    .indicator-card {{ background: white; padding: 1rem 1.5rem; border-radius: 10px; flex: 1;
+                       box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1); border-left: 4px solid #2a5298; }}
+    table {{ border-collapse: collapse; width: 100%; }}
+    th, td {{ border-bottom: 1px solid #ddd; padding: 0.3rem 0.6rem; text-align: left; }}
+    iframe {{ border: 0; width: 100%; height: 500px; }}
+    footer {{ text-align: center; color: #666; margin-top: 2rem; }}
+</style>
+</head>
+<body>
+<div class="header-style"><h1>🌴 Dashboard Monitoring Indikator Pulau Sumatera</h1></div>
+<nav>{nav}</nav>
+<h2>{title}</h2>
+{body}
+<footer>Snapshot statis versi data {version} · dibuat {generated}</footer>
+</body>
+</html>
+"""
+
+
+def _figure_html(element_id: str, payload: str) -> str:
+    # "</" di dalam JSON tidak boleh menutup tag script
+    figure_json = payload.replace('</', '<\\/')
+    return (f'<div id="{element_id}"></div>\n<script>(function () {{ var fig = {figure_json}; '
+            f'Plotly.newPlot("{element_id}", fig.data, fig.layout, {{responsive: true}}); }})();</script>')
+
+
+def _table_html(frame: pd.DataFrame, parquet_path: str) -> str:
+    return (frame.to_html(index=False, border=0, float_format=lambda value: f'{value:,.3f}'.rstrip('0').rstrip('.'))
+            + f'\n<p><a href="{parquet_path}">Unduh Parquet</a></p>')
+
+
+def _stats_cards(df: pd.DataFrame, columns: Dict[str, str]) -> str:
+    cards = ''.join(
+        f'<div class="indicator-card"><h3>{html.escape(label)}</h3><h2>{df[column].mean():,.2f}</h2>'
+        f'<p>Tertinggi {df[column].max():,.2f} · Terendah {df[column].min():,.2f}</p></div>'
+        for label, column in columns.items()
+    )
+    return f'<div class="cards">{cards}</div>'
+
+
+class BundleWriter:
+    """Menulis bundel statis: halaman HTML, peta, tabel Parquet dan manifest"""
+
+    def __init__(self, output_dir: Path, df: pd.DataFrame, time_series_df: Optional[pd.DataFrame] = None):
+        self.output_dir = Path(output_dir)
+        self.df = df
+        self.time_series_df = time_series_df
+        self.version = data_version(df)
+        self.generated = pd.Timestamp.now().isoformat(timespec='seconds')
+        self.files: Dict[str, int] = {}
+
+    def _write(self, relative: str, content) -> str:
+        path = self.output_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, pd.DataFrame):
+            content.to_parquet(path, index=False)
+        else:
+            path.write_text(content, encoding='utf-8')
+        self.files[relative] = path.stat().st_size
+        return relative
+
+    def write_tables(self) -> Dict[str, pd.DataFrame]:
+        """Data mentah dan tabel detail per halaman (urutan bawaan: provinsi naik)"""
+        self._write('data/indicators.parquet', self.df)
+        if self.time_series_df is not None:
+            self._write('data/time_series.parquet', self.time_series_df)
+        tables = {}
+        for name, labels in DETAIL_TABLES.items():
+            table = self.df[list(labels)].sort_values('province', kind='stable')
+            self._write(f'tables/{name}.parquet', table)
+            tables[name] = table.rename(columns=labels)
+        return tables
+
+    def _page_sections(self, page: str, payloads: Dict[tuple, str], jobs: List[dict],
+                       tables: Dict[str, pd.DataFrame]) -> List[str]:
+        sections = []
+        if page == "📊 Overview":
+            sections.append(_stats_cards(self.df, {
+                "🍽️ Rata-rata PoU (%)": 'pou_percentage', "🏭 Rata-rata CO (mg/m³)": 'co_level',
+                "👨‍🌾 Rata-rata NTP": 'ntp', "🌾 Rata-rata Pekerja Pertanian (%)": 'agri_workers_percentage',
+            }))
+        if page in PAGE_BARS:
+            sections.append(_stats_cards(self.df, {indicator: args[0] for indicator, args in PAGE_BARS[page].items()}))
+        for job in jobs:
+            if job['key'] not in payloads:
+                continue
+            title = html.escape(job['name'])
+            if job['kind'] == 'map':
+                sections.append(f'<h3>🗺️ Peta {html.escape(job["args"][0])}</h3>'
+                                f'<iframe src="maps/{_slug(job["name"])}.html" loading="lazy" title="{title}"></iframe>')
+            else:
+                sections.append(_figure_html(_slug(job['name']), payloads[job['key']]))
+        if page in PAGE_TABLES:
+            name = PAGE_TABLES[page]
+            sections.append('<h3>📋 Detail Data</h3>' + _table_html(tables[name], f'tables/{name}.parquet'))
+        return sections
+
+    def _trend_sections(self, payloads: Dict[tuple, str], jobs: List[dict]) -> List[str]:
+        """Satu bagian per rentang waktu: grafik tiap indikator, heatmap dan tabel ringkasan"""
+        provinces = default_trend_provinces(self.df)
+        sections = [f'<p>Provinsi: {html.escape(", ".join(provinces))}</p>']
+        for position, (window, days) in enumerate(TREND_WINDOWS.items()):
+            parts = [_figure_html(_slug(job['name']), payloads[job['key']])
+                     for job in jobs if job['args'][-1] == window and job['key'] in payloads]
+            summary = TrendIndex(window_slice(self.time_series_df, days)).correlation_input(provinces).reset_index()
+            summary_path = self._write(f'tables/trend-summary-{_slug(window)}.parquet', summary)
+            parts.append('<h3>📋 Summary Data Trend</h3>' + _table_html(summary, summary_path))
+            sections.append(f'<details{" open" if position == 0 else ""}><summary><b>{html.escape(window)}</b>'
+                            f'</summary>{"".join(parts)}</details>')
+        return sections
+
+    def write_pages(self, jobs: List[dict], payloads: Dict[tuple, str], tables: Dict[str, pd.DataFrame]):
+        for job in jobs:
+            if job['kind'] == 'map' and job['key'] in payloads:
+                self._write(f'maps/{_slug(job["name"])}.html', payloads[job['key']])
+
+        pages = [page for page in PAGE_DATASETS if page != "📈 Analisis Trend" or self.time_series_df is not None]
+        nav = ''.join(f'<a href="{PAGE_SLUGS[page]}.html">{html.escape(page)}</a>' for page in pages)
+        map_keys = {page: {(builder.__name__, indicator, self.version) for builder, indicator in maps}
+                    for page, maps in PAGE_MAPS.items()}
+        for page in pages:
+            page_jobs = [job for job in jobs if job['page'] == page or job['key'] in map_keys.get(page, ())]
+            if page == "📈 Analisis Trend":
+                sections = self._trend_sections(payloads, page_jobs)
+            else:
+                sections = self._page_sections(page, payloads, page_jobs, tables)
+            self._write(f'{PAGE_SLUGS[page]}.html', PAGE_TEMPLATE.format(
+                title=html.escape(page), nav=nav, body='\n'.join(sections), version=self.version,
+                generated=self.generated, plotly_version=get_plotlyjs_version()
+            ))
+
+    def write_manifest(self, jobs: List[dict], errors: Dict[str, str]) -> dict:
+        manifest = {
+            'data_version': self.version,
+            'time_series_version': data_version(self.time_series_df) if self.time_series_df is not None else None,
+            'generated': self.generated,
+            'jobs': len(jobs),
+            'errors': errors,
+            'files': dict(sorted(self.files.items())),
+        }
+        self._write('manifest.json', json.dumps(manifest, indent=2, ensure_ascii=False))
+        return manifest
+
+
+def publish_bundle(output_dir: Path, df: pd.DataFrame, time_series_df: Optional[pd.DataFrame] = None,
+                   max_workers: Optional[int] = None,
+                   progress: Optional[Callable[[int, int, dict], None]] = None) -> dict:
+    """Merender seluruh halaman ke ``output_dir`` dan mengembalikan manifest bundel"""
+    output_dir = Path(output_dir)
+    # Bundel ditulis di direktori sementara lalu ditukar, agar server statis tidak melihat bundel setengah jadi
+    staging = output_dir.with_name(f'.{output_dir.name}.tmp')
+    shutil.rmtree(staging, ignore_errors=True)
+    writer = BundleWriter(staging, df, time_series_df)
+    tables = writer.write_tables()
+
+    jobs = render_jobs(df, time_series_df)
+    frames = {'indicators': df}
+    if time_series_df is not None:
+        frames['time_series'] = time_series_df
+    payloads, errors = {}, {}
+    for done, (job, payload, error) in enumerate(iter_rendered(jobs, frames, max_workers), start=1):
+        if error is None:
+            payloads[job['key']] = payload
+        else:
+            errors[job['name']] = repr(error)
+        if progress:
+            progress(done, len(jobs), job)
+
+    writer.write_pages(jobs, payloads, tables)
+    manifest = writer.write_manifest(jobs, errors)
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    staging.rename(output_dir)
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output_dir', type=Path)
+    parser.add_argument('--workers', type=int, help='jumlah proses render (bawaan: jumlah CPU)')
+    parser.add_argument('--no-trend', action='store_true', help='tanpa halaman analisis trend')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df = get_data_provider().load()
+    time_series_df = None
+    if not args.no_trend:
+        seed = os.environ.get('SUMATERA_SEED')
+        time_series_df = generate_time_series_frame(
+            df['province'].astype(str).tolist(), max(TREND_WINDOWS.values()), int(seed) if seed else None
+        )
+
+    def report(done: int, total: int, job: dict):
+        print(f"[{done}/{total}] {job['kind']} {job['name']}", file=sys.stderr)
+
+    manifest = publish_bundle(args.output_dir, df, time_series_df, args.workers, progress=report)
+    total_bytes = sum(manifest['files'].values())
+    print(f"{len(manifest['files'])} file ({total_bytes / 1024:.0f} KiB) ditulis ke {args.output_dir} "
+          f"dalam {time.perf_counter() - start:.1f} s")
+    for name, error in manifest['errors'].items():
+        print(f"Gagal merender {name}: {error}", file=sys.stderr)
+    return 1 if manifest['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
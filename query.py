@@ -0,0 +1,203 @@
+"""Lapisan query SQL di atas file database lokal untuk tabel indikator.
+
+Frame indikator dan time series dimuat sekali per versi data ke file
+SQLite beserta indeksnya, masing-masing sebagai tabel tersendiri per versi
+sehingga proses lain yang memuat versi lebih baru tidak menimpa tabel yang
+sedang dibaca. Halaman dashboard lalu meminta hanya kolom dan baris yang
+ditampilkan; filter, agregasi dan pengurutan dijalankan sebagai SQL, bukan
+dengan menyalin seluruh DataFrame per sesi.
+"""
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from data_sources import cache_root
+from schema import display_frame
+
+# Indeks per tabel: nama tabel -> daftar kolom yang diindeks bersama
+TABLE_INDEXES = {
+    'indicators': [('province',)],
+    'time_series': [('province', 'date'), ('date',)],
+}
+
+# Kolom tanggal yang dikembalikan sebagai datetime64
+DATE_COLUMNS = {'date'}
+
+# Jumlah versi per nama tabel yang disimpan; versi lebih lama di-drop
+KEEP_VERSIONS = 3
+
+_META_SCHEMA = """
+CREATE TABLE IF NOT EXISTS loaded_tables (
+    physical TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    loaded REAL NOT NULL
+);
+"""
+
+
+def physical_name(table: str, version: str) -> str:
+    """Nama tabel SQLite untuk satu versi data"""
+    return f"{table}__{re.sub(r'[^0-9A-Za-z_]+', '_', version)}"
+
+
+class IndicatorStore:
+    """Tabel indikator di file SQLite dengan query proyeksi, filter, agregasi dan urutan"""
+
+    def __init__(self, path: Optional[Path] = None, keep_versions: int = KEEP_VERSIONS):
+        self.path = Path(path or cache_root() / 'indicators.sqlite')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.keep_versions = keep_versions
+        self._local = threading.local()
+        self._load_lock = threading.Lock()
+        self._columns: Dict[str, List[str]] = {}
+        self._connect().executescript(_META_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def exists(self, physical: str) -> bool:
+        row = self._connect().execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (physical,)
+        ).fetchone()
+        return row is not None
+
+    def ensure_table(self, table: str, df: pd.DataFrame, version: str) -> str:
+        """Memuat frame ke tabel versi ini bila belum ada; mengembalikan nama tabel untuk query
+
+        Tabel versi yang sudah ada tidak pernah ditimpa. Frame ditulis ke tabel
+        sementara lalu di-rename dalam satu transaksi, jadi proses lain hanya
+        melihat tabel yang lengkap.
+        """
+        physical = physical_name(table, version)
+        if self.exists(physical):
+            return physical
+        with self._load_lock:
+            if self.exists(physical):
+                return physical
+            conn = self._connect()
+            # float32 lewat representasi desimal terpendek agar 12.34 tidak tersimpan sebagai 12.3400001
+            frame = display_frame(df).copy()
+            for column in frame.columns:
+                if isinstance(frame[column].dtype, pd.CategoricalDtype):
+                    frame[column] = frame[column].astype(str)
+            staging = f'{physical}__tmp_{uuid.uuid4().hex[:8]}'
+            frame.to_sql(staging, conn, index=False, chunksize=10000)
+            conn.commit()
+
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if self.exists(physical):
+                    # Proses lain selesai memuat versi yang sama lebih dulu
+                    conn.execute(f'DROP TABLE "{staging}"')
+                else:
+                    conn.execute(f'ALTER TABLE "{staging}" RENAME TO "{physical}"')
+                    for columns in TABLE_INDEXES.get(table, []):
+                        name = f"{physical}_{'_'.join(columns)}"
+                        conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{physical}" ({", ".join(columns)})')
+                    conn.execute('INSERT OR REPLACE INTO loaded_tables (physical, name, version, loaded) '
+                                 'VALUES (?, ?, ?, ?)', (physical, table, version, time.time()))
+                    self._drop_old_versions(conn, table)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return physical
+
+    def _drop_old_versions(self, conn: sqlite3.Connection, table: str):
+        """Menghapus versi terlama di luar ``keep_versions`` terbaru untuk satu nama tabel"""
+        rows = conn.execute(
+            'SELECT physical FROM loaded_tables WHERE name = ? ORDER BY loaded DESC', (table,)
+        ).fetchall()
+        for (physical,) in rows[self.keep_versions:]:
+            conn.execute(f'DROP TABLE IF EXISTS "{physical}"')
+            conn.execute('DELETE FROM loaded_tables WHERE physical = ?', (physical,))
+            self._columns.pop(physical, None)
+
+    def columns(self, table: str) -> List[str]:
+        if table not in self._columns:
+            rows = self._connect().execute(f'PRAGMA table_info("{table}")').fetchall()
+            if not rows:
+                raise KeyError(f"Tabel '{table}' belum dimuat")
+            self._columns[table] = [row[1] for row in rows]
+        return self._columns[table]
+
+    def _check_columns(self, table: str, columns: Sequence[str]):
+        # Nama kolom tidak bisa diikat sebagai parameter SQL, jadi divalidasi terhadap skema
+        unknown = set(columns) - set(self.columns(table))
+        if unknown:
+            raise ValueError(f"Kolom tidak dikenal di tabel '{table}': {', '.join(sorted(unknown))}")
+
+    def _where(self, provinces: Optional[Sequence[str]] = None, date_from=None,
+               date_to=None, search: Optional[str] = None) -> Tuple[str, list]:
+        clauses, params = [], []
+        if provinces is not None:
+            clauses.append(f"province IN ({', '.join('?' * len(provinces))})")
+            params.extend(provinces)
+        if search:
+            # Pencarian nama provinsi tanpa membedakan huruf besar/kecil
+            clauses.append("province LIKE ? ESCAPE '\\'")
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f'%{escaped}%')
+        if date_from is not None:
+            clauses.append('date >= ?')
+            params.append(str(pd.Timestamp(date_from)))
+        if date_to is not None:
+            clauses.append('date <= ?')
+            params.append(str(pd.Timestamp(date_to)))
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _read(self, sql: str, params: list, columns: Sequence[str]) -> pd.DataFrame:
+        parse_dates = [column for column in columns if column in DATE_COLUMNS]
+        return pd.read_sql_query(sql, self._connect(), params=params, parse_dates=parse_dates or None)
+
+    def select(self, table: str, columns: Sequence[str], provinces: Optional[Sequence[str]] = None,
+               date_from=None, date_to=None, search: Optional[str] = None, order_by: Optional[str] = None,
+               descending: bool = False, limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
+        """Baris dan kolom yang dibutuhkan saja, sudah difilter dan diurutkan di database"""
+        self._check_columns(table, list(columns) + ([order_by] if order_by else []))
+        where, params = self._where(provinces, date_from, date_to, search)
+        sql = f'SELECT {", ".join(columns)} FROM "{table}"{where}'
+        if order_by:
+            # rowid sebagai pemecah nilai kembar agar halaman berurutan tidak saling tumpang tindih
+            sql += f' ORDER BY {order_by} {"DESC" if descending else "ASC"}, rowid'
+        elif limit is not None:
+            sql += ' ORDER BY rowid'
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [int(limit), int(offset)]
+        return self._read(sql, params, columns)
+
+    def count(self, table: str, provinces: Optional[Sequence[str]] = None, date_from=None, date_to=None,
+              search: Optional[str] = None) -> int:
+        where, params = self._where(provinces, date_from, date_to, search)
+        return self._connect().execute(f'SELECT COUNT(*) FROM "{table}"{where}', params).fetchone()[0]
+
+    def describe(self, table: str, column: str, provinces: Optional[Sequence[str]] = None) -> Dict[str, float]:
+        """Rata-rata, maksimum dan minimum satu kolom"""
+        self._check_columns(table, [column])
+        where, params = self._where(provinces)
+        mean, high, low = self._connect().execute(
+            f'SELECT AVG({column}), MAX({column}), MIN({column}) FROM "{table}"{where}', params
+        ).fetchone()
+        return {'mean': mean, 'max': high, 'min': low}
+
+    def means(self, table: str, columns: Sequence[str], provinces: Optional[Sequence[str]] = None) -> pd.Series:
+        """Rata-rata beberapa kolom sekaligus"""
+        self._check_columns(table, columns)
+        where, params = self._where(provinces)
+        row = self._connect().execute(
+            f'SELECT {", ".join(f"AVG({column})" for column in columns)} FROM "{table}"{where}', params
+        ).fetchone()
+        return pd.Series(row, index=list(columns))
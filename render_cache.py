@@ -0,0 +1,78 @@
+"""Cache hasil render (HTML peta, JSON grafik) dengan batas memori dan eviksi LRU."""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+
+class RenderCache:
+    """Cache LRU untuk payload string yang dibatasi jumlah entri dan total byte"""
+
+    def __init__(self, max_entries: int = 64, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: Hashable, payload: str):
+        size = len(payload.encode('utf-8'))
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._sizes.pop(key)
+                del self._entries[key]
+            # Payload yang lebih besar dari seluruh anggaran tidak disimpan
+            if size > self.max_bytes:
+                return
+            self._entries[key] = payload
+            self._sizes[key] = size
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(old_key)
+                self.evictions += 1
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> str:
+        """Mengembalikan payload dari cache atau me-render lalu menyimpannya"""
+        payload = self.get(key)
+        if payload is None:
+            payload = render()
+            self.put(key, payload)
+        return payload
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
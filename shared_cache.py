@@ -0,0 +1,213 @@
+"""Backend cache bersama lintas sesi dan proses (replika) berbasis SQLite.
+
+Hasil loader data disimpan dalam satu file SQLite lokal dengan TTL dan
+eviksi LRU berbatas ukuran. Semua replika Streamlit di mesin yang sama
+membaca salinan hangat yang sama; saat cache kosong hanya satu proses
+yang menghitung ulang sementara proses lain menunggu hasilnya.
+"""
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from data_sources import cache_root
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa kunci lintas proses
+    fcntl = None
+
+DEFAULT_TTL = 6 * 60 * 60
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    expires REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class SharedCache:
+    """Cache key-value di file SQLite dengan TTL, batas ukuran LRU dan statistik bersama"""
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 default_ttl: float = DEFAULT_TTL):
+        self.path = Path(path or cache_root() / 'shared_cache.sqlite')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock_dir = self.path.parent / 'locks'
+        self.lock_dir.mkdir(exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _count(self, conn: sqlite3.Connection, name: str, amount: int = 1):
+        conn.execute(
+            'INSERT INTO counters (name, value) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+            (name, amount)
+        )
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute('SELECT value, expires FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None or row[1] < now:
+            return None
+        conn.execute('UPDATE entries SET last_access = ? WHERE key = ?', (now, key))
+        return pickle.loads(row[0])
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._lookup(key)
+        self._count(self._connect(), 'misses' if value is None else 'hits')
+        return value
+
+    def set(self, key: str, value: Any, namespace: str = '', ttl: Optional[float] = None):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO entries (key, namespace, value, size, created, expires, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, namespace, payload, len(payload), now, now + (ttl or self.default_ttl), now)
+            )
+            self._evict(conn, now)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Menghapus entri kedaluwarsa lalu entri paling lama tidak diakses hingga di bawah batas"""
+        expired = conn.execute('DELETE FROM entries WHERE expires < ?', (now,)).rowcount
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        evicted = 0
+        if total > self.max_bytes:
+            for key, size in conn.execute('SELECT key, size FROM entries ORDER BY last_access').fetchall():
+                conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                total -= size
+                evicted += 1
+                if total <= self.max_bytes:
+                    break
+        if expired or evicted:
+            self._count(conn, 'evictions', expired + evicted)
+
+    @contextmanager
+    def _compute_lock(self, key: str):
+        """Kunci file per kunci cache agar hanya satu proses yang menghitung ulang"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_dir / f'{key}.lock', 'w') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], namespace: str = '',
+                       ttl: Optional[float] = None) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._compute_lock(key):
+            # Proses lain mungkin sudah mengisi cache selama kita menunggu kunci
+            value = self._lookup(key)
+            if value is None:
+                value = compute()
+                self.set(key, value, namespace=namespace, ttl=ttl)
+        return value
+
+    def memoize(self, namespace: str, ttl: Optional[float] = None):
+        """Dekorator: hasil fungsi disimpan per kombinasi argumen"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                digest = hashlib.sha256(pickle.dumps((args, sorted(kwargs.items())))).hexdigest()[:32]
+                return self.get_or_compute(
+                    f'{namespace}-{digest}', lambda: func(*args, **kwargs), namespace=namespace, ttl=ttl
+                )
+            return wrapper
+        return decorator
+
+    def clear(self, namespace: Optional[str] = None):
+        conn = self._connect()
+        if namespace is None:
+            conn.execute('DELETE FROM entries')
+        else:
+            conn.execute('DELETE FROM entries WHERE namespace = ?', (namespace,))
+
+    def stats(self) -> Dict[str, float]:
+        conn = self._connect()
+        counters = dict(conn.execute('SELECT name, value FROM counters').fetchall())
+        entries, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        hits, misses = counters.get('hits', 0), counters.get('misses', 0)
+        return {
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses,
+            'evictions': counters.get('evictions', 0),
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+def configured_ttl(default: float) -> float:
+    """TTL cache (detik): ``SUMATERA_SHARED_CACHE_TTL`` bila diset, menggantikan ``default``"""
+    return float(os.environ.get('SUMATERA_SHARED_CACHE_TTL', default))
+
+
+_shared_cache: Optional[SharedCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> SharedCache:
+    """Instance cache bersama per proses (``SUMATERA_SHARED_CACHE_MB`` mengatur batas ukuran)"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            max_mb = int(os.environ.get('SUMATERA_SHARED_CACHE_MB', DEFAULT_MAX_BYTES // (1024 * 1024)))
+            _shared_cache = SharedCache(max_bytes=max_mb * 1024 * 1024, default_ttl=configured_ttl(DEFAULT_TTL))
+        return _shared_cache
+
+
+def shared_memoize(namespace: str, ttl: Optional[float] = None):
+    """Dekorator memoize ke cache bersama; instance cache dibuat saat pemanggilan pertama"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_shared_cache().memoize(namespace, ttl)(func)(*args, **kwargs)
+        return wrapper
+    return decorator
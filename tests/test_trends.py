@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_sources import generate_time_series_frame
+from trends import TREND_COLUMNS, TREND_WINDOWS, StatisticsCube, TemporalPyramid, TrendIndex, window_slice
+
+PROVINCES = ['Aceh', 'Riau', 'Jambi']
+
+
+@pytest.fixture
+def series():
+    return generate_time_series_frame(PROVINCES, days=800, seed=7, end_date=pd.Timestamp('2024-06-01'))
+
+
+def assert_cube_matches(cube: StatisticsCube, rebuilt: StatisticsCube):
+    for days in TREND_WINDOWS.values():
+        for provinces in (PROVINCES, PROVINCES[:1]):
+            expected, actual = rebuilt.moments(days, provinces), cube.moments(days, provinces)
+            assert actual['n'] == expected['n']
+            np.testing.assert_allclose(actual['mean'], expected['mean'], rtol=1e-9)
+            np.testing.assert_allclose(actual['cov'], expected['cov'], rtol=1e-6, atol=1e-9)
+
+
+def test_statistics_cube_append_matches_rebuild_for_every_window(series):
+    cutoff = series['date'].max() - pd.Timedelta(days=45)
+    base = series[series['date'] <= cutoff].reset_index(drop=True)
+    new_rows = series[series['date'] > cutoff].reset_index(drop=True)
+
+    cube = StatisticsCube(base, TREND_WINDOWS)
+    cube.append(new_rows, base)
+
+    assert_cube_matches(cube, StatisticsCube(series, TREND_WINDOWS))
+
+
+def test_statistics_cube_append_replaces_existing_rows(series):
+    last_days = series['date'] > series['date'].max() - pd.Timedelta(days=3)
+    replacement = series[last_days].copy()
+    replacement['co_trend'] = (replacement['co_trend'] * 1.5).astype(np.float32)
+    updated = pd.concat([series[~last_days], replacement], ignore_index=True)
+
+    cube = StatisticsCube(series, TREND_WINDOWS)
+    cube.append(replacement, series)
+
+    assert_cube_matches(cube, StatisticsCube(updated, TREND_WINDOWS))
+
+
+def replace_and_extend(series: pd.DataFrame):
+    """Baris pengganti untuk tiga hari terakhir dan dua hari baru, beserta frame hasilnya"""
+    last_days = series['date'] > series['date'].max() - pd.Timedelta(days=3)
+    replacement = series[last_days].copy()
+    replacement['co_trend'] = (replacement['co_trend'] * 1.5).astype(np.float32)
+    extension = series[series['date'] > series['date'].max() - pd.Timedelta(days=2)].copy()
+    extension['date'] = extension['date'] + pd.Timedelta(days=2)
+    new_rows = pd.concat([replacement, extension], ignore_index=True)
+    updated = pd.concat([series[~last_days], new_rows], ignore_index=True)
+    return new_rows, updated
+
+
+@pytest.mark.parametrize('days', list(TREND_WINDOWS.values()))
+def test_trend_index_append_matches_rebuild(series, days):
+    new_rows, updated = replace_and_extend(series)
+    index = TrendIndex(window_slice(series, days))
+    index.append(new_rows, series, days)
+    rebuilt = TrendIndex(window_slice(updated, days))
+
+    pd.testing.assert_frame_equal(index.means(PROVINCES), rebuilt.means(PROVINCES))
+    pd.testing.assert_frame_equal(index.latest(PROVINCES), rebuilt.latest(PROVINCES), check_dtype=False)
+    for column in TREND_COLUMNS:
+        pd.testing.assert_frame_equal(index.changes(PROVINCES, column), rebuilt.changes(PROVINCES, column))
+
+
+def test_temporal_pyramid_append_matches_rebuild(series):
+    new_rows, updated = replace_and_extend(series)
+    pyramid = TemporalPyramid(series)
+    pyramid.append(new_rows, updated)
+    rebuilt = TemporalPyramid(updated)
+
+    for freq, level in rebuilt.levels.items():
+        pd.testing.assert_frame_equal(pyramid.levels[freq], level)
+        assert pyramid.offsets[freq] == rebuilt.offsets[freq]
@@ -0,0 +1,241 @@
+"""Server tile GeoJSON lokal untuk layer indikator berukuran besar.
+
+Layer indikator dipotong per tile z/x/y (skema Web Mercator) saat pertama
+diminta, disederhanakan sesuai zoom, lalu disimpan di cache tile pada disk.
+Peta di browser hanya mengambil tile yang terlihat, bukan seluruh fitur
+dalam satu payload HTML.
+"""
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import geopandas as gpd
+import shapely
+
+from boundaries import SIMPLIFY_TIERS, tier_for_zoom
+from data_sources import cache_root
+
+TILE_PATH = re.compile(
+    r'^/tiles/(?P<layer>[\w.-]+)/(?P<version>[\w.-]+)/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.geojson$'
+)
+
+MIN_TILE_ZOOM = 4
+MAX_TILE_ZOOM = 14
+
+# Jumlah versi data yang layer dan tile-nya disimpan; versi lama dikeluarkan (LRU)
+DEFAULT_MAX_VERSIONS = 4
+
+
+def layer_id(*parts: str) -> str:
+    """Nama layer yang aman dipakai di URL tile"""
+    return re.sub(r'[^\w.-]+', '_', '-'.join(parts))
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Batas tile (min_lon, min_lat, max_lon, max_lat) dalam derajat"""
+    n = 2 ** z
+
+    def lat(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+class TileStore:
+    """Pemotong dan cache tile GeoJSON per (layer, versi data)
+
+    Hanya ``max_versions`` versi data terakhir yang dipakai disimpan; layer
+    versi yang dikeluarkan dilepas dari memori dan direktori tile-nya di disk
+    dihapus, begitu pula direktori versi lama yang tertinggal dari proses lain.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_versions: int = DEFAULT_MAX_VERSIONS):
+        self.cache_dir = Path(cache_dir or cache_root() / 'tiles')
+        self.max_versions = max_versions
+        self._versions: 'OrderedDict[str, Dict[str, gpd.GeoDataFrame]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, layer: str, version: str, features: gpd.GeoDataFrame):
+        """Mendaftarkan fitur sebuah layer; indeks spasial dibangun sekali di sini"""
+        with self._lock:
+            if layer in self._versions.get(version, {}):
+                return
+            features = features.to_crs(epsg=4326) if features.crs is not None else features
+            features.sindex  # bangun STRtree sekarang, bukan saat request tile pertama
+            is_new = version not in self._versions
+            self._versions.setdefault(version, {})[layer] = features
+            self._versions.move_to_end(version)
+            evicted = []
+            while len(self._versions) > self.max_versions:
+                evicted.append(self._versions.popitem(last=False)[0])
+            keep = set(self._versions)
+        if is_new:
+            self._prune_disk(keep, evicted)
+
+    def is_registered(self, layer: str, version: str) -> bool:
+        with self._lock:
+            return layer in self._versions.get(version, {})
+
+    def _layer(self, layer: str, version: str) -> Optional[gpd.GeoDataFrame]:
+        with self._lock:
+            if version not in self._versions:
+                return None
+            self._versions.move_to_end(version)
+            return self._versions[version].get(layer)
+
+    def _prune_disk(self, keep: set, evicted: list):
+        """Menghapus direktori tile versi yang dikeluarkan dan versi lama di luar ``max_versions`` terbaru"""
+        if not self.cache_dir.exists():
+            return
+        for layer_dir in self.cache_dir.iterdir():
+            if not layer_dir.is_dir():
+                continue
+            version_dirs = sorted((path for path in layer_dir.iterdir() if path.is_dir()),
+                                  key=lambda path: path.stat().st_mtime, reverse=True)
+            # Versi dari proses lain disisakan selama total versi di disk masih dalam batas
+            others = [path for path in version_dirs if path.name not in keep and path.name not in evicted]
+            stale = [path for path in version_dirs if path.name in evicted]
+            stale += others[max(self.max_versions - len(keep), 0):]
+            for path in stale:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def tile_path(self, layer: str, version: str, z: int, x: int, y: int) -> Path:
+        return self.cache_dir / layer / version / str(z) / str(x) / f"{y}.geojson"
+
+    def get_tile(self, layer: str, version: str, z: int, x: int, y: int) -> Optional[bytes]:
+        """Isi tile dari disk, atau dipotong dari layer terdaftar bila belum ada"""
+        path = self.tile_path(layer, version, z, x, y)
+        if path.exists():
+            return path.read_bytes()
+
+        features = self._layer(layer, version)
+        if features is None:
+            return None
+        payload = self.cut_tile(features, z, x, y)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Direktori versi sedang dipangkas (mis. oleh replika lain): tile tetap dikirim tanpa disimpan
+            pass
+        return payload
+
+    @staticmethod
+    def cut_tile(features: gpd.GeoDataFrame, z: int, x: int, y: int) -> bytes:
+        """Memotong fitur yang beririsan dengan tile dan menyederhanakannya sesuai zoom"""
+        min_lon, min_lat, max_lon, max_lat = tile_bounds(z, x, y)
+        hits = features.sindex.query(shapely.box(min_lon, min_lat, max_lon, max_lat), predicate='intersects')
+        subset = features.iloc[hits]
+
+        geometry = subset.geometry.values
+        is_point = shapely.get_type_id(geometry) == 0
+        if is_point.any():
+            # Titik hanya milik satu tile (batas kanan/atas eksklusif) agar tidak ganda
+            lon, lat = shapely.get_x(geometry), shapely.get_y(geometry)
+            inside = (lon >= min_lon) & (lon < max_lon) & (lat > min_lat) & (lat <= max_lat)
+            keep = ~is_point | inside
+            subset, geometry, is_point = subset[keep], geometry[keep], is_point[keep]
+
+        tolerance = SIMPLIFY_TIERS[tier_for_zoom(z)]
+        shapes = ~is_point
+        if shapes.any():
+            clipped = shapely.clip_by_rect(geometry[shapes], min_lon, min_lat, max_lon, max_lat)
+            clipped = shapely.simplify(clipped, tolerance, preserve_topology=True)
+            geometry = geometry.copy()
+            geometry[shapes] = shapely.set_precision(clipped, grid_size=tolerance / 10)
+
+        subset = subset.set_geometry(geometry)
+        subset = subset[~subset.geometry.is_empty]
+        return subset.to_json(drop_id=True).encode('utf-8')
+
+
+class TileRequestHandler(BaseHTTPRequestHandler):
+    store: TileStore = None
+
+    def do_GET(self):
+        match = TILE_PATH.match(self.path.split('?', 1)[0])
+        if not match:
+            self.send_error(404)
+            return
+        payload = self.store.get_tile(
+            match['layer'], match['version'], int(match['z']), int(match['x']), int(match['y'])
+        )
+        if payload is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/geo+json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'public, max-age=86400, immutable')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TileServer:
+    """Server HTTP tile yang berjalan di thread latar belakang"""
+
+    def __init__(self, store: TileStore, host: str = '127.0.0.1', port: int = 8765,
+                 public_url: Optional[str] = None):
+        handler = type('BoundTileRequestHandler', (TileRequestHandler,), {'store': store})
+        self.store = store
+        try:
+            self.httpd = ThreadingHTTPServer((host, port), handler)
+        except OSError:
+            if not port:
+                raise
+            # Port sudah dipakai (mis. replika lain di host yang sama): pakai port bebas. Layer
+            # hanya terdaftar di proses ini, jadi URL publik bersama tidak bisa dipakai
+            self.httpd = ThreadingHTTPServer((host, 0), handler)
+            public_url = None
+        self.public_url = (public_url or f"http://{host}:{self.httpd.server_port}").rstrip('/')
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='tile-server', daemon=True)
+
+    def start(self) -> 'TileServer':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def url_template(self, layer: str, version: str) -> str:
+        return f"{self.public_url}/tiles/{layer}/{version}/{{z}}/{{x}}/{{y}}.geojson"
+
+
+def tile_server_from_env(store: Optional[TileStore] = None) -> Optional[TileServer]:
+    """Menjalankan server tile bila ``SUMATERA_TILE_PORT`` diset
+
+    ``SUMATERA_TILE_URL`` dapat diisi URL publik (mis. di balik reverse proxy).
+    Bila port sudah dipakai, server memakai port bebas dan URL lokalnya.
+    ``SUMATERA_TILE_VERSIONS`` membatasi jumlah versi data yang disimpan.
+    """
+    port = os.environ.get('SUMATERA_TILE_PORT')
+    if not port:
+        return None
+    return TileServer(
+        store or TileStore(max_versions=int(os.environ.get('SUMATERA_TILE_VERSIONS', DEFAULT_MAX_VERSIONS))),
+        host=os.environ.get('SUMATERA_TILE_HOST', '127.0.0.1'),
+        port=int(port),
+        public_url=os.environ.get('SUMATERA_TILE_URL')
+    ).start()
+
+
+if __name__ == '__main__':
+    # Mode mandiri: hanya melayani tile yang sudah ada di cache disk
+    server = tile_server_from_env() or TileServer(TileStore()).start()
+    print(json.dumps({'url': server.public_url, 'cache_dir': str(server.store.cache_dir)}))
+    server._thread.join()
@@ -0,0 +1,412 @@
+"""Indeks trend per provinsi untuk halaman "Analisis Trend".
+
+Data time series diurutkan dan dikelompokkan sekali, lalu nilai awal,
+akhir, jumlah dan banyaknya observasi tiap indikator disimpan per
+provinsi. Metrik terkini, perubahan awal-akhir periode dan input korelasi
+diambil dari struktur ini tanpa memindai ulang seluruh baris.
+"""
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+TREND_COLUMNS = ['co_trend', 'no2_trend', 'ch4_trend', 'pou_trend', 'ntp_trend']
+
+# Indikator trend di sidebar -> kolom, satuan, judul dan label sumbu grafik
+TREND_INDICATORS: Dict[str, dict] = {
+    "CO Level": {'column': 'co_trend', 'unit': "mg/m³", 'title': "Trend Konsentrasi CO (mg/m³)", 'label': 'CO (mg/m³)'},
+    "NO2 Level": {'column': 'no2_trend', 'unit': "µg/m³", 'title': "Trend Konsentrasi NO2 (µg/m³)", 'label': 'NO2 (µg/m³)'},
+    "CH4 Level": {'column': 'ch4_trend', 'unit': "ppm", 'title': "Trend Konsentrasi CH4 (ppm)", 'label': 'CH4 (ppm)'},
+    "PoU Trend": {'column': 'pou_trend', 'unit': "%", 'title': "Trend PoU (%)", 'label': 'PoU (%)'},
+    "NTP Trend": {'column': 'ntp_trend', 'unit': "", 'title': "Trend NTP", 'label': 'NTP'},
+}
+
+# Pilihan rentang waktu -> jumlah hari
+TREND_WINDOWS = {
+    "30 Hari Terakhir": 30,
+    "1 Tahun Terakhir": 365,
+    "2 Tahun Terakhir": 730,
+    "5 Tahun Terakhir": 1825,
+    "10 Tahun Terakhir": 3650,
+}
+
+# Tingkat resolusi piramida: (frekuensi pandas, label, perkiraan hari per periode)
+RESOLUTIONS = [
+    ('D', 'Harian', 1.0),
+    ('W', 'Mingguan', 7.0),
+    ('MS', 'Bulanan', 30.44),
+    ('YS', 'Tahunan', 365.25),
+]
+
+# Frekuensi yang labelnya berada di awal periode -> kode periode pandas
+PERIOD_CODES = {'MS': 'M', 'YS': 'Y'}
+
+# Frekuensi tingkat agregat -> kode periode pandas untuk menghitung ulang periode yang berubah
+AGGREGATE_PERIODS = {'W': 'W', **PERIOD_CODES}
+
+MAX_TREND_POINTS = 2000
+
+# Nama kolom ringkas untuk heatmap korelasi
+CORRELATION_LABELS = {
+    'co_trend': 'CO',
+    'no2_trend': 'NO2',
+    'ch4_trend': 'CH4',
+    'pou_trend': 'PoU',
+    'ntp_trend': 'NTP',
+}
+
+
+def _row_keys(df: pd.DataFrame) -> pd.MultiIndex:
+    """Kunci (tanggal, provinsi) tiap baris time series"""
+    return pd.MultiIndex.from_arrays([df['date'], df['province'].astype(str)])
+
+
+def _summarize(df: pd.DataFrame, columns: List[str]) -> Dict[str, pd.DataFrame]:
+    """Ringkasan per provinsi dari satu blok baris (diurutkan per tanggal)"""
+    ordered = df.sort_values(['province', 'date'], kind='stable')
+    grouped = ordered.groupby('province', observed=True, sort=False)
+    summary = {
+        'first': grouped[columns].first(),
+        'last': grouped[columns].last(),
+        'first_date': grouped['date'].min(),
+        'last_date': grouped['date'].max(),
+        'sums': grouped[columns].sum().astype(np.float64),
+        'counts': grouped[columns].count(),
+    }
+    # Indeks provinsi biasa (bukan kategorikal) agar mudah digabung saat append
+    for frame in summary.values():
+        frame.index = pd.Index(frame.index.astype(str), name='province')
+    return summary
+
+
+class TrendIndex:
+    """Statistik awal/akhir/rata-rata per provinsi untuk seluruh indikator trend"""
+
+    def __init__(self, df: pd.DataFrame, columns: List[str] = None):
+        self.columns = list(columns or TREND_COLUMNS)
+        self.end = df['date'].max()
+        summary = _summarize(df, self.columns)
+        self.first = summary['first']
+        self.last = summary['last']
+        self.first_date = summary['first_date']
+        self.last_date = summary['last_date']
+        self.sums = summary['sums']
+        self.counts = summary['counts']
+
+    @property
+    def provinces(self) -> List[str]:
+        return self.last.index.tolist()
+
+    def append(self, new_rows: pd.DataFrame, previous: pd.DataFrame = None, days: int = None):
+        """Memperbarui indeks secara inkremental dengan baris baru atau baris pengganti
+
+        ``previous`` adalah frame yang menjadi dasar indeks sebelum pembaruan;
+        barisnya dengan (tanggal, provinsi) yang sama dengan ``new_rows`` diganti.
+        Dengan ``days`` indeks mengikuti ``days`` hari terakhir: baris yang keluar
+        dari rentang dikurangi. Nilai awal/akhir provinsi yang barisnya keluar
+        atau diganti diambil ulang dari baris yang tersisa.
+        """
+        if new_rows.empty:
+            return
+        new_end = max(self.end, new_rows['date'].max())
+        removed = candidates = new_rows.iloc[:0]
+        new_cutoff = pd.Timestamp.min
+        if previous is not None:
+            old_cutoff = self.end - pd.Timedelta(days=days) if days else pd.Timestamp.min
+            new_cutoff = new_end - pd.Timedelta(days=days) if days else pd.Timestamp.min
+            replaced = _row_keys(previous).isin(_row_keys(new_rows))
+            in_window = previous['date'] > old_cutoff
+            removed = previous[in_window & (replaced | (previous['date'] <= new_cutoff))]
+            candidates = previous[(previous['date'] > new_cutoff) & ~replaced]
+            new_rows = new_rows[new_rows['date'] > new_cutoff]
+        self.end = new_end
+
+        update = _summarize(new_rows, self.columns)
+        provinces = self.last.index.union(update['last'].index)
+
+        def aligned(frame):
+            return frame.reindex(provinces)
+
+        # Jumlah dan banyaknya observasi: baris yang keluar/diganti dikurangi, baris baru ditambahkan
+        sums, counts = aligned(self.sums).fillna(0), aligned(self.counts).fillna(0)
+        if not removed.empty:
+            gone = _summarize(removed, self.columns)
+            sums = sums.sub(gone['sums'].reindex(provinces).fillna(0))
+            counts = counts.sub(gone['counts'].reindex(provinces).fillna(0))
+        self.sums = sums.add(aligned(update['sums']).fillna(0))
+        self.counts = counts.add(aligned(update['counts']).fillna(0)).astype(np.int64)
+
+        # Nilai terakhir diganti bila data baru lebih mutakhir (atau sama: baris pengganti), nilai awal bila lebih lama
+        newer = aligned(update['last_date']) >= aligned(self.last_date)
+        newer = newer | aligned(self.last_date).isna()
+        # Kolom kosong pada baris baru (mis. hanya gas dari sensor) mempertahankan nilai non-kosong terakhir
+        self.last = aligned(self.last).where(~newer, aligned(update['last']).combine_first(aligned(self.last)),
+                                             axis=0)
+        self.last_date = aligned(self.last_date).where(~newer, aligned(update['last_date']))
+
+        older = aligned(update['first_date']) <= aligned(self.first_date)
+        older = older | aligned(self.first_date).isna()
+        self.first = aligned(self.first).where(~older, aligned(update['first']).combine_first(aligned(self.first)),
+                                               axis=0)
+        self.first_date = aligned(self.first_date).where(~older, aligned(update['first_date']))
+
+        if previous is None or not days:
+            return
+        # Baris pengganti sudah tertangani di atas; provinsi yang baris awal/akhirnya keluar
+        # dari rentang mengambil ulang nilainya dari baris yang tersisa
+        expired = (self.first_date <= new_cutoff) | (self.last_date <= new_cutoff)
+        affected = expired[expired].index
+        if affected.empty:
+            return
+        remaining = pd.concat([candidates[candidates['province'].astype(str).isin(affected)],
+                               new_rows[new_rows['province'].astype(str).isin(affected)]])
+        refreshed = _summarize(remaining, self.columns)
+        for name in ('first', 'last', 'first_date', 'last_date'):
+            current = getattr(self, name).copy()
+            current.loc[affected] = refreshed[name].reindex(affected)
+            setattr(self, name, current)
+
+    def means(self, provinces: List[str]) -> pd.DataFrame:
+        """Rata-rata tiap indikator untuk provinsi terpilih"""
+        sums = self.sums.reindex(provinces).dropna(how='all')
+        return sums / self.counts.reindex(sums.index)
+
+    def latest(self, provinces: List[str]) -> pd.DataFrame:
+        """Nilai terbaru tiap indikator untuk provinsi terpilih"""
+        return self.last.reindex(provinces).dropna(how='all')
+
+    def changes(self, provinces: List[str], column: str) -> pd.DataFrame:
+        """Perubahan (%) dari awal ke akhir periode untuk satu indikator"""
+        counts = self.counts[column].reindex(provinces)
+        valid = counts[counts >= 2].index
+        first = self.first.loc[valid, column].astype(np.float64)
+        last = self.last.loc[valid, column].astype(np.float64)
+        change = (last - first) / first * 100
+
+        trend = np.select([change > 0, change < 0], ["📈 Naik", "📉 Turun"], default="➡️ Stabil")
+        return pd.DataFrame({
+            'province': valid,
+            'change_percent': change.to_numpy(),
+            'trend': trend,
+        })
+
+    def correlation_input(self, provinces: List[str]) -> pd.DataFrame:
+        """Rata-rata per provinsi dengan label ringkas untuk tabel ringkasan trend"""
+        return self.means(provinces).rename(columns=CORRELATION_LABELS)
+
+
+def window_slice(df: pd.DataFrame, days: int) -> pd.DataFrame:
+    """Baris time series dalam ``days`` hari terakhir"""
+    end = df['date'].max()
+    return df[df['date'] > end - pd.Timedelta(days=days)]
+
+
+class StatisticsCube:
+    """Statistik cukup per provinsi dan rentang waktu: jumlah, total dan perkalian silang
+
+    Untuk tiap rentang (hari) dan provinsi disimpan n, jumlah nilai dan matriks
+    jumlah perkalian silang (diagonalnya adalah jumlah kuadrat). Rata-rata,
+    varians dan matriks korelasi gabungan untuk subset provinsi mana pun
+    dirakit dengan menjumlahkan statistik tersebut, tanpa memindai baris.
+    Nilai digeser dengan rata-rata global saat dibangun agar jumlah kuadrat
+    tetap presisi.
+    """
+
+    def __init__(self, df: pd.DataFrame, windows: Dict[str, int] = None, columns: List[str] = None):
+        self.columns = list(columns or TREND_COLUMNS)
+        self.shift = df[self.columns].mean().to_numpy(dtype=np.float64)
+        self.end = df['date'].max()
+        self.stats: Dict[int, Dict[str, object]] = {}
+        for days in (windows or TREND_WINDOWS).values():
+            self.stats[days] = self._accumulate(window_slice(df, days))
+
+    def _accumulate(self, df: pd.DataFrame) -> Dict[str, object]:
+        """Statistik cukup per provinsi dari baris yang seluruh indikatornya terisi"""
+        complete = df.dropna(subset=self.columns)
+        values = complete[self.columns].to_numpy(dtype=np.float64) - self.shift
+        codes, provinces = pd.factorize(complete['province'].astype(str), sort=True)
+        k = len(self.columns)
+
+        counts = np.bincount(codes, minlength=len(provinces)).astype(np.float64)
+        sums = np.zeros((len(provinces), k))
+        np.add.at(sums, codes, values)
+        cross = np.zeros((len(provinces), k, k))
+        for i in range(k):
+            for j in range(i, k):
+                cross[:, i, j] = np.bincount(codes, weights=values[:, i] * values[:, j], minlength=len(provinces))
+                cross[:, j, i] = cross[:, i, j]
+        return {'provinces': pd.Index(provinces), 'counts': counts, 'sums': sums, 'cross': cross}
+
+    def _merge(self, days: int, delta: Dict[str, object], sign: float):
+        current = self.stats[days]
+        provinces = current['provinces'].union(delta['provinces'])
+        merged = {'provinces': provinces}
+        for name in ('counts', 'sums', 'cross'):
+            combined = np.zeros((len(provinces),) + current[name].shape[1:])
+            combined[provinces.get_indexer(current['provinces'])] += current[name]
+            combined[provinces.get_indexer(delta['provinces'])] += sign * delta[name]
+            merged[name] = combined
+        self.stats[days] = merged
+
+    def append(self, new_rows: pd.DataFrame, previous: pd.DataFrame):
+        """Pembaruan inkremental dengan baris baru atau baris pengganti (tanggal, provinsi yang sudah ada)
+
+        ``previous`` adalah frame yang menjadi dasar kubus sebelum pembaruan.
+        Untuk tiap rentang, baris lama yang keluar karena akhir rentang bergeser
+        dan baris lama yang diganti dikurangi, lalu baris baru di dalam
+        rentang ditambahkan.
+        """
+        if new_rows.empty:
+            return
+        new_end = max(self.end, new_rows['date'].max())
+        keys = pd.MultiIndex.from_arrays([new_rows['date'], new_rows['province'].astype(str)])
+        previous_keys = pd.MultiIndex.from_arrays([previous['date'], previous['province'].astype(str)])
+        replaced = previous[previous_keys.isin(keys)]
+        for days in self.stats:
+            old_cutoff = self.end - pd.Timedelta(days=days)
+            new_cutoff = new_end - pd.Timedelta(days=days)
+            expired = previous[(previous['date'] > old_cutoff) & (previous['date'] <= new_cutoff)]
+            # Baris yang diganti dan masih di dalam rentang (yang keluar sudah dikurangi di atas)
+            stale = replaced[(replaced['date'] > old_cutoff) & (replaced['date'] > new_cutoff)]
+            added = new_rows[new_rows['date'] > new_cutoff]
+            for rows, sign in ((expired, -1.0), (stale, -1.0), (added, 1.0)):
+                if not rows.empty:
+                    self._merge(days, self._accumulate(rows), sign)
+        self.end = new_end
+
+    def moments(self, days: int, provinces: List[str]) -> Dict[str, np.ndarray]:
+        """n, rata-rata dan matriks kovarians gabungan untuk subset provinsi (O(indikator²) per provinsi)"""
+        stats = self.stats[days]
+        positions = stats['provinces'].get_indexer(provinces)
+        positions = positions[positions >= 0]
+        n = stats['counts'][positions].sum()
+        sums = stats['sums'][positions].sum(axis=0)
+        cross = stats['cross'][positions].sum(axis=0)
+        if n == 0:
+            nan = np.full(len(self.columns), np.nan)
+            return {'n': 0.0, 'mean': nan, 'cov': np.full((len(self.columns),) * 2, np.nan)}
+        mean = sums / n
+        cov = (cross - n * np.outer(mean, mean)) / (n - 1) if n > 1 else np.full_like(cross, np.nan)
+        return {'n': n, 'mean': mean + self.shift, 'cov': cov}
+
+    def means(self, days: int, provinces: List[str]) -> pd.Series:
+        return pd.Series(self.moments(days, provinces)['mean'], index=self.columns)
+
+    def variances(self, days: int, provinces: List[str]) -> pd.Series:
+        return pd.Series(np.diag(self.moments(days, provinces)['cov']), index=self.columns)
+
+    def correlation(self, days: int, provinces: List[str]) -> pd.DataFrame:
+        """Matriks korelasi indikator gabungan seluruh pengamatan provinsi terpilih"""
+        cov = self.moments(days, provinces)['cov']
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.outer(std, std)
+        labels = [CORRELATION_LABELS.get(column, column) for column in self.columns]
+        return pd.DataFrame(corr, index=labels, columns=labels)
+
+
+class TemporalPyramid:
+    """Agregat multi-resolusi (harian/mingguan/bulanan/tahunan) dengan amplop min/max
+
+    Tiap tingkat disimpan terurut per (provinsi, tanggal) beserta posisi baris
+    tiap provinsi, sehingga pengambilan satu provinsi dan rentang tanggal cukup
+    berupa slicing dan ``searchsorted``.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: List[str] = None):
+        self.columns = list(columns or TREND_COLUMNS)
+        self.levels: Dict[str, pd.DataFrame] = {}
+        self.offsets: Dict[str, Dict[str, tuple]] = {}
+        for freq, _, _ in RESOLUTIONS:
+            level = self._aggregate(df, freq)
+            self.levels[freq] = level
+            self.offsets[freq] = self._province_offsets(level)
+
+    def _aggregate(self, df: pd.DataFrame, freq: str) -> pd.DataFrame:
+        if freq == 'D':
+            level = df[['province', 'date'] + self.columns].copy()
+            for column in self.columns:
+                level[f'{column}_min'] = level[column]
+                level[f'{column}_max'] = level[column]
+        else:
+            grouped = df.groupby(['province', pd.Grouper(key='date', freq=freq)], observed=True)
+            stats = grouped[self.columns].agg(['mean', 'min', 'max'])
+            level = pd.DataFrame(index=stats.index)
+            for column in self.columns:
+                level[column] = stats[(column, 'mean')].astype(np.float32)
+                level[f'{column}_min'] = stats[(column, 'min')]
+                level[f'{column}_max'] = stats[(column, 'max')]
+            level = level.reset_index()
+        level['province'] = level['province'].astype(str)
+        return level.sort_values(['province', 'date'], kind='stable').reset_index(drop=True)
+
+    def append(self, new_rows: pd.DataFrame, frame: pd.DataFrame):
+        """Pembaruan inkremental dengan baris baru atau pengganti
+
+        ``frame`` adalah time series lengkap setelah pembaruan. Tingkat harian
+        hanya mengganti/menambah baris ``new_rows``; tingkat mingguan, bulanan
+        dan tahunan menghitung ulang periode yang memuat tanggal baris tersebut
+        untuk provinsi terkait saja.
+        """
+        if new_rows.empty:
+            return
+        in_provinces = frame['province'].isin(new_rows['province'].astype(str).unique())
+        for freq, _, _ in RESOLUTIONS:
+            if freq == 'D':
+                updated = self._aggregate(new_rows, freq)
+            else:
+                periods = new_rows['date'].dt.to_period(AGGREGATE_PERIODS[freq])
+                span = frame['date'].between(periods.min().start_time, periods.max().end_time)
+                updated = self._aggregate(frame[in_provinces & span], freq)
+            level = self.levels[freq]
+            keep = ~_row_keys(level).isin(_row_keys(updated))
+            level = pd.concat([level[keep], updated], ignore_index=True)
+            level = level.sort_values(['province', 'date'], kind='stable').reset_index(drop=True)
+            self.levels[freq] = level
+            self.offsets[freq] = self._province_offsets(level)
+
+    @staticmethod
+    def _province_offsets(level: pd.DataFrame) -> Dict[str, tuple]:
+        provinces = level['province'].to_numpy()
+        starts = np.flatnonzero(np.r_[True, provinces[1:] != provinces[:-1]])
+        ends = np.r_[starts[1:], len(provinces)]
+        return {provinces[start]: (start, end) for start, end in zip(starts, ends)}
+
+    @staticmethod
+    def select_resolution(start: pd.Timestamp, end: pd.Timestamp, n_series: int,
+                          max_points: int = MAX_TREND_POINTS) -> str:
+        """Resolusi terhalus yang menjaga jumlah titik di bawah anggaran"""
+        span_days = max((end - start) / pd.Timedelta(days=1), 1.0)
+        for freq, _, days_per_period in RESOLUTIONS:
+            if span_days / days_per_period * max(n_series, 1) <= max_points:
+                return freq
+        return RESOLUTIONS[-1][0]
+
+    def query(self, provinces: List[str], column: str, start: pd.Timestamp, end: pd.Timestamp,
+              max_points: int = MAX_TREND_POINTS) -> tuple:
+        """Titik grafik (date, province, nilai, min, max) dan resolusi yang dipakai"""
+        freq = self.select_resolution(start, end, len(provinces), max_points)
+        level = self.levels[freq]
+        dates = level['date'].to_numpy()
+        # Label bulanan/tahunan ada di awal periode, bisa jatuh sebelum awal rentang
+        period_start = pd.Timestamp(start)
+        if freq in PERIOD_CODES:
+            period_start = period_start.to_period(PERIOD_CODES[freq]).start_time
+        # Label mingguan ada di akhir minggu, bisa jatuh setelah akhir rentang
+        period_end = pd.Timestamp(end) + pd.Timedelta(days=6) if freq == 'W' else pd.Timestamp(end)
+
+        parts = []
+        for province in provinces:
+            if province not in self.offsets[freq]:
+                continue
+            lo, hi = self.offsets[freq][province]
+            left = lo + np.searchsorted(dates[lo:hi], np.datetime64(period_start), side='left')
+            right = lo + np.searchsorted(dates[lo:hi], np.datetime64(period_end), side='right')
+            parts.append(np.arange(left, right))
+        rows = np.concatenate(parts) if parts else np.array([], dtype=np.int64)
+        frame = level.iloc[rows][['date', 'province', column, f'{column}_min', f'{column}_max']]
+        return frame.reset_index(drop=True), freq
+
+
+def resolution_label(freq: str) -> str:
+    return next(label for code, label, _ in RESOLUTIONS if code == freq)
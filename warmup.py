@@ -0,0 +1,113 @@
+"""Pre-render peta dan figure ke cache render saat versi data baru masuk.
+
+Ketika versi data dasar indikator berubah (muat ulang data, bukan batch
+sensor langsung), seluruh job dari ``pages.render_jobs`` dirender di latar
+lewat process pool dengan jumlah proses kecil dan tetap, lalu payload-nya
+dimasukkan ke cache render peta/figure dengan kunci yang sama seperti di
+dashboard. Time series dasar untuk job trend dimuat sendiri oleh thread
+warm-up, sehingga halaman trend juga sudah hangat sebelum dibuka. Hanya
+satu warm-up berjalan pada satu waktu; versi yang masuk selagi warm-up
+berjalan dijadwalkan setelahnya (versi terbaru saja).
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from data_sources import data_version
+from pages import render_jobs
+from publish import iter_rendered
+from render_cache import RenderCache
+
+DEFAULT_WARMUP_WORKERS = 2
+
+
+class WarmupScheduler:
+    """Penjadwal warm-up cache render per versi data dengan laporan progres"""
+
+    def __init__(self, caches: Dict[str, RenderCache], max_workers: int = DEFAULT_WARMUP_WORKERS):
+        self.caches = caches
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._pending: Optional[tuple] = None
+        self._thread: Optional[threading.Thread] = None
+        self._scheduled: Optional[str] = None
+        self._progress = {'version': None, 'total': 0, 'done': 0, 'skipped': 0, 'failed': 0,
+                          'running': False, 'started': None, 'finished': None, 'last_error': None}
+
+    def schedule(self, df: pd.DataFrame, time_series: Optional[Callable[[], pd.DataFrame]] = None) -> bool:
+        """Menjadwalkan warm-up bila versi data berbeda dari yang terakhir dijadwalkan
+
+        ``time_series`` adalah pemuat time series dasar; dipanggil di thread
+        warm-up sehingga rerun halaman tidak ikut menunggu.
+        """
+        version = data_version(df)
+        with self._lock:
+            if version == self._scheduled:
+                return False
+            self._scheduled = version
+            self._pending = (df, time_series)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='sumatera-warmup', daemon=True)
+                self._thread.start()
+        return True
+
+    def progress(self) -> dict:
+        with self._lock:
+            return dict(self._progress)
+
+    def _update(self, **changes):
+        with self._lock:
+            self._progress.update(changes)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                pending, self._pending = self._pending, None
+                if pending is None:
+                    self._progress['running'] = False
+                    return
+            self.warm(*pending)
+
+    def warm(self, df: pd.DataFrame, time_series: Optional[Callable[[], pd.DataFrame]] = None):
+        """Merender seluruh job yang belum ada di cache (berjalan di thread pemanggil)"""
+        self._update(version=data_version(df), total=0, done=0, skipped=0, failed=0, running=True,
+                     started=time.time(), finished=None, last_error=None)
+        frames = {'indicators': df}
+        try:
+            if time_series is not None:
+                frames['time_series'] = time_series()
+        except Exception as exc:
+            self._update(last_error=f'time series: {exc!r}')
+        jobs = render_jobs(df, frames.get('time_series'))
+        missing = [job for job in jobs if job['key'] not in self.caches[job['kind']]]
+        self._update(total=len(jobs), skipped=len(jobs) - len(missing), done=len(jobs) - len(missing))
+
+        try:
+            for job, payload, error in iter_rendered(missing, frames, self.max_workers):
+                if error is None:
+                    self.caches[job['kind']].put(job['key'], payload)
+                    self._progress_step(failed=False)
+                else:
+                    self._progress_step(failed=True, error=f"{job['name']}: {error!r}")
+        except Exception as exc:
+            # Process pool gagal dibuat/berhenti: dashboard tetap merender sendiri saat cache miss
+            self._update(last_error=repr(exc))
+        self._update(finished=time.time())
+
+    def _progress_step(self, failed: bool, error: Optional[str] = None):
+        with self._lock:
+            self._progress['done'] += 1
+            if failed:
+                self._progress['failed'] += 1
+                self._progress['last_error'] = error
+
+
+def warmup_scheduler_from_env(caches: Dict[str, RenderCache]) -> Optional[WarmupScheduler]:
+    """Warm-up aktif dengan ``DEFAULT_WARMUP_WORKERS`` proses; ``SUMATERA_WARMUP_WORKERS=0`` mematikannya"""
+    workers = int(os.environ.get('SUMATERA_WARMUP_WORKERS', DEFAULT_WARMUP_WORKERS))
+    if workers <= 0:
+        return None
+    return WarmupScheduler(caches, max_workers=workers)